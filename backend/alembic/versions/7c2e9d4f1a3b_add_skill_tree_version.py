@@ -0,0 +1,29 @@
+"""add_skill_tree_version
+
+Revision ID: 7c2e9d4f1a3b
+Revises: 491569515573
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2e9d4f1a3b"
+down_revision: str | Sequence[str] | None = "491569515573"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("skill_trees", sa.Column("version", sa.Integer(), server_default=sa.text("1"), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("skill_trees", "version")
@@ -0,0 +1,67 @@
+"""add_skill_closure
+
+Revision ID: a4d81f6e0b92
+Revises: 7c2e9d4f1a3b
+Create Date: 2026-10-17 11:02:15.604417
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d81f6e0b92"
+down_revision: str | Sequence[str] | None = "7c2e9d4f1a3b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "skill_closure",
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("skill_tree_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["ancestor_id"], ["skills.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["descendant_id"], ["skills.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["skill_tree_id"], ["skill_trees.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+    )
+    op.create_index("idx_skill_closure_descendant_id", "skill_closure", ["descendant_id"], unique=False)
+    op.create_index("idx_skill_closure_skill_tree_id", "skill_closure", ["skill_tree_id"], unique=False)
+
+    # Backfill : profondeur bornée par la taille de l'arbre (graphes cycliques déjà persistés)
+    op.execute("""
+        WITH RECURSIVE tree_sizes AS (
+            SELECT skill_tree_id, COUNT(*) AS nb_skills FROM skills GROUP BY skill_tree_id
+        ),
+        paths(skill_tree_id, ancestor_id, descendant_id, depth) AS (
+            SELECT skills.skill_tree_id, skill_dependencies.skill_id, skill_dependencies.unlock_id, 1
+            FROM skill_dependencies
+            INNER JOIN skills ON skill_dependencies.skill_id = skills.id
+
+            UNION
+
+            SELECT paths.skill_tree_id, paths.ancestor_id, skill_dependencies.unlock_id, paths.depth + 1
+            FROM paths
+            INNER JOIN skill_dependencies ON skill_dependencies.skill_id = paths.descendant_id
+            INNER JOIN tree_sizes ON tree_sizes.skill_tree_id = paths.skill_tree_id
+            WHERE paths.depth < tree_sizes.nb_skills
+        )
+        INSERT INTO skill_closure (skill_tree_id, ancestor_id, descendant_id, depth)
+        SELECT skill_tree_id, ancestor_id, descendant_id, MIN(depth)
+        FROM paths
+        GROUP BY skill_tree_id, ancestor_id, descendant_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_skill_closure_skill_tree_id", table_name="skill_closure")
+    op.drop_index("idx_skill_closure_descendant_id", table_name="skill_closure")
+    op.drop_table("skill_closure")
@@ -0,0 +1,44 @@
+"""add_skill_trees_tag_ids
+
+Revision ID: a4e8c1f7b352
+Revises: f1b6d9c3e207
+Create Date: 2026-10-17 16:42:31.207846
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4e8c1f7b352"
+down_revision: str | Sequence[str] | None = "f1b6d9c3e207"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "skill_trees",
+        sa.Column("tag_ids", postgresql.ARRAY(sa.Integer()), server_default=sa.text("'{}'"), nullable=False),
+    )
+    op.execute(
+        """UPDATE skill_trees SET tag_ids = tagged.tag_ids
+        FROM (
+            SELECT skill_tree_id, array_agg(tag_id ORDER BY tag_id) AS tag_ids
+            FROM skill_tree_tags
+            GROUP BY skill_tree_id
+        ) AS tagged
+        WHERE skill_trees.id = tagged.skill_tree_id"""
+    )
+    op.create_index("idx_skill_trees_tag_ids", "skill_trees", ["tag_ids"], unique=False, postgresql_using="gin")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_skill_trees_tag_ids", table_name="skill_trees", postgresql_using="gin")
+    op.drop_column("skill_trees", "tag_ids")
@@ -0,0 +1,44 @@
+"""add_search_vector_dirty_at
+
+Revision ID: b9d3f6a2c418
+Revises: a4e8c1f7b352
+Create Date: 2026-10-17 17:20:54.631092
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b9d3f6a2c418"
+down_revision: str | Sequence[str] | None = "a4e8c1f7b352"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("skill_trees", sa.Column("search_vector_dirty_at", sa.DateTime(), nullable=True))
+    # save_skill_tree ne tenait pas search_vector à jour : tout est reconstruit une fois par le job
+    op.execute("UPDATE skill_trees SET search_vector_dirty_at = LOCALTIMESTAMP")
+    op.alter_column("skill_trees", "search_vector_dirty_at", server_default=sa.text("CURRENT_TIMESTAMP"))
+    op.create_index(
+        "idx_skill_trees_search_vector_dirty_at",
+        "skill_trees",
+        ["search_vector_dirty_at"],
+        unique=False,
+        postgresql_where=sa.text("search_vector_dirty_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "idx_skill_trees_search_vector_dirty_at",
+        table_name="skill_trees",
+        postgresql_where=sa.text("search_vector_dirty_at IS NOT NULL"),
+    )
+    op.drop_column("skill_trees", "search_vector_dirty_at")
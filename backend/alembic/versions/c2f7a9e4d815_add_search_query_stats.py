@@ -0,0 +1,38 @@
+"""add_search_query_stats
+
+Revision ID: c2f7a9e4d815
+Revises: b9d3f6a2c418
+Create Date: 2026-10-17 18:03:12.548930
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f7a9e4d815"
+down_revision: str | Sequence[str] | None = "b9d3f6a2c418"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "search_query_stats",
+        sa.Column("query_key", sa.String(length=200), nullable=False),
+        sa.Column("query", sa.String(length=200), nullable=False),
+        sa.Column("hits", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.PrimaryKeyConstraint("query_key"),
+    )
+    op.create_index("idx_search_query_stats_hits", "search_query_stats", ["hits"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_search_query_stats_hits", table_name="search_query_stats")
+    op.drop_table("search_query_stats")
@@ -0,0 +1,34 @@
+"""add_skill_trees_listing_indexes
+
+Revision ID: c3f9a2d6e845
+Revises: b8e3c5a17d24
+Create Date: 2026-10-17 11:47:32.918254
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f9a2d6e845"
+down_revision: str | Sequence[str] | None = "b8e3c5a17d24"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("idx_skill_trees_created_at_id", "skill_trees", ["created_at", "id"], unique=False)
+    op.create_index(
+        "idx_skill_trees_creator_created_at_id",
+        "skill_trees",
+        ["creator_username", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_skill_trees_creator_created_at_id", table_name="skill_trees")
+    op.drop_index("idx_skill_trees_created_at_id", table_name="skill_trees")
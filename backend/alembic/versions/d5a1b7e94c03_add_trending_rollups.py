@@ -0,0 +1,59 @@
+"""add_trending_rollups
+
+Revision ID: d5a1b7e94c03
+Revises: c3f9a2d6e845
+Create Date: 2026-10-17 13:20:48.117630
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a1b7e94c03"
+down_revision: str | Sequence[str] | None = "c3f9a2d6e845"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "trending_hourly",
+        sa.Column("skill_tree_id", sa.Integer(), nullable=False),
+        sa.Column("hour", sa.DateTime(), nullable=False),
+        sa.Column("favorites", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("checkers", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.ForeignKeyConstraint(["skill_tree_id"], ["skill_trees.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("skill_tree_id", "hour"),
+    )
+    op.create_index("idx_trending_hourly_hour", "trending_hourly", ["hour"], unique=False)
+    op.create_table(
+        "trending_scores",
+        sa.Column("period", sa.String(length=1), nullable=False),
+        sa.Column("skill_tree_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("decayed_score", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["skill_tree_id"], ["skill_trees.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("period", "skill_tree_id"),
+    )
+    op.create_index("idx_trending_scores_period_score", "trending_scores", ["period", "score"], unique=False)
+    op.create_index(
+        "idx_trending_scores_period_decayed_score", "trending_scores", ["period", "decayed_score"], unique=False
+    )
+    op.create_index("idx_user_favorite_trees_created_at", "user_favorite_trees", ["created_at"], unique=False)
+    op.create_index("idx_user_check_skill_created_at", "user_check_skill", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_user_check_skill_created_at", table_name="user_check_skill")
+    op.drop_index("idx_user_favorite_trees_created_at", table_name="user_favorite_trees")
+    op.drop_index("idx_trending_scores_period_decayed_score", table_name="trending_scores")
+    op.drop_index("idx_trending_scores_period_score", table_name="trending_scores")
+    op.drop_table("trending_scores")
+    op.drop_index("idx_trending_hourly_hour", table_name="trending_hourly")
+    op.drop_table("trending_hourly")
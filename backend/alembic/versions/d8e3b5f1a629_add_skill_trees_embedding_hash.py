@@ -0,0 +1,30 @@
+"""add_skill_trees_embedding_hash
+
+Revision ID: d8e3b5f1a629
+Revises: c2f7a9e4d815
+Create Date: 2026-10-17 19:12:40.361527
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d8e3b5f1a629"
+down_revision: str | Sequence[str] | None = "c2f7a9e4d815"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL pour les arbres existants : leur prochain embedding sera recalculé une fois
+    op.add_column("skill_trees", sa.Column("embedding_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("skill_trees", "embedding_hash")
@@ -0,0 +1,51 @@
+"""add_embedding_jobs
+
+Revision ID: e4a7c9d2b851
+Revises: d8e3b5f1a629
+Create Date: 2026-10-17 20:05:27.814306
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a7c9d2b851"
+down_revision: str | Sequence[str] | None = "d8e3b5f1a629"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "embedding_jobs",
+        sa.Column("skill_tree_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=10), server_default=sa.text("'pending'"), nullable=False),
+        sa.Column("generation", sa.Integer(), server_default=sa.text("1"), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("run_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["skill_tree_id"], ["skill_trees.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("skill_tree_id"),
+    )
+    op.create_index(
+        "idx_embedding_jobs_run_at",
+        "embedding_jobs",
+        ["run_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    # Arbres sans embedding à l'arrivée de la file : traités par le worker
+    op.execute("INSERT INTO embedding_jobs (skill_tree_id) SELECT id FROM skill_trees WHERE embedding IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_embedding_jobs_run_at", table_name="embedding_jobs")
+    op.drop_table("embedding_jobs")
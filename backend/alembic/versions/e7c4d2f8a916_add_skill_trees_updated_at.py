@@ -0,0 +1,35 @@
+"""add_skill_trees_updated_at
+
+Revision ID: e7c4d2f8a916
+Revises: d5a1b7e94c03
+Create Date: 2026-10-17 14:05:09.482713
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7c4d2f8a916"
+down_revision: str | Sequence[str] | None = "d5a1b7e94c03"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "skill_trees",
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+    )
+    op.execute("UPDATE skill_trees SET updated_at = created_at")
+    op.create_index("idx_skill_trees_updated_at", "skill_trees", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_skill_trees_updated_at", table_name="skill_trees")
+    op.drop_column("skill_trees", "updated_at")
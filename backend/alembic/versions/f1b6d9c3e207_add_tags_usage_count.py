@@ -0,0 +1,79 @@
+"""add_tags_usage_count
+
+Revision ID: f1b6d9c3e207
+Revises: e7c4d2f8a916
+Create Date: 2026-10-17 15:12:44.309281
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1b6d9c3e207"
+down_revision: str | Sequence[str] | None = "e7c4d2f8a916"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("tags", sa.Column("usage_count", sa.Integer(), server_default=sa.text("0"), nullable=False))
+    op.execute(
+        """UPDATE tags SET usage_count = counts.n
+        FROM (SELECT tag_id, COUNT(*) AS n FROM skill_tree_tags GROUP BY tag_id) AS counts
+        WHERE tags.id = counts.tag_id"""
+    )
+    op.create_index("idx_tags_usage_count", "tags", ["usage_count"], unique=False)
+    op.create_index(
+        "idx_tags_name_pattern", "tags", ["name"], unique=False, postgresql_ops={"name": "varchar_pattern_ops"}
+    )
+
+    op.execute(
+        """CREATE OR REPLACE FUNCTION skill_tree_tags_count_insert() RETURNS trigger AS $$
+BEGIN
+    -- Verrous pris par id croissant : deux écritures partageant des tags ne s'interbloquent pas
+    PERFORM 1 FROM tags WHERE id IN (SELECT tag_id FROM inserted_rows) ORDER BY id FOR NO KEY UPDATE;
+    UPDATE tags SET usage_count = tags.usage_count + delta.n
+    FROM (SELECT tag_id, COUNT(*) AS n FROM inserted_rows GROUP BY tag_id) AS delta
+    WHERE tags.id = delta.tag_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql"""
+    )
+    op.execute(
+        """CREATE OR REPLACE FUNCTION skill_tree_tags_count_delete() RETURNS trigger AS $$
+BEGIN
+    -- Verrous pris par id croissant : deux écritures partageant des tags ne s'interbloquent pas
+    PERFORM 1 FROM tags WHERE id IN (SELECT tag_id FROM deleted_rows) ORDER BY id FOR NO KEY UPDATE;
+    UPDATE tags SET usage_count = tags.usage_count - delta.n
+    FROM (SELECT tag_id, COUNT(*) AS n FROM deleted_rows GROUP BY tag_id) AS delta
+    WHERE tags.id = delta.tag_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql"""
+    )
+    op.execute(
+        """CREATE TRIGGER skill_tree_tags_count_insert AFTER INSERT ON skill_tree_tags
+    REFERENCING NEW TABLE AS inserted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION skill_tree_tags_count_insert()"""
+    )
+    op.execute(
+        """CREATE TRIGGER skill_tree_tags_count_delete AFTER DELETE ON skill_tree_tags
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION skill_tree_tags_count_delete()"""
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS skill_tree_tags_count_delete ON skill_tree_tags")
+    op.execute("DROP TRIGGER IF EXISTS skill_tree_tags_count_insert ON skill_tree_tags")
+    op.execute("DROP FUNCTION IF EXISTS skill_tree_tags_count_delete()")
+    op.execute("DROP FUNCTION IF EXISTS skill_tree_tags_count_insert()")
+    op.drop_index("idx_tags_name_pattern", table_name="tags")
+    op.drop_index("idx_tags_usage_count", table_name="tags")
+    op.drop_column("tags", "usage_count")
@@ -0,0 +1,29 @@
+"""add_users_checks_version
+
+Revision ID: f6c2a8d4b913
+Revises: e4a7c9d2b851
+Create Date: 2026-10-17 22:14:03.118452
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f6c2a8d4b913"
+down_revision: str | Sequence[str] | None = "e4a7c9d2b851"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("users", sa.Column("checks_version", sa.Integer(), server_default=sa.text("1"), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "checks_version")
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 # --- AI / LLM ---
 MODEL_ANTHROPIC = "claude-haiku-4-5-20251001"
 MODEL_OPENAI = "gpt-4o-mini"
@@ -26,8 +28,75 @@ AGENT_TIMEOUT_BUDGET = 90.0
 EMBEDDING_MODEL = "intfloat/multilingual-e5-small"
 EMBEDDING_DIMENSIONS = 384
 EMBEDDING_BATCH_SIZE = 50  # pour le backfill
+EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS = "sentence-transformers"  # PyTorch, modèle de référence
+EMBEDDING_BACKEND_ONNX = "onnx"  # ONNX Runtime, poids quantifiés int8 (scripts/export_onnx_embedding_model.py)
+EMBEDDING_ONNX_DIR = "models/multilingual-e5-small-onnx"  # model_int8.onnx + tokenizer.json
+EMBEDDING_MAX_TOKENS = 512  # comme max_seq_length du modèle sentence-transformers
+EMBEDDING_WORKERS = 1  # threads d'encodage (surcharge : EMBEDDING_WORKERS)
+EMBEDDING_MAX_QUEUE = 256  # textes en attente ou en cours d'encodage au-delà desquels on refuse
+EMBEDDING_BATCH_WINDOW = 0.005  # secondes d'attente maximale pour regrouper des encodages concurrents
+EMBEDDING_BATCH_MAX_SIZE = 32  # textes par appel encode(list)
+EMBEDDING_TIMEOUT = 10.0  # secondes d'attente maximale d'un encodage (surcharge : EMBEDDING_TIMEOUT)
+EMBEDDING_LOAD_RETRY_BASE = 5.0  # secondes avant de retenter un chargement du modèle en échec, doublées ensuite
+EMBEDDING_LOAD_RETRY_MAX = 300.0  # délai maximal entre deux tentatives de chargement
+
+# --- File d'attente des embeddings (embedding_jobs) ---
+EMBEDDING_JOB_DEBOUNCE = 2.0  # secondes sans écriture avant d'encoder un arbre (sauvegardes regroupées)
+EMBEDDING_JOB_POLL_INTERVAL = 1.0  # secondes entre deux passes du worker quand la file est vide
+EMBEDDING_JOB_BATCH_SIZE = 32  # arbres réclamés par passe, encodés ensemble (micro-batch)
+EMBEDDING_JOB_LEASE = 300  # secondes ; le job d'un worker disparu redevient disponible ensuite
+EMBEDDING_JOB_MAX_ATTEMPTS = 6  # tentatives avant l'état dead
+EMBEDDING_JOB_RETRY_BASE = 10.0  # secondes avant la 2e tentative, doublées à chaque échec
+EMBEDDING_JOB_RETRY_MAX = 3600.0  # délai maximal entre deux tentatives
 
 # --- Auth / Cookies ---
 ACCESS_TOKEN_MAX_AGE = 900  # 15 minutes
 REFRESH_TOKEN_MAX_AGE = 7 * 24 * 60 * 60  # 7 jours
 COOKIE_SAMESITE = "strict"
+
+# --- Caches en mémoire ---
+GRAPH_CACHE_MAX_BYTES = 64 * 1024 * 1024  # graphes des arbres les plus lus
+RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # JSON pré-encodé de GET /skill-trees/{id}
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 2_000  # vecteurs de requêtes de recherche (~3 Ko chacun)
+QUERY_EMBEDDING_CACHE_TTL = 24 * 60 * 60  # secondes ; 0 : pas d'expiration
+QUERY_EMBEDDING_WARMUP_COUNT = 200  # requêtes les plus fréquentes encodées au démarrage
+QUERY_STATS_FLUSH_INTERVAL = 60  # secondes entre deux écritures des compteurs de requêtes
+QUERY_STATS_MAX_PENDING = 10_000  # requêtes distinctes comptées en mémoire entre deux écritures
+
+# --- Progression des utilisateurs ---
+PROGRESS_CACHE_TTL = 60  # secondes ; les checks changent la version, le TTL couvre les éditions d'arbres
+PROGRESS_CACHE_MAX_ENTRIES = 20_000  # entrées au total, tous utilisateurs confondus
+PROGRESS_CACHE_MAX_ENTRIES_PER_USER = 16  # filtres tree_ids distincts gardés par utilisateur
+PROGRESS_MAX_TREES = 100  # arbres demandés au maximum via tree_ids
+
+# --- Checks en écriture différée (CHECK_WRITE_BEHIND=true) ---
+CHECK_FLUSH_INTERVAL = 0.2  # secondes entre deux flushs
+CHECK_FLUSH_MAX_OPS = 500  # flush anticipé au-delà de ce nombre de (user, skill) en attente
+
+# --- Listings ---
+LISTING_PAGE_SIZE = 50  # taille de page par défaut
+LISTING_MAX_PAGE_SIZE = 100
+LISTING_MAX_TAGS = 10  # tags combinables dans un filtre
+TAG_FACETS_LIMIT = 20  # facettes renvoyées par /skill-trees/browse
+
+# --- Arbres liés (expand_links) ---
+LINKED_TREES_MAX_DEPTH = 5  # niveaux de liens suivis au maximum
+LINKED_TREES_MAX_COUNT = 100  # arbres liés renvoyés au maximum, les plus proches d'abord
+
+# --- Recherche plein texte (search_vector) ---
+SEARCH_VECTOR_DEBOUNCE = 2.0  # secondes sans écriture avant de reconstruire le search_vector d'un arbre
+SEARCH_VECTOR_REFRESH_INTERVAL = 1.0  # secondes entre deux passes du job
+SEARCH_VECTOR_BATCH_SIZE = 500  # arbres reconstruits par transaction
+
+# --- Tendances ---
+# Périodes de TrendingPeriod (d, w, m) et fenêtre couverte par chacune
+TRENDING_PERIODS = {"d": timedelta(days=1), "w": timedelta(days=7), "m": timedelta(days=30)}
+TRENDING_REFRESH_INTERVAL = 300  # secondes entre deux recalculs des scores
+TRENDING_TOP_N = 100  # arbres conservés par période (et taille max d'une réponse)
+TRENDING_PAGE_SIZE = 20
+TRENDING_HALF_LIFE_RATIO = 0.25  # demi-vie du score amorti, en fraction de la période
+
+# --- Export / import ---
+EXPORT_BATCH_SIZE = 500  # arbres lus par aller-retour du curseur serveur
+IMPORT_BATCH_SIZE = 1000  # arbres chargés par transaction lors d'un import
+IMPORT_MAX_LINE_BYTES = 8 * 1024 * 1024  # taille max d'une ligne NDJSON importée
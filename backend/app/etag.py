@@ -0,0 +1,22 @@
+"""ETags forts et réponses 304 pour les GET conditionnels."""
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    """ETag fort construit à partir de versions (arbre, collection, ...)."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match du client contient l'ETag courant."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Réponse 304 sans corps."""
+    return Response(status_code=304, headers={"ETag": etag})
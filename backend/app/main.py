@@ -16,14 +16,30 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.database import engine, get_db
+from app.database import async_session, engine, get_db
 from app.limiter import limiter
 from app.metrics import counter_rate_limit_exceeded, db_pool_checked_out, instrumentator
 from app.routers.ai import router as ai_router
 from app.routers.api_keys import router as api_keys_router
 from app.routers.search import router as search_router
 from app.routers.skill_trees import router as skill_trees_router
+from app.routers.tags import router as tags_router
 from app.routers.user import router as user_router
+from app.services.check_buffer import WRITE_BEHIND_ENABLED, flush_check_buffer, run_check_flusher
+from app.services.embedding_job_service import get_embedding_queue_stats, run_embedding_worker
+from app.services.embedding_service import (
+    embedding_backend_name,
+    embedding_model_status,
+    run_embedding_model_loader,
+    shutdown_embedding_executor,
+)
+from app.services.query_embedding_cache import (
+    flush_query_stats,
+    run_query_embedding_warmup,
+    run_query_stats_flusher,
+)
+from app.services.search_vector_service import run_search_vector_refresher
+from app.services.trending_service import run_trending_refresher
 from app.tracing import setup_tracing
 
 json_handler = logging.StreamHandler()
@@ -49,10 +65,38 @@ async def lifespan(app: FastAPI):
             await asyncio.sleep(15)
 
     task = asyncio.create_task(monitor_db_pool())
+    trending_task = asyncio.create_task(run_trending_refresher())
+    search_vector_task = asyncio.create_task(run_search_vector_refresher())
+    query_stats_task = asyncio.create_task(run_query_stats_flusher())
+    # Traite embedding_jobs dès que le modèle est prêt (les jobs survivent aux redémarrages)
+    embedding_worker_task = asyncio.create_task(run_embedding_worker())
+
+    async def warm_up():
+        # Le modèle se charge hors de la boucle : l'application sert déjà (recherche plein texte seule)
+        await run_embedding_model_loader()
+        await run_query_embedding_warmup()
+
+    warmup_task = asyncio.create_task(warm_up())
+    flusher_task = asyncio.create_task(run_check_flusher()) if WRITE_BEHIND_ENABLED else None
     yield
     # Arrêt de l'application
     logger.info("Arrêt de l'application...")
     task.cancel()
+    trending_task.cancel()
+    search_vector_task.cancel()
+    warmup_task.cancel()
+    embedding_worker_task.cancel()
+    query_stats_task.cancel()
+    with suppress(Exception):
+        async with async_session() as session:
+            await flush_query_stats(session)
+    if flusher_task is not None:
+        flusher_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await flusher_task
+        # Les checks acquittés mais pas encore écrits ne doivent pas être perdus
+        await flush_check_buffer()
+    shutdown_embedding_executor()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -129,7 +173,8 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type"],
+    allow_headers=["Content-Type", "If-None-Match"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 
@@ -167,6 +212,7 @@ app.include_router(api_keys_router)
 app.include_router(user_router)
 app.include_router(ai_router)
 app.include_router(search_router)
+app.include_router(tags_router)
 
 instrumentator.instrument(app).expose(app, endpoint="/metrics", include_in_schema=False)
 
@@ -200,5 +246,17 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         checks["checks"]["db_pool"] = {"status": "error", "error": str(e)}
 
+    # Modèle d'embedding : en chargement, la recherche reste servie en plein texte seul
+    model_status = embedding_model_status()
+    checks["checks"]["embedding_model"] = {"status": model_status, "backend": embedding_backend_name()}
+    if model_status == "error":
+        checks["status"] = "degraded"
+
+    # File des embeddings : profondeur et âge du plus ancien job (fraîcheur des embeddings)
+    try:
+        checks["checks"]["embedding_jobs"] = await get_embedding_queue_stats(db)
+    except Exception as e:
+        checks["checks"]["embedding_jobs"] = {"status": "error", "error": str(e)}
+
     status_code = 200 if checks["status"] == "ok" else 503
     return JSONResponse(content=checks, status_code=status_code)
@@ -79,6 +79,7 @@ agent_fallback_total = Counter(
 
 # --- Embedding / Search metrics ---
 
+# status : success, error, ou skipped (texte et modèle inchangés, cf. embedding_hash)
 embedding_requests_total = Counter(
     "embedding_requests_total",
     "Total embedding generation calls",
@@ -91,6 +92,58 @@ embedding_duration_seconds = Histogram(
     buckets=(0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0),
 )
 
+embedding_queue_depth = Gauge(
+    "embedding_queue_depth",
+    "Embedding encodings waiting for or running on the embedding executor",
+)
+
+embedding_queue_wait_seconds = Histogram(
+    "embedding_queue_wait_seconds",
+    "Time an encoding waited for a free embedding executor thread",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+embedding_batch_size = Histogram(
+    "embedding_batch_size",
+    "Texts encoded per micro-batched encode call",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+embedding_rejections_total = Counter(
+    "embedding_rejections_total",
+    "Encodings refused (executor queue full) or abandoned (timeout)",
+    ["reason"],
+)
+
+# --- Embedding job queue (embedding_jobs) ---
+
+embedding_jobs_pending = Gauge(
+    "embedding_jobs_pending",
+    "Skill trees waiting for an embedding (pending jobs, including retries)",
+)
+
+embedding_jobs_dead = Gauge(
+    "embedding_jobs_dead",
+    "Embedding jobs that exhausted their attempts",
+)
+
+embedding_jobs_oldest_age_seconds = Gauge(
+    "embedding_jobs_oldest_age_seconds",
+    "Age of the oldest pending embedding job (embedding staleness upper bound)",
+)
+
+embedding_jobs_processed_total = Counter(
+    "embedding_jobs_processed_total",
+    "Embedding jobs processed by the worker",
+    ["result"],  # done, retry, dead
+)
+
+embedding_job_lag_seconds = Histogram(
+    "embedding_job_lag_seconds",
+    "Time from the first write of a tree to its embedding",
+    buckets=(1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+
 search_requests_total = Counter(
     "search_requests_total",
     "Total semantic search requests",
@@ -102,3 +155,41 @@ search_duration_seconds = Histogram(
     "Search request duration in seconds",
     buckets=(0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0),
 )
+
+search_vector_rebuilds_total = Counter(
+    "search_vector_rebuilds_total",
+    "Skill trees whose full-text search_vector was rebuilt by the background job",
+)
+
+# --- Write-behind buffer of skill checks ---
+
+check_buffer_pending = Gauge(
+    "check_buffer_pending",
+    "Skill check toggles acknowledged but not yet written to the database",
+)
+
+check_buffer_flushes_total = Counter(
+    "check_buffer_flushes_total",
+    "Flushes of the skill check write-behind buffer",
+    ["status"],
+)
+
+# --- In-process caches ---
+
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "In-process cache lookups",
+    ["cache", "result"],
+)
+
+cache_evictions_total = Counter(
+    "cache_evictions_total",
+    "Entries evicted from an in-process cache to stay under its memory budget",
+    ["cache"],
+)
+
+cache_size_bytes = Gauge(
+    "cache_size_bytes",
+    "Estimated memory held by an in-process cache",
+    ["cache"],
+)
@@ -0,0 +1,12 @@
+from sqlalchemy import String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base_model import BaseModel
+
+
+class CollectionVersion(BaseModel):
+    """Model representing the version of a collection (listings), bumped on every listing-visible write."""
+
+    __tablename__ = "collection_versions"
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(default=1, server_default=text("1"))
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base_model import BaseModel
+
+
+class EmbeddingJob(BaseModel):
+    """Model representing a pending (or dead) embedding generation of a skill tree."""
+
+    __tablename__ = "embedding_jobs"
+    __table_args__ = (
+        # Jobs échus, réclamés par le worker ; les jobs dead n'y figurent pas
+        Index("idx_embedding_jobs_run_at", "run_at", postgresql_where=text("status = 'pending'")),
+    )
+    # Une ligne par arbre : les écritures rapprochées se fondent en un seul job
+    skill_tree_id: Mapped[int] = mapped_column(ForeignKey("skill_trees.id", ondelete="CASCADE"), primary_key=True)
+    status: Mapped[str] = mapped_column(String(10), default="pending", server_default=text("'pending'"))
+    # Incrémentée à chaque écriture de l'arbre : un job réécrit pendant l'encodage n'est pas supprimé
+    generation: Mapped[int] = mapped_column(default=1, server_default=text("1"))
+    attempts: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    run_at: Mapped[datetime] = mapped_column(server_default=text("CURRENT_TIMESTAMP"))
+    # Première écriture non encore encodée (âge de la file, fraîcheur des embeddings)
+    enqueued_at: Mapped[datetime] = mapped_column(server_default=text("CURRENT_TIMESTAMP"))
+    # Bail du worker qui traite le job ; NULL : libre
+    locked_until: Mapped[datetime | None]
+    last_error: Mapped[str | None] = mapped_column(Text)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base_model import BaseModel
+
+
+class SearchQueryStat(BaseModel):
+    """Model representing how often a normalized search query was made (cache warm-up)."""
+
+    __tablename__ = "search_query_stats"
+    __table_args__ = (Index("idx_search_query_stats_hits", "hits"),)
+    # Requête normalisée (casse, espaces, accents) : clé du cache des vecteurs de requête
+    query_key: Mapped[str] = mapped_column(String(200), primary_key=True)
+    # Dernière forme saisie, encodée au préchauffage
+    query: Mapped[str] = mapped_column(String(200))
+    hits: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    last_seen_at: Mapped[datetime] = mapped_column(server_default=text("CURRENT_TIMESTAMP"))
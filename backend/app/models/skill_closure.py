@@ -0,0 +1,18 @@
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base_model import BaseModel
+
+
+class SkillClosure(BaseModel):
+    """Transitive closure of skill_dependencies: ancestor (directly or not) unlocks descendant."""
+
+    __tablename__ = "skill_closure"
+    __table_args__ = (
+        Index("idx_skill_closure_descendant_id", "descendant_id"),
+        Index("idx_skill_closure_skill_tree_id", "skill_tree_id"),
+    )
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True)
+    skill_tree_id: Mapped[int] = mapped_column(ForeignKey("skill_trees.id", ondelete="CASCADE"))
+    depth: Mapped[int]
@@ -1,8 +1,8 @@
 from datetime import datetime
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Column, ForeignKey, Index, String, Text, text
-from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.constants import EMBEDDING_DIMENSIONS
@@ -25,17 +25,39 @@ class SkillTree(BaseModel):
             postgresql_ops={"embedding": "vector_cosine_ops"},
         ),
         Index("idx_skill_trees_search_vector", "search_vector", postgresql_using="gin"),
+        # Pagination par keyset des listings
+        Index("idx_skill_trees_created_at_id", "created_at", "id"),
+        Index("idx_skill_trees_creator_created_at_id", "creator_username", "created_at", "id"),
+        # Export incrémental (updated_since)
+        Index("idx_skill_trees_updated_at", "updated_at"),
+        # Filtrage multi-tags (@> et &&) et facettes
+        Index("idx_skill_trees_tag_ids", "tag_ids", postgresql_using="gin"),
+        # Arbres en attente de reconstruction du search_vector
+        Index(
+            "idx_skill_trees_search_vector_dirty_at",
+            "search_vector_dirty_at",
+            postgresql_where=text("search_vector_dirty_at IS NOT NULL"),
+        ),
     )
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), unique=True)
     description: Mapped[str | None] = mapped_column(Text)
     creator_username: Mapped[str] = mapped_column(ForeignKey("users.username", ondelete="CASCADE"))
     created_at: Mapped[datetime] = mapped_column(server_default=text("CURRENT_TIMESTAMP"))
+    # Incrémentée à chaque écriture (concurrence optimiste, invalidation des caches)
+    version: Mapped[int] = mapped_column(default=1, server_default=text("1"))
+    updated_at: Mapped[datetime] = mapped_column(server_default=text("CURRENT_TIMESTAMP"))
+    # Copie dénormalisée des ids de skill_tree_tags, triés ; maintenue par _sync_tags
+    tag_ids: Mapped[list[int]] = mapped_column(ARRAY(Integer), default=list, server_default=text("'{}'"))
 
     # Semantic search: embedding vector from local model
     embedding: Mapped[list[float] | None] = mapped_column(Vector(EMBEDDING_DIMENSIONS), nullable=True, default=None)
+    # sha256 du texte encodé et du modèle (embedding_input_hash) : saute les ré-encodages inutiles
+    embedding_hash: Mapped[str | None] = mapped_column(String(64))
     # Full-text search: PostgreSQL tsvector
     search_vector = Column(TSVECTOR, nullable=True)
+    # Dernière écriture non encore reflétée dans search_vector (NULL : à jour) ; voir search_vector_service
+    search_vector_dirty_at: Mapped[datetime | None] = mapped_column(server_default=text("CURRENT_TIMESTAMP"))
 
     skills: Mapped[list["Skill"]] = relationship(foreign_keys=[Skill.skill_tree_id], cascade="all, delete-orphan")
     tags: Mapped[list["Tag"]] = relationship(
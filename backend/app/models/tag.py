@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import DDL, ForeignKey, Index, String, event, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base_model import BaseModel
@@ -8,8 +8,15 @@ class Tag(BaseModel):
     """Model representing a tag."""
 
     __tablename__ = "tags"
+    __table_args__ = (
+        Index("idx_tags_usage_count", "usage_count"),
+        # Recherche par préfixe (LIKE 'py%') indépendante de la collation
+        Index("idx_tags_name_pattern", "name", postgresql_ops={"name": "varchar_pattern_ops"}),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(30), unique=True, index=True)
+    # Nombre d'arbres portant le tag, maintenu par les triggers de skill_tree_tags
+    usage_count: Mapped[int] = mapped_column(default=0, server_default=text("0"))
 
 
 class SkillTreeTag(BaseModel):
@@ -18,3 +25,39 @@ class SkillTreeTag(BaseModel):
     __tablename__ = "skill_tree_tags"
     skill_tree_id: Mapped[int] = mapped_column(ForeignKey("skill_trees.id", ondelete="CASCADE"), primary_key=True)
     tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
+
+
+# Triggers par instruction (tables de transition) : un UPDATE de tags par INSERT ou
+# DELETE sur skill_tree_tags, y compris les suppressions en cascade d'un arbre.
+# Repris à l'identique dans la migration add_tags_usage_count.
+_USAGE_COUNT_DDL = (
+    """CREATE OR REPLACE FUNCTION skill_tree_tags_count_insert() RETURNS trigger AS $$
+BEGIN
+    -- Verrous pris par id croissant : deux écritures partageant des tags ne s'interbloquent pas
+    PERFORM 1 FROM tags WHERE id IN (SELECT tag_id FROM inserted_rows) ORDER BY id FOR NO KEY UPDATE;
+    UPDATE tags SET usage_count = tags.usage_count + delta.n
+    FROM (SELECT tag_id, COUNT(*) AS n FROM inserted_rows GROUP BY tag_id) AS delta
+    WHERE tags.id = delta.tag_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION skill_tree_tags_count_delete() RETURNS trigger AS $$
+BEGIN
+    -- Verrous pris par id croissant : deux écritures partageant des tags ne s'interbloquent pas
+    PERFORM 1 FROM tags WHERE id IN (SELECT tag_id FROM deleted_rows) ORDER BY id FOR NO KEY UPDATE;
+    UPDATE tags SET usage_count = tags.usage_count - delta.n
+    FROM (SELECT tag_id, COUNT(*) AS n FROM deleted_rows GROUP BY tag_id) AS delta
+    WHERE tags.id = delta.tag_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER skill_tree_tags_count_insert AFTER INSERT ON skill_tree_tags
+    REFERENCING NEW TABLE AS inserted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION skill_tree_tags_count_insert()""",
+    """CREATE TRIGGER skill_tree_tags_count_delete AFTER DELETE ON skill_tree_tags
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION skill_tree_tags_count_delete()""",
+)
+
+for _statement in _USAGE_COUNT_DDL:
+    event.listen(SkillTreeTag.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base_model import BaseModel
+
+
+class TrendingHourly(BaseModel):
+    """Model representing the hourly activity rollup of a skill tree (favorites and checks)."""
+
+    __tablename__ = "trending_hourly"
+    __table_args__ = (Index("idx_trending_hourly_hour", "hour"),)
+    skill_tree_id: Mapped[int] = mapped_column(ForeignKey("skill_trees.id", ondelete="CASCADE"), primary_key=True)
+    hour: Mapped[datetime] = mapped_column(primary_key=True)
+    # Utilisateurs distincts ayant mis l'arbre en favori / coché un de ses skills pendant l'heure
+    favorites: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+    checkers: Mapped[int] = mapped_column(default=0, server_default=text("0"))
+
+
+class TrendingScore(BaseModel):
+    """Model representing the precomputed trending score of a skill tree for a period."""
+
+    __tablename__ = "trending_scores"
+    __table_args__ = (
+        Index("idx_trending_scores_period_score", "period", "score"),
+        Index("idx_trending_scores_period_decayed_score", "period", "decayed_score"),
+    )
+    period: Mapped[str] = mapped_column(String(1), primary_key=True)
+    skill_tree_id: Mapped[int] = mapped_column(ForeignKey("skill_trees.id", ondelete="CASCADE"), primary_key=True)
+    score: Mapped[float]
+    decayed_score: Mapped[float]
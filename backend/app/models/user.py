@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import String, Text, func
+from sqlalchemy import String, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base_model import BaseModel
@@ -17,3 +17,5 @@ class User(BaseModel):
     bio: Mapped[str | None] = mapped_column(Text, nullable=True)
     avatar_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
     created_at: Mapped[datetime | None] = mapped_column(server_default=func.now())
+    # Incrémentée à chaque écriture sur ses checks : valide le cache de progression
+    checks_version: Mapped[int] = mapped_column(default=1, server_default=text("1"))
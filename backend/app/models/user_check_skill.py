@@ -13,6 +13,7 @@ class UserCheckSkill(BaseModel):
     __table_args__ = (
         UniqueConstraint("user_id", "skill_id", name="user_check_skill_user_id_skill_id_key"),
         Index("ix_user_check_skill_skill_id", "skill_id"),
+        Index("idx_user_check_skill_created_at", "created_at"),
     )
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -4,42 +4,84 @@
 
 # ========== IMPORTS ==========
 
+import hashlib
+from datetime import UTC, datetime
+
 # FastAPI core
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 
 # SQLAlchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.constants import (
+    LINKED_TREES_MAX_DEPTH,
+    LISTING_MAX_PAGE_SIZE,
+    LISTING_MAX_TAGS,
+    LISTING_PAGE_SIZE,
+    TAG_FACETS_LIMIT,
+    TRENDING_PAGE_SIZE,
+    TRENDING_TOP_N,
+)
+
 # Database
 from app.database import get_db
+from app.etag import is_not_modified, make_etag, not_modified
+from app.limiter import limiter
 
 # Schemas
+from app.schemas.skill import LearningPathSchema, SkillRelativeSchema
 from app.schemas.skill_tree import (
+    SkillTreeBrowseSchema,
     SkillTreeCreateSchema,
     SkillTreeCreateWithoutUsernameSchema,
     SkillTreeDetailSchema,
+    SkillTreeExpandedSchema,
+    SkillTreeImportResultSchema,
+    SkillTreePatchResultSchema,
+    SkillTreePatchSchema,
     SkillTreeSaveSchema,
     SkillTreeSimpleSchema,
     SkillTreeUpdateSchema,
 )
 from app.services.auth_service import get_current_user
+from app.services.closure_service import get_ancestors, get_descendants
+from app.services.collection_version_service import (
+    CATALOGUE_KEY,
+    TRENDING_KEY,
+    favorites_key,
+    get_collection_versions,
+)
+from app.services.export_service import ExportFilters, stream_skill_trees_ndjson
 from app.services.favorite_service import (
     add_user_favorite_tree,
     delete_user_favorite_tree,
 )
+from app.services.import_service import import_skill_trees_ndjson, iter_ndjson_lines
+from app.services.learning_path_service import plan_learning_path
 
 # Services
 from app.services.skill_tree_service import (
+    LISTING_FIELDS,
+    TagMatch,
+    TreePage,
+    TreePageParams,
+    TreeSort,
     TrendingPeriod,
-    _safe_embed,
+    browse_skill_trees,
     create_skill_tree,
     delete_skill_tree,
     get_all,
-    get_by_id,
+    get_detail_json,
+    get_expanded_by_id,
+    get_linked_tree_versions,
     get_list_of_skill_trees_by_username,
     get_trendings,
     get_user_favorite_trees,
+    get_version,
     is_user_authorized_for_editing,
+    patch_skill_tree,
     save_skill_tree,
     update_skill_tree,
 )
@@ -53,6 +95,44 @@ router = APIRouter(
 )
 
 
+# ========== PAGINATION ==========
+
+
+def get_page_params(
+    sort: TreeSort = TreeSort.RECENT,
+    limit: int = Query(LISTING_PAGE_SIZE, ge=1, le=LISTING_MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="Valeur de l'en-tête X-Next-Cursor de la page précédente"),
+    fields: str | None = Query(None, description="Champs à renvoyer, séparés par des virgules (ex: id,name,tags)"),
+) -> TreePageParams:
+    """Dépendance commune aux listings paginés."""
+    selected = None
+    if fields:
+        selected = frozenset(f.strip() for f in fields.split(",") if f.strip())
+        unknown = selected - LISTING_FIELDS
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Champs inconnus : {', '.join(sorted(unknown))}")
+    return TreePageParams(sort=sort, limit=limit, cursor=cursor, fields=selected)
+
+
+def get_tag_filter(
+    tag: str | None = None,
+    tags: list[str] = Query([], description="Tags à combiner (paramètre répétable), selon match"),
+) -> list[str]:
+    """Dépendance commune aux filtres par tags ; tag est conservé pour compatibilité."""
+    tags = [tag, *tags] if tag else tags
+    if len(tags) > LISTING_MAX_TAGS:
+        raise HTTPException(status_code=400, detail=f"Maximum {LISTING_MAX_TAGS} tags autorisés")
+    return tags
+
+
+def _page_response(page: TreePage, etag: str) -> JSONResponse:
+    """Éléments de la page (seulement les champs demandés), curseur suivant dans X-Next-Cursor."""
+    headers = {"ETag": etag}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return JSONResponse(jsonable_encoder(page.items), headers=headers)
+
+
 # ========== ROUTES STATIQUES (sans paramètre dynamique) ==========
 
 
@@ -60,25 +140,69 @@ router = APIRouter(
     "/",
     response_model=list[SkillTreeSimpleSchema],
     summary="Get all skill trees",
-    description="Retrieve a list of all skill trees available, optionally filtered by tag",
+    description=(
+        "Retrieve a page of skill trees, optionally filtered by tags (all of them, or any with match=any). "
+        "The next page cursor is in X-Next-Cursor"
+    ),
 )
 async def get_all_skill_trees(
-    tag: str | None = None,
+    request: Request,
+    tags: list[str] = Depends(get_tag_filter),
+    match: TagMatch = TagMatch.ALL,
+    params: TreePageParams = Depends(get_page_params),
     db: AsyncSession = Depends(get_db),
 ):
-    """Endpoint pour récupérer tous les skill trees, avec filtrage optionnel par tag."""
-    result = await get_all(db, tag=tag)
-    return result
+    """Endpoint pour récupérer tous les skill trees, avec filtrage optionnel par tags."""
+    etag = make_etag("c", *await get_collection_versions(db, [CATALOGUE_KEY]))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    page = await get_all(db, tags=tags, params=params, match=match)
+    return _page_response(page, etag)
+
+
+@router.get(
+    "/browse",
+    response_model=SkillTreeBrowseSchema,
+    summary="Browse skill trees by tags",
+    description=(
+        "Retrieve a page of skill trees filtered by tags, with the tag facets (tree counts) of the whole filter. "
+        "The next page cursor is in X-Next-Cursor"
+    ),
+)
+async def browse_skill_trees_endpoint(
+    request: Request,
+    tags: list[str] = Depends(get_tag_filter),
+    match: TagMatch = TagMatch.ALL,
+    facets_limit: int = Query(TAG_FACETS_LIMIT, ge=1, le=100),
+    params: TreePageParams = Depends(get_page_params),
+    db: AsyncSession = Depends(get_db),
+):
+    """Endpoint de navigation par tags : page d'arbres et facettes en une seule requête."""
+    etag = make_etag("b", *await get_collection_versions(db, [CATALOGUE_KEY]))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    page, facets = await browse_skill_trees(db, tags, params=params, match=match, facets_limit=facets_limit)
+    headers = {"ETag": etag}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return JSONResponse(jsonable_encoder({"items": page.items, "facets": facets}), headers=headers)
 
 
 @router.get(
     "/trendings",
     response_model=list[SkillTreeSimpleSchema],
     summary="Get trending skill trees",
-    description="Retrieve a list of trending skill trees based on user favorites and checked skills in the last 7 days",
+    description=(
+        "Retrieve the top trending skill trees based on user favorites and checked skills over the period, "
+        "optionally with time-decayed scores"
+    ),
 )
 async def get_trending_skill_trees_endpoint(
+    request: Request,
+    response: Response,
     timestamp: TrendingPeriod = TrendingPeriod.WEEK,
+    limit: int = Query(TRENDING_PAGE_SIZE, ge=1, le=TRENDING_TOP_N),
+    decay: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -86,60 +210,91 @@ async def get_trending_skill_trees_endpoint(
 
     Args:
         timestamp: Période de temps pour déterminer les tendances (w: semaine, d: jour, m: mois)
+        limit: Nombre d'arbres renvoyés
+        decay: Classer par score amorti
 
     Returns:
          Liste des skill trees tendances au format SkillTreeSimpleSchema
     """
-    return await get_trendings(db, timestamp)
+    # Les scores ne changent qu'à chaque recalcul du job de tendances
+    catalogue, trending = await get_collection_versions(db, [CATALOGUE_KEY, TRENDING_KEY])
+    etag = make_etag("c", catalogue, "t", trending)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return await get_trendings(db, timestamp, limit=limit, decay=decay)
 
 
 @router.get(
     "/skill-trees-user",
     response_model=list[SkillTreeSimpleSchema],
     summary="Get all skill trees of a user",
-    description="Retrieve a list of all skill trees of a user",
+    description="Retrieve a page of the skill trees of a user. The next page cursor is in X-Next-Cursor",
 )
 async def get_all_skill_trees_by_username(
+    request: Request,
     username: str,
+    params: TreePageParams = Depends(get_page_params),
     db: AsyncSession = Depends(get_db),
 ):
     """Endpoint pour récupérer tous les skill trees d'un utilisateur."""
-    result = await get_list_of_skill_trees_by_username(db, username)
-    return result
+    etag = make_etag("c", *await get_collection_versions(db, [CATALOGUE_KEY]))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    page = await get_list_of_skill_trees_by_username(db, username, params)
+    return _page_response(page, etag)
 
 
 @router.get(
     "/my-skill-trees",
     response_model=list[SkillTreeSimpleSchema],
     summary="Get all skill trees of the current user",
-    description="Retrieve a list of all skill trees created by the currently authenticated user",
+    description=(
+        "Retrieve a page of the skill trees created by the currently authenticated user. "
+        "The next page cursor is in X-Next-Cursor"
+    ),
 )
 async def get_all_skill_trees_of_current_user(
+    request: Request,
+    params: TreePageParams = Depends(get_page_params),
     user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Endpoint pour récupérer tous les skill trees de l'utilisateur actuellement authentifié."""
+    # L'URL est la même pour tous les utilisateurs : l'ETag inclut l'id
+    etag = make_etag("c", *await get_collection_versions(db, [CATALOGUE_KEY]), "u", user_id)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
     username = await get_user_username(db, user_id)
     if username is None:
         raise HTTPException(status_code=404, detail="User not found")
-    result = await get_list_of_skill_trees_by_username(db, username)
-    return result
+    page = await get_list_of_skill_trees_by_username(db, username, params)
+    return _page_response(page, etag)
 
 
 @router.get(
     "/my-favorite-skill-trees",
     response_model=list[SkillTreeSimpleSchema],
     summary="Get all favorite skill trees of the current user",
-    description="Retrieve a list of all favorite skill trees of the currently authenticated user",
+    description=(
+        "Retrieve a page of the favorite skill trees of the currently authenticated user. "
+        "The next page cursor is in X-Next-Cursor"
+    ),
 )
 async def get_all_favorite_skill_trees_of_current_user(
+    request: Request,
+    params: TreePageParams = Depends(get_page_params),
     user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Endpoint pour récupérer tous les skill trees favoris de l'utilisateur actuellement authentifié."""
+    catalogue, favorites = await get_collection_versions(db, [CATALOGUE_KEY, favorites_key(user_id)])
+    etag = make_etag("c", catalogue, "u", user_id, "f", favorites)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
-    result = await get_user_favorite_trees(db, user_id)
-    return result
+    page = await get_user_favorite_trees(db, user_id, params)
+    return _page_response(page, etag)
 
 
 @router.post(
@@ -185,7 +340,6 @@ async def remove_skill_tree_from_favorites(
 )
 async def create_skill_tree_endpoint(
     data: SkillTreeCreateWithoutUsernameSchema,
-    background_tasks: BackgroundTasks,
     user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -202,7 +356,55 @@ async def create_skill_tree_endpoint(
             tags=data.tags,
         ),
     )
-    background_tasks.add_task(_safe_embed, result.id)
+    return result
+
+
+@router.get(
+    "/export",
+    summary="Export skill trees as NDJSON",
+    description=(
+        "Stream skill trees with their skills, dependencies and tags, one JSON object per line, "
+        "optionally filtered by creator, tag and last update"
+    ),
+    response_class=StreamingResponse,
+)
+@limiter.limit("5/minute")
+async def export_skill_trees(
+    request: Request,
+    creator: str | None = None,
+    tag: str | None = None,
+    updated_since: datetime | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Endpoint pour exporter le catalogue en NDJSON (flux, mémoire constante)."""
+    if updated_since is not None and updated_since.tzinfo is not None:
+        # updated_at est stocké sans fuseau (UTC) ; l'erreur surviendrait après l'envoi des en-têtes
+        updated_since = updated_since.astimezone(UTC).replace(tzinfo=None)
+    filters = ExportFilters(creator=creator, tag=tag, updated_since=updated_since)
+    return StreamingResponse(stream_skill_trees_ndjson(db, filters), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/import",
+    status_code=201,
+    response_model=SkillTreeImportResultSchema,
+    summary="Bulk import skill trees from NDJSON",
+    description=(
+        "Create skill trees from an NDJSON body (one tree per line, skill ids local to the line). "
+        "Invalid lines are skipped and reported; embeddings are queued and generated afterwards"
+    ),
+)
+@limiter.limit("5/minute")
+async def import_skill_trees(
+    request: Request,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Endpoint pour importer des skill trees en masse (corps NDJSON lu en flux)."""
+    user_username = await get_user_username(db, user_id)
+    if user_username is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    result = await import_skill_trees_ndjson(db, iter_ndjson_lines(request.stream()), user_username)
     return result
 
 
@@ -211,19 +413,99 @@ async def create_skill_tree_endpoint(
 
 @router.get(
     "/{id}",
-    response_model=SkillTreeDetailSchema,
+    response_model=SkillTreeDetailSchema | SkillTreeExpandedSchema,
     summary="Get skill tree details",
-    description="Retrieve detailed information about a specific skill tree by its ID",
+    description=(
+        "Retrieve detailed information about a specific skill tree by its ID. "
+        "With expand_links, also return every tree reachable through linked skills, up to that many links away"
+    ),
 )
 async def get_skill_tree_details(
     id: int,
+    request: Request,
+    expand_links: int | None = Query(None, ge=1, le=LINKED_TREES_MAX_DEPTH),
     db: AsyncSession = Depends(get_db),
 ):
-    """Endpoint pour récupérer les détails d'un skill tree spécifique."""
-    result = await get_by_id(db, id)
-    if result is None:
+    """Endpoint pour récupérer les détails d'un skill tree spécifique (JSON pré-encodé, mis en cache)."""
+    if expand_links is not None:
+        return await _get_expanded_details(id, expand_links, request, db)
+
+    version = await get_version(db, id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Skill tree not found")
-    return result
+    etag = make_etag("t", id, version)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    body = await get_detail_json(db, id, version)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Skill tree not found")
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+async def _get_expanded_details(id: int, depth: int, request: Request, db: AsyncSession) -> Response:
+    """Arbre et arbres liés en une réponse ; l'ETag dépend des versions de tous les arbres renvoyés."""
+    linked_trees = await get_linked_tree_versions(db, id, depth)
+    if not linked_trees:
+        raise HTTPException(status_code=404, detail="Skill tree not found")
+    digest = hashlib.sha1(repr(linked_trees).encode(), usedforsecurity=False).hexdigest()[:16]
+    etag = make_etag("x", id, depth, digest)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    expanded = await get_expanded_by_id(db, linked_trees)
+    if expanded is None:
+        raise HTTPException(status_code=404, detail="Skill tree not found")
+    return Response(content=expanded.model_dump_json(), media_type="application/json", headers={"ETag": etag})
+
+
+@router.get(
+    "/{id}/skills/{skill_id}/ancestors",
+    response_model=list[SkillRelativeSchema],
+    summary="Get skill prerequisites",
+    description="Retrieve every skill needed (directly or transitively) before a given skill, nearest first",
+)
+async def get_skill_ancestors(
+    id: int,
+    skill_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Endpoint pour récupérer tous les prérequis d'un skill."""
+    return await get_ancestors(db, id, skill_id)
+
+
+@router.get(
+    "/{id}/skills/{skill_id}/descendants",
+    response_model=list[SkillRelativeSchema],
+    summary="Get skills unlocked by a skill",
+    description="Retrieve every skill a given skill eventually unlocks, nearest first",
+)
+async def get_skill_descendants(
+    id: int,
+    skill_id: int,
+    db: AsyncSession = Depends(get_db),
+):
+    """Endpoint pour récupérer tous les skills débloqués (directement ou non) par un skill."""
+    return await get_descendants(db, id, skill_id)
+
+
+@router.get(
+    "/{id}/skills/{skill_id}/path",
+    response_model=LearningPathSchema,
+    summary="Get learning path to a skill",
+    description=(
+        "Retrieve the prerequisites the current user has not checked yet for a given skill, "
+        "in learning order, following linked trees"
+    ),
+)
+async def get_skill_learning_path(
+    id: int,
+    skill_id: int,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Endpoint pour calculer le chemin d'apprentissage de l'utilisateur vers un skill."""
+    return await plan_learning_path(db, user_id, id, skill_id)
 
 
 @router.delete(
@@ -254,7 +536,6 @@ async def delete_skill_tree_endpoint(
 async def update_skill_tree_endpoint(
     id: int,
     data: SkillTreeUpdateSchema,
-    background_tasks: BackgroundTasks,
     user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -264,7 +545,6 @@ async def update_skill_tree_endpoint(
     result = await update_skill_tree(db, id, data)
     if result is None:
         raise HTTPException(status_code=404, detail="Skill tree not found")
-    background_tasks.add_task(_safe_embed, result.id)
     return result
 
 
@@ -277,7 +557,6 @@ async def update_skill_tree_endpoint(
 async def save_skill_tree_endpoint(
     id: int,
     data: SkillTreeSaveSchema,
-    background_tasks: BackgroundTasks,
     user_id: int = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -289,10 +568,28 @@ async def save_skill_tree_endpoint(
     skill_tree = await save_skill_tree(db, data)
     if not skill_tree:
         raise HTTPException(status_code=500, detail="Skill tree could not be saved")
-    background_tasks.add_task(_safe_embed, id)
     return skill_tree
 
 
+@router.patch(
+    "/{id}/graph",
+    response_model=SkillTreePatchResultSchema,
+    summary="Patch skill tree graph",
+    description="Apply incremental graph operations (skills, edges, root, tags) to a skill tree at a given version",
+)
+async def patch_skill_tree_endpoint(
+    id: int,
+    data: SkillTreePatchSchema,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Endpoint pour appliquer des modifications incrémentales au graphe d'un skill tree."""
+    if not await is_user_authorized_for_editing_by_id(db, id, user_id):
+        raise HTTPException(status_code=403, detail="Not authorized to edit this skill tree")
+    result = await patch_skill_tree(db, id, data)
+    return result
+
+
 # ========== FONCTIONS UTILITAIRES ==========
 
 
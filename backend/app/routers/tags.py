@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.etag import is_not_modified, make_etag, not_modified
+from app.schemas.tag import TagSchema
+from app.services.collection_version_service import CATALOGUE_KEY, get_collection_versions
+from app.services.tag_service import get_tags
+
+router = APIRouter(
+    prefix="/api/v1/tags",
+    tags=["Tags"],
+)
+
+
+@router.get(
+    "/",
+    response_model=list[TagSchema],
+    summary="Get popular tags",
+    description="Retrieve the most used tags with their number of skill trees, optionally filtered by name prefix",
+)
+async def get_tags_endpoint(
+    request: Request,
+    prefix: str | None = Query(None, max_length=30),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Tags populaires ou complétion par préfixe. Endpoint public."""
+    # Les compteurs ne changent qu'avec les arbres, qui incrémentent la version du catalogue
+    etag = make_etag("tags", *await get_collection_versions(db, [CATALOGUE_KEY]))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    tags = await get_tags(db, prefix.strip().lower() if prefix else None, limit)
+    return JSONResponse(jsonable_encoder(tags), headers={"ETag": etag})
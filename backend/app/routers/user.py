@@ -6,7 +6,7 @@
 
 # FastAPI core
 
-from fastapi import APIRouter, Cookie, Depends, HTTPException, Request
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import delete as sa_delete
@@ -15,7 +15,7 @@ from sqlalchemy import func, select
 # SQLAlchemy
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.constants import ACCESS_TOKEN_MAX_AGE, COOKIE_SAMESITE, REFRESH_TOKEN_MAX_AGE
+from app.constants import ACCESS_TOKEN_MAX_AGE, COOKIE_SAMESITE, PROGRESS_MAX_TREES, REFRESH_TOKEN_MAX_AGE
 
 # Database
 from app.database import get_db
@@ -30,7 +30,10 @@ from app.schemas.user import (
     UserOneSkillCheckedSchema,
     UserPublicDetailSchema,
     UserSchema,
+    UserSkillsCheckBatchResultSchema,
+    UserSkillsCheckBatchSchema,
     UserSkillsCheckedSchema,
+    UserTreeProgressSchema,
     UserUpdateSchema,
 )
 from app.services.auth_service import (
@@ -40,8 +43,11 @@ from app.services.auth_service import (
 )
 
 # Services
+from app.services.check_buffer import flush_user_checks
+from app.services.progress_service import get_user_progress
 from app.services.user_service import (
     add_user_skill_checked,
+    apply_user_skill_checks,
     authenticate_user,
     get_user_by_id,
     get_user_public_by_username,
@@ -241,6 +247,32 @@ async def add_user_skill_checked_route(
     await add_user_skill_checked(db, user_id, data.skill_id)
 
 
+@router.post(
+    "/skills-checked/batch",
+    response_model=UserSkillsCheckBatchResultSchema,
+    summary="Check and uncheck several skills at once",
+    description=(
+        "Check and uncheck sets of skill IDs in a single transaction, optionally checking every prerequisite "
+        "of the skills to check. Returns the skills whose state actually changed"
+    ),
+)
+async def apply_user_skill_checks_route(
+    data: UserSkillsCheckBatchSchema,
+    user_id: int = Depends(get_current_user),  # Récupère l'ID de l'utilisateur à partir du token JWT
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Endpoint pour cocher et décocher plusieurs compétences en une requête.
+    Args:
+        data: IDs à cocher et à décocher, et s'il faut cocher les prérequis
+        user_id: ID de l'utilisateur
+
+    Returns:
+        Les IDs effectivement cochés et décochés
+    """
+    return await apply_user_skill_checks(db, user_id, data)
+
+
 @router.delete(
     "/skills-checked/{skill_id}",
     status_code=204,
@@ -262,6 +294,36 @@ async def remove_user_skill_checked_route(
     await remove_user_skill_checked(db, user_id, skill_id)
 
 
+@router.get(
+    "/progress",
+    response_model=list[UserTreeProgressSchema],
+    summary="Get user's progress per skill tree",
+    description=(
+        "Checked and total skills, completion percentage and frontier skills (not checked, all prerequisites "
+        "checked) for the given trees, or for every tree where the user checked at least one skill"
+    ),
+)
+async def get_user_progress_route(
+    tree_ids: list[int] | None = Query(None),
+    user_id: int = Depends(get_current_user),  # Récupère l'ID de l'utilisateur à partir du token JWT
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Endpoint pour récupérer la progression de l'utilisateur par skill tree.
+    Args:
+        tree_ids: IDs des arbres (optionnel, répétable)
+        user_id: ID de l'utilisateur
+
+    Returns:
+        Une entrée par arbre existant, triée par ID d'arbre
+    """
+    if tree_ids and len(tree_ids) > PROGRESS_MAX_TREES:
+        raise HTTPException(status_code=400, detail=f"Maximum {PROGRESS_MAX_TREES} arbres par requête")
+    # La progression est calculée en base : les checks en attente y sont écrits d'abord
+    await flush_user_checks(user_id)
+    return await get_user_progress(db, user_id, tree_ids)
+
+
 @router.get(
     "/me/profile",
     response_model=UserSchema,
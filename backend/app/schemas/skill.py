@@ -61,3 +61,26 @@ class SkillSaveSchema(BaseModel):
     is_root: bool
     linked_tree_id: int | None = None
     unlock_ids: list[int] = Field(default=[])
+
+
+class SkillRelativeSchema(BaseModel):
+    """Schema representing an ancestor or descendant of a skill, with its distance."""
+
+    id: int
+    name: str
+    depth: int
+
+
+class LearningPathStepSchema(BaseModel):
+    """Schema representing a skill still to acquire on the way to a target skill."""
+
+    id: int
+    name: str
+    skill_tree_id: int
+
+
+class LearningPathSchema(BaseModel):
+    """Schema representing the ordered prerequisites still missing for a target skill."""
+
+    skill_id: int
+    steps: list[LearningPathStepSchema]
@@ -1,9 +1,11 @@
 import re
 from datetime import datetime
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from .skill import SkillSaveSchema, SkillSchema
+from .tag import TagFacetSchema
 
 TAG_PATTERN = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 
@@ -56,6 +58,13 @@ class SkillTreeSimpleSchema(BaseModel):
         return v if v is not None else []
 
 
+class SkillTreeBrowseSchema(BaseModel):
+    """Schema representing a page of filtered skill trees with the tag facets of the filter."""
+
+    items: list[SkillTreeSimpleSchema]
+    facets: list[TagFacetSchema]
+
+
 class SkillTreeDetailSchema(BaseModel):
     """Schema representing a skill tree for detail page."""
 
@@ -65,6 +74,7 @@ class SkillTreeDetailSchema(BaseModel):
     description: str | None = None
     creator_username: str
     created_at: datetime
+    version: int = 1
     skills: list[SkillSchema]
     tags: list[str] = Field(default_factory=list)
 
@@ -76,6 +86,18 @@ class SkillTreeDetailSchema(BaseModel):
         return v if v is not None else []
 
 
+class LinkedSkillTreeSchema(SkillTreeDetailSchema):
+    """Schema representing a linked skill tree, with its distance in links from the requested tree."""
+
+    depth: int
+
+
+class SkillTreeExpandedSchema(SkillTreeDetailSchema):
+    """Schema representing a skill tree with every tree reachable through linked skills."""
+
+    linked_trees: list[LinkedSkillTreeSchema] = Field(default_factory=list)
+
+
 class SkillTreeSaveSchema(BaseModel):
     """Schema representing a skill tree for detail page."""
 
@@ -126,3 +148,124 @@ class SkillTreeUpdateSchema(BaseModel):
     @classmethod
     def validate_tags(cls, v: list[str] | None) -> list[str] | None:
         return _validate_tags(v)
+
+
+# ========== PATCH : opérations incrémentales sur le graphe ==========
+
+
+class AddSkillOp(BaseModel):
+    """Ajoute un skill ; temp_id (< 0) peut être référencé par les opérations suivantes."""
+
+    op: Literal["add_skill"]
+    temp_id: int = Field(..., lt=0)
+    name: str = Field(..., min_length=1, max_length=100)
+    description: str | None = None
+    linked_tree_id: int | None = None
+
+
+class RenameSkillOp(BaseModel):
+    """Renomme un skill (et met à jour sa description si elle est fournie)."""
+
+    op: Literal["rename_skill"]
+    skill_id: int
+    name: str = Field(..., min_length=1, max_length=100)
+    description: str | None = None
+
+
+class DeleteSkillOp(BaseModel):
+    """Supprime un skill et ses dépendances."""
+
+    op: Literal["delete_skill"]
+    skill_id: int
+
+
+class AddEdgeOp(BaseModel):
+    """Ajoute la dépendance skill_id -> unlock_id."""
+
+    op: Literal["add_edge"]
+    skill_id: int
+    unlock_id: int
+
+
+class RemoveEdgeOp(BaseModel):
+    """Supprime la dépendance skill_id -> unlock_id."""
+
+    op: Literal["remove_edge"]
+    skill_id: int
+    unlock_id: int
+
+
+class SetRootOp(BaseModel):
+    """Définit le root skill de l'arbre."""
+
+    op: Literal["set_root"]
+    skill_id: int
+
+
+class SetTagsOp(BaseModel):
+    """Remplace les tags de l'arbre."""
+
+    op: Literal["set_tags"]
+    tags: list[str] = Field(default_factory=list)
+
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v: list[str]) -> list[str]:
+        return _validate_tags(v) or []
+
+
+SkillTreeOp = Annotated[
+    AddSkillOp | RenameSkillOp | DeleteSkillOp | AddEdgeOp | RemoveEdgeOp | SetRootOp | SetTagsOp,
+    Field(discriminator="op"),
+]
+
+
+class SkillTreePatchSchema(BaseModel):
+    """Schema for applying a list of graph operations to a skill tree at a given version."""
+
+    version: int
+    ops: list[SkillTreeOp] = Field(..., min_length=1, max_length=500)
+
+
+class SkillTreePatchResultSchema(BaseModel):
+    """Schema returned after a patch: new version and temp_id -> id mapping."""
+
+    version: int
+    created_ids: dict[int, int] = Field(default_factory=dict)
+
+
+# ========== IMPORT en masse ==========
+
+
+class SkillTreeImportSchema(BaseModel):
+    """Schema for one NDJSON line of a bulk import (skill ids are temporary, local to the line)."""
+
+    name: str = Field(..., min_length=1, max_length=100)
+    description: str | None = None
+    skills: list[SkillSaveSchema] = Field(default_factory=list)
+    tags: list[str] = Field(default_factory=list)
+
+    @field_validator("tags")
+    @classmethod
+    def validate_tags(cls, v: list[str]) -> list[str]:
+        return _validate_tags(v) or []
+
+
+class SkillTreeImportErrorSchema(BaseModel):
+    """Schema representing a rejected line of a bulk import."""
+
+    line: int
+    detail: str
+
+
+class SkillTreeImportResultSchema(BaseModel):
+    """Schema returned after a bulk import: counts, rejected lines and throughput."""
+
+    tree_ids: list[int] = Field(default_factory=list)
+    skills: int = 0
+    dependencies: int = 0
+    tags: int = 0
+    errors: list[SkillTreeImportErrorSchema] = Field(default_factory=list)
+    rows: int = 0
+    duration_seconds: float = 0.0
+    rows_per_second: float = 0.0
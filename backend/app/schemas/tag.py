@@ -0,0 +1,16 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class TagSchema(BaseModel):
+    """Schema representing a tag with the number of skill trees using it."""
+
+    model_config = ConfigDict(from_attributes=True)
+    name: str
+    usage_count: int
+
+
+class TagFacetSchema(BaseModel):
+    """Schema representing a tag facet: number of matching skill trees carrying the tag."""
+
+    name: str
+    count: int
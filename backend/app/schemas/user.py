@@ -72,6 +72,21 @@ class UserOneSkillCheckedSchema(BaseModel):
     skill_id: int
 
 
+class UserSkillsCheckBatchSchema(BaseModel):
+    """Schema for checking and unchecking several skills at once."""
+
+    check: list[int] = Field(default=[], max_length=500)
+    uncheck: list[int] = Field(default=[], max_length=500)
+    include_prerequisites: bool = False  # coche aussi tous les prérequis des skills de check
+
+
+class UserSkillsCheckBatchResultSchema(BaseModel):
+    """Schema representing the skills actually checked and unchecked by a batch."""
+
+    checked: list[int] = Field(default=[])
+    unchecked: list[int] = Field(default=[])
+
+
 class UserCheckSkillsSchema(BaseModel):
     """Schema representing a user's checked/acquired skill with details."""
 
@@ -84,3 +99,13 @@ class UserFavoriteTreesSchema(BaseModel):
 
     user_id: int
     skill_tree_ids: list[int] = Field(default=[])
+
+
+class UserTreeProgressSchema(BaseModel):
+    """Schema representing a user's progress on one skill tree."""
+
+    skill_tree_id: int
+    checked: int
+    total: int
+    completion: float  # pourcentage, 0 à 100
+    frontier_skill_ids: list[int] = Field(default=[])  # non acquis, prérequis tous acquis
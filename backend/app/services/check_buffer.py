@@ -0,0 +1,160 @@
+# /backend/app/services/check_buffer.py
+
+"""Écriture différée des checks de skills (activée par CHECK_WRITE_BEHIND=true).
+
+Les checks et unchecks sont acquittés immédiatement et repliés en mémoire par
+(user, skill) : seul le dernier état demandé est écrit. Un job du lifespan écrit
+le tampon toutes les CHECK_FLUSH_INTERVAL secondes, ou dès CHECK_FLUSH_MAX_OPS
+entrées, en deux requêtes ; l'arrêt propre de l'application écrit le reste.
+Les lectures des checks d'un utilisateur superposent son état en attente, y compris
+celui du lot en cours d'écriture, qui reste visible jusqu'au commit.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import suppress
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.types import Integer
+
+from app.constants import CHECK_FLUSH_INTERVAL, CHECK_FLUSH_MAX_OPS
+from app.database import async_session
+from app.metrics import check_buffer_flushes_total, check_buffer_pending
+from app.services.progress_service import bump_checks_version
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_ENABLED = os.getenv("CHECK_WRITE_BEHIND", "false").lower() == "true"
+
+# Les skills ou utilisateurs supprimés entre-temps sont ignorés par les jointures
+_INSERT_CHECKS_SQL = text(
+    """INSERT INTO user_check_skill (user_id, skill_id)
+  SELECT pending.user_id, pending.skill_id
+  FROM unnest(:user_ids, :skill_ids) AS pending(user_id, skill_id)
+  INNER JOIN skills ON skills.id = pending.skill_id
+  INNER JOIN users ON users.id = pending.user_id
+  ON CONFLICT (user_id, skill_id) DO NOTHING"""
+).bindparams(bindparam("user_ids", type_=ARRAY(Integer())), bindparam("skill_ids", type_=ARRAY(Integer())))
+
+_DELETE_CHECKS_SQL = text(
+    """DELETE FROM user_check_skill
+  USING unnest(:user_ids, :skill_ids) AS pending(user_id, skill_id)
+  WHERE user_check_skill.user_id = pending.user_id AND user_check_skill.skill_id = pending.skill_id"""
+).bindparams(bindparam("user_ids", type_=ARRAY(Integer())), bindparam("skill_ids", type_=ARRAY(Integer())))
+
+# user_id -> {skill_id -> état voulu (True : coché)}
+_pending: dict[int, dict[int, bool]] = {}
+# Lot en cours d'écriture : ni dans _pending, ni encore visible en base
+_inflight: dict[int, dict[int, bool]] = {}
+_pending_count = 0
+_flush_lock = asyncio.Lock()
+_buffer_full = asyncio.Event()
+
+
+def buffer_check(user_id: int, skill_id: int, checked: bool) -> None:
+    """Enregistre l'état voulu d'un skill ; remplace une demande précédente non encore écrite."""
+    global _pending_count
+    skills = _pending.setdefault(user_id, {})
+    if skill_id not in skills:
+        _pending_count += 1
+    skills[skill_id] = checked
+    check_buffer_pending.set(_pending_count)
+    if _pending_count >= CHECK_FLUSH_MAX_OPS:
+        _buffer_full.set()
+
+
+def pending_checks(user_id: int) -> dict[int, bool]:
+    """États en attente d'écriture pour un utilisateur (skill_id -> coché), lot en cours compris."""
+    inflight, pending = _inflight.get(user_id), _pending.get(user_id)
+    if not inflight:
+        return pending or {}
+    return {**inflight, **pending} if pending else inflight
+
+
+def apply_pending(user_id: int, skill_ids: set[int]) -> set[int]:
+    """Superpose l'état en attente de l'utilisateur à des skill ids lus en base."""
+    for skill_id, checked in pending_checks(user_id).items():
+        if checked:
+            skill_ids.add(skill_id)
+        else:
+            skill_ids.discard(skill_id)
+    return skill_ids
+
+
+async def flush_check_buffer(session_factory: async_sessionmaker[AsyncSession] | None = None) -> int:
+    """Écrit le tampon en une transaction ; retourne le nombre d'entrées écrites.
+
+    En cas d'échec, les entrées non remplacées entre-temps sont remises en attente.
+    """
+    global _pending, _pending_count, _inflight
+    async with _flush_lock:
+        _buffer_full.clear()
+        if not _pending:
+            return 0
+        # Le lot reste lisible (_inflight) tant que la transaction n'est pas validée
+        batch, _pending, count = _pending, {}, _pending_count
+        _inflight = batch
+        _pending_count = 0
+        check_buffer_pending.set(0)
+
+        checks: tuple[list[int], list[int]] = ([], [])
+        unchecks: tuple[list[int], list[int]] = ([], [])
+        for user_id, skills in batch.items():
+            for skill_id, checked in skills.items():
+                target = checks if checked else unchecks
+                target[0].append(user_id)
+                target[1].append(skill_id)
+
+        try:
+            async with (session_factory or async_session)() as session:
+                if unchecks[0]:
+                    await session.execute(_DELETE_CHECKS_SQL, {"user_ids": unchecks[0], "skill_ids": unchecks[1]})
+                if checks[0]:
+                    await session.execute(_INSERT_CHECKS_SQL, {"user_ids": checks[0], "skill_ids": checks[1]})
+                await bump_checks_version(session, sorted(batch))
+                await session.commit()
+        except Exception:
+            check_buffer_flushes_total.labels(status="error").inc()
+            _inflight = {}
+            for user_id, skills in batch.items():
+                for skill_id, checked in skills.items():
+                    if skill_id not in _pending.get(user_id, {}):
+                        buffer_check(user_id, skill_id, checked)
+            raise
+
+        _inflight = {}
+        check_buffer_flushes_total.labels(status="success").inc()
+        return count
+
+
+async def flush_user_checks(user_id: int) -> None:
+    """Écrit le tampon si l'utilisateur a des checks en attente (avant une lecture en base).
+
+    Si ses checks sont dans le lot en cours d'écriture, attend la fin de ce flush (verrou).
+    """
+    if _pending.get(user_id) or _inflight.get(user_id):
+        await flush_check_buffer()
+
+
+async def run_check_flusher(interval: float = CHECK_FLUSH_INTERVAL) -> None:
+    """Boucle du job d'écriture (lifespan) ; une erreur est loggée sans arrêter la boucle."""
+    while True:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(_buffer_full.wait(), timeout=interval)
+        try:
+            await flush_check_buffer()
+        except Exception as e:
+            logger.warning(f"Skill checks flush failed: {e}")
+
+
+def clear_check_buffer() -> None:
+    """Vide le tampon sans l'écrire (tests)."""
+    global _pending_count
+    _pending.clear()
+    _inflight.clear()
+    _pending_count = 0
+    _buffer_full.clear()
+    check_buffer_pending.set(0)
@@ -0,0 +1,186 @@
+# /backend/app/services/closure_service.py
+
+"""Maintenance de la fermeture transitive des dépendances de skills (table skill_closure)."""
+
+from collections.abc import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, delete, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Integer
+
+from app.models.skill import Skill
+from app.models.skill_closure import SkillClosure
+from app.schemas.skill import SkillRelativeSchema
+
+# Recalcule la fermeture de plusieurs arbres en une requête. La profondeur est
+# bornée par la taille de l'arbre pour terminer même sur un graphe cyclique hérité.
+_REBUILD_CLOSURE_SQL = text(
+    """WITH RECURSIVE tree_sizes AS (
+      SELECT skill_tree_id, COUNT(*) AS nb_skills
+      FROM skills
+      WHERE skill_tree_id = ANY(:tree_ids)
+      GROUP BY skill_tree_id
+  ),
+  paths(skill_tree_id, ancestor_id, descendant_id, depth) AS (
+      SELECT skills.skill_tree_id, skill_dependencies.skill_id, skill_dependencies.unlock_id, 1
+      FROM skill_dependencies
+      INNER JOIN skills ON skill_dependencies.skill_id = skills.id
+      WHERE skills.skill_tree_id = ANY(:tree_ids)
+
+      UNION
+
+      SELECT paths.skill_tree_id, paths.ancestor_id, skill_dependencies.unlock_id, paths.depth + 1
+      FROM paths
+      INNER JOIN skill_dependencies ON skill_dependencies.skill_id = paths.descendant_id
+      INNER JOIN tree_sizes ON tree_sizes.skill_tree_id = paths.skill_tree_id
+      WHERE paths.depth < tree_sizes.nb_skills
+  )
+  INSERT INTO skill_closure (skill_tree_id, ancestor_id, descendant_id, depth)
+  SELECT skill_tree_id, ancestor_id, descendant_id, MIN(depth)
+  FROM paths
+  GROUP BY skill_tree_id, ancestor_id, descendant_id"""
+).bindparams(bindparam("tree_ids", type_=ARRAY(Integer())))
+
+# Ajout incrémental d'arêtes (sans retrait) en une requête. Un nouveau chemin enchaîne
+# des segments déjà fermés et des arêtes ajoutées : ancêtre ~> source -> cible ~> ...
+# -> cible ~> descendant. skill_closure est lue telle qu'avant l'INSERT ; la profondeur
+# est bornée par la taille de l'arbre comme pour la reconstruction.
+_ADD_EDGES_SQL = text(
+    """WITH RECURSIVE new_edges AS (
+      SELECT edge.skill_id, edge.unlock_id
+      FROM unnest(:skill_ids, :unlock_ids) AS edge(skill_id, unlock_id)
+  ),
+  tree_size AS (
+      SELECT COUNT(*) AS nb_skills FROM skills WHERE skill_tree_id = :tree_id
+  ),
+  paths(ancestor_id, descendant_id, depth) AS (
+      SELECT ancestors.ancestor_id, new_edges.unlock_id, ancestors.depth + 1
+      FROM new_edges
+      CROSS JOIN LATERAL (
+          SELECT ancestor_id, depth FROM skill_closure WHERE descendant_id = new_edges.skill_id
+          UNION ALL
+          SELECT new_edges.skill_id, 0
+      ) AS ancestors
+
+      UNION
+
+      SELECT paths.ancestor_id, new_edges.unlock_id, paths.depth + via.depth + 1
+      FROM paths
+      CROSS JOIN LATERAL (
+          SELECT descendant_id, depth FROM skill_closure WHERE ancestor_id = paths.descendant_id
+          UNION ALL
+          SELECT paths.descendant_id, 0
+      ) AS via
+      INNER JOIN new_edges ON new_edges.skill_id = via.descendant_id
+      CROSS JOIN tree_size
+      WHERE paths.depth < tree_size.nb_skills
+  )
+  INSERT INTO skill_closure (skill_tree_id, ancestor_id, descendant_id, depth)
+  SELECT CAST(:tree_id AS INTEGER), paths.ancestor_id, descendants.descendant_id,
+         MIN(paths.depth + descendants.depth)
+  FROM paths
+  CROSS JOIN LATERAL (
+      SELECT descendant_id, depth FROM skill_closure WHERE ancestor_id = paths.descendant_id
+      UNION ALL
+      SELECT paths.descendant_id, 0
+  ) AS descendants
+  GROUP BY paths.ancestor_id, descendants.descendant_id
+  ON CONFLICT (ancestor_id, descendant_id) DO UPDATE
+  SET depth = LEAST(skill_closure.depth, EXCLUDED.depth)"""
+).bindparams(bindparam("skill_ids", type_=ARRAY(Integer())), bindparam("unlock_ids", type_=ARRAY(Integer())))
+
+
+def has_cycle(edges: Iterable[tuple[int, int]]) -> bool:
+    """Détecte un cycle dans un graphe orienté donné par ses arêtes (algorithme de Kahn)."""
+    successors: dict[int, list[int]] = {}
+    in_degree: dict[int, int] = {}
+    for source, target in edges:
+        successors.setdefault(source, []).append(target)
+        in_degree.setdefault(source, 0)
+        in_degree[target] = in_degree.get(target, 0) + 1
+
+    ready = [node for node, degree in in_degree.items() if degree == 0]
+    visited = 0
+    while ready:
+        node = ready.pop()
+        visited += 1
+        for target in successors.get(node, []):
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                ready.append(target)
+    return visited != len(in_degree)
+
+
+async def refresh_closure(db: AsyncSession, tree_ids: list[int]) -> None:
+    """Recalcule entièrement la fermeture des arbres donnés (does NOT commit)."""
+    if not tree_ids:
+        return
+    await db.execute(delete(SkillClosure).where(SkillClosure.skill_tree_id.in_(tree_ids)))
+    await db.execute(_REBUILD_CLOSURE_SQL, {"tree_ids": tree_ids})
+
+
+async def creates_cycle(db: AsyncSession, skill_id: int, unlock_ids: list[int]) -> bool:
+    """Vrai si une arête skill_id -> unlock_id fermerait un cycle (unlock_id atteint déjà skill_id)."""
+    if not unlock_ids:
+        return False
+    if skill_id in unlock_ids:
+        return True
+    stmt = select(
+        select(SkillClosure.depth)
+        .where(SkillClosure.ancestor_id.in_(unlock_ids), SkillClosure.descendant_id == skill_id)
+        .exists()
+    )
+    return bool((await db.execute(stmt)).scalar())
+
+
+async def add_edge_to_closure(db: AsyncSession, skill_tree_id: int, skill_id: int, unlock_id: int) -> None:
+    """Met à jour la fermeture après l'ajout d'une arête (does NOT commit)."""
+    await add_edges_to_closure(db, skill_tree_id, [(skill_id, unlock_id)])
+
+
+async def add_edges_to_closure(db: AsyncSession, skill_tree_id: int, edges: Iterable[tuple[int, int]]) -> None:
+    """Met à jour la fermeture après l'ajout d'arêtes, sans retrait, en une requête (does NOT commit)."""
+    edges = list(edges)
+    if not edges:
+        return
+    await db.execute(
+        _ADD_EDGES_SQL,
+        {
+            "tree_id": skill_tree_id,
+            "skill_ids": [skill_id for skill_id, _ in edges],
+            "unlock_ids": [unlock_id for _, unlock_id in edges],
+        },
+    )
+
+
+async def _get_relatives(
+    db: AsyncSession, skill_tree_id: int, skill_id: int, ancestors: bool
+) -> list[SkillRelativeSchema]:
+    if ancestors:
+        anchor, relative = SkillClosure.descendant_id, SkillClosure.ancestor_id
+    else:
+        anchor, relative = SkillClosure.ancestor_id, SkillClosure.descendant_id
+    stmt = (
+        select(Skill.id, Skill.name, SkillClosure.depth)
+        .join(Skill, Skill.id == relative)
+        .where(anchor == skill_id, SkillClosure.skill_tree_id == skill_tree_id)
+        .order_by(SkillClosure.depth, Skill.name)
+    )
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        exists = await db.execute(select(Skill.id).where(Skill.id == skill_id, Skill.skill_tree_id == skill_tree_id))
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Skill not found")
+    return [SkillRelativeSchema(id=row.id, name=row.name, depth=row.depth) for row in rows]
+
+
+async def get_ancestors(db: AsyncSession, skill_tree_id: int, skill_id: int) -> list[SkillRelativeSchema]:
+    """Tous les skills à acquérir avant skill_id, du plus proche au plus lointain."""
+    return await _get_relatives(db, skill_tree_id, skill_id, ancestors=True)
+
+
+async def get_descendants(db: AsyncSession, skill_tree_id: int, skill_id: int) -> list[SkillRelativeSchema]:
+    """Tous les skills que skill_id débloque, directement ou non."""
+    return await _get_relatives(db, skill_tree_id, skill_id, ancestors=False)
@@ -0,0 +1,41 @@
+# /backend/app/services/collection_version_service.py
+
+"""Versions des collections (listings), utilisées pour les ETags."""
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.collection_version import CollectionVersion
+
+# Écritures visibles dans les listings : création, suppression, nom, description ou tags d'un arbre
+CATALOGUE_KEY = "catalogue"
+# Chaque recalcul des scores de tendance
+TRENDING_KEY = "trending"
+
+
+def favorites_key(user_id: int) -> str:
+    """Clé de la collection des favoris d'un utilisateur."""
+    return f"favorites:{user_id}"
+
+
+async def bump_collection_version(db: AsyncSession, key: str) -> None:
+    """Incrémente la version d'une collection (does NOT commit)."""
+    stmt = (
+        pg_insert(CollectionVersion)
+        .values(key=key, version=1)
+        .on_conflict_do_update(
+            index_elements=[CollectionVersion.key],
+            set_={"version": CollectionVersion.version + 1},
+        )
+    )
+    await db.execute(stmt)
+
+
+async def get_collection_versions(db: AsyncSession, keys: list[str]) -> list[int]:
+    """Versions des collections demandées, dans l'ordre ; 0 pour une collection jamais modifiée."""
+    rows = await db.execute(
+        select(CollectionVersion.key, CollectionVersion.version).where(CollectionVersion.key.in_(keys))
+    )
+    versions = dict(rows.tuples().all())
+    return [versions.get(key, 0) for key in keys]
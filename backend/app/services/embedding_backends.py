@@ -0,0 +1,96 @@
+# /backend/app/services/embedding_backends.py
+
+"""Backends d'inférence du modèle d'embedding (EMBEDDING_BACKEND).
+
+- sentence-transformers : PyTorch, le modèle de référence (défaut).
+- onnx : le même modèle exporté puis quantifié en int8 pour ONNX Runtime
+  (scripts/export_onnx_embedding_model.py), sans torch : bien moins de CPU et de
+  RAM par worker. Même pooling (moyenne sur le masque d'attention) et même
+  normalisation L2 : les vecteurs restent compatibles avec ceux déjà stockés.
+
+Les dépendances d'un backend ne sont importées qu'à son chargement.
+"""
+
+import os
+
+import numpy as np
+
+from app.constants import (
+    EMBEDDING_BACKEND_ONNX,
+    EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_MAX_TOKENS,
+    EMBEDDING_MODEL,
+    EMBEDDING_ONNX_DIR,
+)
+
+ONNX_MODEL_FILE = "model_int8.onnx"
+ONNX_TOKENIZER_FILE = "tokenizer.json"
+_PAD_TOKEN = "<pad>"  # noqa: S105 (tokenizer XLM-R de multilingual-e5)
+
+
+class SentenceTransformerBackend:
+    """Modèle de référence, via sentence-transformers (PyTorch)."""
+
+    name = EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+
+    def encode(self, texts: list[str]) -> list[list[float]]:
+        """Vecteurs normalisés (L2) des textes, préfixes E5 compris."""
+        return self._model.encode(texts, normalize_embeddings=True).tolist()
+
+
+def mean_pool_normalize(hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """Moyenne des états cachés sur les tokens non masqués, puis normalisation L2 (pooling E5)."""
+    mask = attention_mask[..., None].astype(hidden.dtype)
+    pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+
+class OnnxBackend:
+    """Modèle exporté en ONNX et quantifié en int8, exécuté par ONNX Runtime sur CPU."""
+
+    name = EMBEDDING_BACKEND_ONNX
+
+    def __init__(self, model_dir: str = EMBEDDING_ONNX_DIR):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self._tokenizer = Tokenizer.from_file(os.path.join(model_dir, ONNX_TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length=EMBEDDING_MAX_TOKENS)
+        pad_id = self._tokenizer.token_to_id(_PAD_TOKEN)
+        self._tokenizer.enable_padding(pad_id=pad_id if pad_id is not None else 0, pad_token=_PAD_TOKEN)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, ONNX_MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self._session.get_inputs()}
+        output_shape = self._session.get_outputs()[0].shape
+        if output_shape[-1] != EMBEDDING_DIMENSIONS:
+            raise ValueError(f"ONNX model outputs {output_shape[-1]} dimensions, expected {EMBEDDING_DIMENSIONS}")
+
+    def encode(self, texts: list[str]) -> list[list[float]]:
+        """Vecteurs normalisés (L2) des textes, préfixes E5 compris."""
+        encodings = self._tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        (hidden, *_) = self._session.run(None, {k: v for k, v in inputs.items() if k in self._input_names})
+        return mean_pool_normalize(hidden, inputs["attention_mask"]).tolist()
+
+
+def load_embedding_backend(name: str) -> SentenceTransformerBackend | OnnxBackend:
+    """Charge le backend demandé (opération lente : modèle et bibliothèque d'inférence)."""
+    if name == EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS:
+        return SentenceTransformerBackend()
+    if name == EMBEDDING_BACKEND_ONNX:
+        return OnnxBackend(os.getenv("EMBEDDING_ONNX_DIR", EMBEDDING_ONNX_DIR))
+    raise ValueError(f"Unknown embedding backend: {name}")
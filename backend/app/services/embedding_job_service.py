@@ -0,0 +1,210 @@
+# /backend/app/services/embedding_job_service.py
+
+"""File d'attente durable des embeddings (table embedding_jobs, patron outbox).
+
+Les écritures d'un arbre planifient son embedding dans leur propre transaction
+(enqueue_embedding_jobs) : rien n'est perdu au redémarrage et la requête n'attend
+pas l'encodage. Une ligne par arbre : des sauvegardes rapprochées se fondent en un
+seul job, dont l'échéance est repoussée de EMBEDDING_JOB_DEBOUNCE secondes.
+
+Le worker (lancé dans le lifespan) réclame les jobs échus par lots, avec FOR UPDATE
+SKIP LOCKED et un bail de EMBEDDING_JOB_LEASE secondes (plusieurs workers se
+partagent la file ; le job d'un worker arrêté redevient disponible à la fin du
+bail), puis encode le lot d'un coup. Un job réussi est supprimé, sauf si l'arbre a
+été réécrit entre-temps (generation changée) : il reste alors à traiter. Un échec
+est replanifié avec un délai exponentiel, puis le job passe à l'état dead après
+EMBEDDING_JOB_MAX_ATTEMPTS tentatives ; une nouvelle écriture de l'arbre le relance.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from sqlalchemy import Boolean, Float, Integer, Text, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Interval
+
+from app.constants import (
+    EMBEDDING_JOB_BATCH_SIZE,
+    EMBEDDING_JOB_DEBOUNCE,
+    EMBEDDING_JOB_LEASE,
+    EMBEDDING_JOB_MAX_ATTEMPTS,
+    EMBEDDING_JOB_POLL_INTERVAL,
+    EMBEDDING_JOB_RETRY_BASE,
+    EMBEDDING_JOB_RETRY_MAX,
+)
+from app.database import async_session
+from app.metrics import (
+    embedding_job_lag_seconds,
+    embedding_jobs_dead,
+    embedding_jobs_oldest_age_seconds,
+    embedding_jobs_pending,
+    embedding_jobs_processed_total,
+)
+from app.services.embedding_service import embed_skill_trees, embedding_model_status
+
+logger = logging.getLogger(__name__)
+
+# Un job dead ou en attente redevient un job neuf ; enqueued_at garde la première
+# écriture non encodée. Le bail éventuel (locked_until) n'est pas touché.
+_ENQUEUE_SQL = text(
+    """INSERT INTO embedding_jobs (skill_tree_id, run_at)
+  SELECT tree_id, LOCALTIMESTAMP + :debounce FROM unnest(:tree_ids) AS tree_id
+  ON CONFLICT (skill_tree_id) DO UPDATE SET
+      generation = embedding_jobs.generation + 1,
+      run_at = EXCLUDED.run_at,
+      attempts = 0,
+      last_error = NULL,
+      enqueued_at = CASE WHEN embedding_jobs.status = 'dead' THEN LOCALTIMESTAMP ELSE embedding_jobs.enqueued_at END,
+      status = 'pending'"""
+).bindparams(bindparam("tree_ids", type_=ARRAY(Integer())), bindparam("debounce", type_=Interval()))
+
+_CLAIM_SQL = text(
+    """WITH due AS (
+      SELECT skill_tree_id FROM embedding_jobs
+      WHERE status = 'pending' AND run_at <= LOCALTIMESTAMP
+        AND (locked_until IS NULL OR locked_until <= LOCALTIMESTAMP)
+      ORDER BY run_at
+      LIMIT :limit
+      FOR UPDATE SKIP LOCKED
+  )
+  UPDATE embedding_jobs SET attempts = embedding_jobs.attempts + 1, locked_until = LOCALTIMESTAMP + :lease
+  FROM due
+  WHERE embedding_jobs.skill_tree_id = due.skill_tree_id
+  RETURNING embedding_jobs.skill_tree_id, embedding_jobs.generation, embedding_jobs.attempts,
+            EXTRACT(EPOCH FROM LOCALTIMESTAMP - embedding_jobs.enqueued_at) AS age"""
+).bindparams(bindparam("lease", type_=Interval()))
+
+_DELETE_DONE_SQL = text(
+    """DELETE FROM embedding_jobs
+  USING unnest(:tree_ids, :generations) AS done(skill_tree_id, generation)
+  WHERE embedding_jobs.skill_tree_id = done.skill_tree_id AND embedding_jobs.generation = done.generation"""
+).bindparams(bindparam("tree_ids", type_=ARRAY(Integer())), bindparam("generations", type_=ARRAY(Integer())))
+
+# Un job réécrit pendant l'encodage (generation changée) garde son échéance et ses tentatives remises à zéro
+_FAIL_SQL = text(
+    """UPDATE embedding_jobs SET
+      status = CASE WHEN failed.dead THEN 'dead' ELSE 'pending' END,
+      run_at = LOCALTIMESTAMP + make_interval(secs => failed.delay),
+      last_error = failed.error
+  FROM unnest(:tree_ids, :generations, :delays, :dead, :errors) AS failed(skill_tree_id, generation, delay, dead, error)
+  WHERE embedding_jobs.skill_tree_id = failed.skill_tree_id AND embedding_jobs.generation = failed.generation"""
+).bindparams(
+    bindparam("tree_ids", type_=ARRAY(Integer())),
+    bindparam("generations", type_=ARRAY(Integer())),
+    bindparam("delays", type_=ARRAY(Float())),
+    bindparam("dead", type_=ARRAY(Boolean())),
+    bindparam("errors", type_=ARRAY(Text())),
+)
+
+_RELEASE_SQL = text("UPDATE embedding_jobs SET locked_until = NULL WHERE skill_tree_id = ANY(:tree_ids)").bindparams(
+    bindparam("tree_ids", type_=ARRAY(Integer()))
+)
+
+_QUEUE_STATS_SQL = text(
+    """SELECT count(*) FILTER (WHERE status = 'pending') AS pending,
+         count(*) FILTER (WHERE status = 'dead') AS dead,
+         coalesce(EXTRACT(EPOCH FROM LOCALTIMESTAMP - min(enqueued_at) FILTER (WHERE status = 'pending')), 0)
+             AS oldest_age_seconds
+  FROM embedding_jobs"""
+)
+
+
+async def enqueue_embedding_jobs(
+    db: AsyncSession, tree_ids: list[int], debounce: float = EMBEDDING_JOB_DEBOUNCE
+) -> None:
+    """Planifie l'embedding des arbres dans la transaction en cours (does NOT commit)."""
+    if tree_ids:
+        # Ids uniques et triés : un seul conflit par ligne, verrous pris dans le même ordre
+        await db.execute(_ENQUEUE_SQL, {"tree_ids": sorted(set(tree_ids)), "debounce": timedelta(seconds=debounce)})
+
+
+def _retry_delay(attempts: int) -> float:
+    """Délai avant la tentative suivante : exponentiel, plafonné."""
+    return min(EMBEDDING_JOB_RETRY_BASE * 2 ** (attempts - 1), EMBEDDING_JOB_RETRY_MAX)
+
+
+async def process_embedding_jobs(
+    db: AsyncSession, limit: int = EMBEDDING_JOB_BATCH_SIZE, lease: float = EMBEDDING_JOB_LEASE
+) -> int:
+    """Réclame au plus limit jobs échus, encode leurs arbres puis solde les jobs.
+
+    Retourne le nombre de jobs réclamés.
+    """
+    jobs = (await db.execute(_CLAIM_SQL, {"limit": limit, "lease": timedelta(seconds=lease)})).all()
+    await db.commit()
+    if not jobs:
+        return 0
+
+    tree_ids = [job.skill_tree_id for job in jobs]
+    start = time.perf_counter()
+    try:
+        errors = await embed_skill_trees(db, tree_ids)
+    except Exception as e:
+        await db.rollback()
+        errors = dict.fromkeys(tree_ids, str(e) or type(e).__name__)
+    elapsed = time.perf_counter() - start
+
+    done = [job for job in jobs if job.skill_tree_id not in errors]
+    if done:
+        await db.execute(
+            _DELETE_DONE_SQL,
+            {"tree_ids": [job.skill_tree_id for job in done], "generations": [job.generation for job in done]},
+        )
+        embedding_jobs_processed_total.labels(result="done").inc(len(done))
+        for job in done:
+            embedding_job_lag_seconds.observe(float(job.age) + elapsed)
+
+    failed = [job for job in jobs if job.skill_tree_id in errors]
+    if failed:
+        dead = [job.attempts >= EMBEDDING_JOB_MAX_ATTEMPTS for job in failed]
+        await db.execute(
+            _FAIL_SQL,
+            {
+                "tree_ids": [job.skill_tree_id for job in failed],
+                "generations": [job.generation for job in failed],
+                "delays": [_retry_delay(job.attempts) for job in failed],
+                "dead": dead,
+                "errors": [errors[job.skill_tree_id][:1000] for job in failed],
+            },
+        )
+        for job, is_dead in zip(failed, dead, strict=True):
+            embedding_jobs_processed_total.labels(result="dead" if is_dead else "retry").inc()
+            logger.warning(
+                f"Embedding job for tree {job.skill_tree_id} failed (attempt {job.attempts}"
+                f"{', dead' if is_dead else ''}): {errors[job.skill_tree_id]}"
+            )
+
+    await db.execute(_RELEASE_SQL, {"tree_ids": tree_ids})
+    await db.commit()
+    return len(jobs)
+
+
+async def get_embedding_queue_stats(db: AsyncSession) -> dict:
+    """Profondeur et âge de la file ; met à jour les gauges Prometheus."""
+    row = (await db.execute(_QUEUE_STATS_SQL)).one()
+    stats = {"pending": row.pending, "dead": row.dead, "oldest_age_seconds": round(float(row.oldest_age_seconds), 1)}
+    embedding_jobs_pending.set(stats["pending"])
+    embedding_jobs_dead.set(stats["dead"])
+    embedding_jobs_oldest_age_seconds.set(stats["oldest_age_seconds"])
+    return stats
+
+
+async def run_embedding_worker(interval: float = EMBEDDING_JOB_POLL_INTERVAL) -> None:
+    """Boucle du worker (lifespan) ; une erreur est loggée sans arrêter la boucle.
+
+    Tant que le modèle n'est pas prêt, les jobs attendent sans consommer de tentative.
+    """
+    while True:
+        try:
+            async with async_session() as session:
+                if embedding_model_status() == "ready":
+                    # Lots pleins : il reste des jobs échus, on enchaîne sans attendre
+                    while await process_embedding_jobs(session) == EMBEDDING_JOB_BATCH_SIZE:
+                        await get_embedding_queue_stats(session)
+                await get_embedding_queue_stats(session)
+        except Exception as e:
+            logger.warning(f"Embedding job processing failed: {e}")
+        await asyncio.sleep(interval)
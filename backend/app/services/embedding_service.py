@@ -1,22 +1,237 @@
+import asyncio
+import hashlib
 import logging
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from opentelemetry import trace
-from sentence_transformers import SentenceTransformer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.constants import EMBEDDING_MODEL
-from app.metrics import embedding_duration_seconds, embedding_requests_total
+from app.constants import (
+    EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS,
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_WINDOW,
+    EMBEDDING_LOAD_RETRY_BASE,
+    EMBEDDING_LOAD_RETRY_MAX,
+    EMBEDDING_MAX_QUEUE,
+    EMBEDDING_MODEL,
+    EMBEDDING_TIMEOUT,
+    EMBEDDING_WORKERS,
+)
+from app.metrics import (
+    embedding_batch_size,
+    embedding_duration_seconds,
+    embedding_queue_depth,
+    embedding_queue_wait_seconds,
+    embedding_rejections_total,
+    embedding_requests_total,
+)
 from app.models.skill_tree import SkillTree
-from app.services.skill_tree_service import _build_search_vector, _concat_skills_text
+from app.services.embedding_backends import load_embedding_backend
 
 logger = logging.getLogger(__name__)
 tracer = trace.get_tracer("humantree.embedding")
 
-# Singleton — chargé une seule fois au démarrage du process
-_model = SentenceTransformer(EMBEDDING_MODEL)
+# Backend d'inférence (EMBEDDING_BACKEND, cf. embedding_backends), chargé à la demande
+# (bibliothèque + modèle : plusieurs secondes) : préchauffé par le lifespan via
+# run_embedding_model_loader, ou au premier encodage (scripts, tâches de fond).
+_backend_name = os.getenv("EMBEDDING_BACKEND", EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS)
+_backend = None
+_model_lock = threading.Lock()
+_model_error: str | None = None
+
+# L'encodage (CPU, synchrone) tourne sur un pool dédié et borné pour ne jamais
+# bloquer la boucle d'événements. Les appels concurrents sont regroupés par
+# _MicroBatcher : un seul encode(list) par lot, bien plus efficace sur CPU que
+# des encode(str) successifs. Au-delà de _max_queue textes en attente ou en
+# cours, les nouveaux sont refusés plutôt que d'allonger la file.
+_workers = int(os.getenv("EMBEDDING_WORKERS", EMBEDDING_WORKERS))
+_timeout = float(os.getenv("EMBEDDING_TIMEOUT", EMBEDDING_TIMEOUT))
+_max_queue = EMBEDDING_MAX_QUEUE
+_batch_window = EMBEDDING_BATCH_WINDOW
+_batch_max_size = EMBEDDING_BATCH_MAX_SIZE
+_executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="embedding")
+_queued = 0
+_queued_lock = threading.Lock()
+
+
+class EmbeddingOverloadedError(RuntimeError):
+    """La file du pool d'encodage est pleine."""
+
+
+class EmbeddingModelNotReadyError(RuntimeError):
+    """Le modèle n'est pas encore chargé (la recherche se rabat sur le plein texte)."""
+
+
+def _reserve() -> None:
+    global _queued
+    with _queued_lock:
+        if _queued >= _max_queue:
+            embedding_rejections_total.labels(reason="queue_full").inc()
+            raise EmbeddingOverloadedError("Embedding executor queue is full")
+        _queued += 1
+        embedding_queue_depth.set(_queued)
+
+
+def _release(count: int) -> None:
+    """Fin (ou annulation avant démarrage) de l'encodage de count textes."""
+    global _queued
+    with _queued_lock:
+        _queued -= count
+        embedding_queue_depth.set(_queued)
+
+
+def _encode(texts: list[str], submitted_at: float) -> list[list[float]]:
+    embedding_queue_wait_seconds.observe(time.perf_counter() - submitted_at)
+    return _backend.encode(texts)
+
+
+async def _encode_in_executor(texts: list[str]) -> list[list[float]]:
+    """Encode un lot de textes sur le pool dédié, en au plus _timeout secondes.
+
+    Raises:
+        TimeoutError: encodage trop long ; s'il n'a pas démarré, il est retiré de la file.
+    """
+    try:
+        future = _executor.submit(_encode, texts, time.perf_counter())
+    except RuntimeError:  # pool arrêté
+        _release(len(texts))
+        raise
+    future.add_done_callback(lambda _: _release(len(texts)))
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), _timeout)
+    except TimeoutError:
+        embedding_rejections_total.labels(reason="timeout").inc()
+        raise
+
+
+class _MicroBatcher:
+    """Regroupe les encodages concurrents d'un même préfixe E5 en un seul appel encode(list).
+
+    Tant qu'un lot est en cours, le suivant part après _batch_window secondes ou dès
+    _batch_max_size textes ; pool inoccupé, il part au prochain tour de boucle.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._texts: list[str] = []
+        self._waiters: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def encode(self, text: str) -> list[float]:
+        _reserve()
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._texts.append(self.prefix + text)
+        self._waiters.append(waiter)
+        if len(self._texts) >= _batch_max_size:
+            self._flush()
+        elif self._timer is None:
+            # Pool inoccupé : départ au prochain tour de boucle (seuls les appels du même tour
+            # sont regroupés), sans ajouter de latence ; sinon on accumule pendant la fenêtre
+            self._timer = loop.call_later(_batch_window if self._tasks else 0, self._flush)
+        return await waiter
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        texts, waiters = self._texts, self._waiters
+        self._texts, self._waiters = [], []
+        task = asyncio.get_running_loop().create_task(self._run(texts, waiters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run(texts: list[str], waiters: list[asyncio.Future]) -> None:
+        embedding_batch_size.observe(len(texts))
+        try:
+            vectors = await _encode_in_executor(texts)
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        for waiter, vector in zip(waiters, vectors, strict=True):
+            if not waiter.done():  # appelant annulé entre-temps
+                waiter.set_result(vector)
+
+
+# Requêtes et documents en lots séparés : une recherche n'attend pas derrière un lot de backfill
+_batchers = {True: _MicroBatcher("query: "), False: _MicroBatcher("passage: ")}
+
+
+def _load_model() -> None:
+    """Charge le backend puis l'amorce d'un encodage factice (thread du pool d'encodage)."""
+    global _backend, _model_error
+    with _model_lock:
+        if _backend is not None:
+            return
+        try:
+            backend = load_embedding_backend(_backend_name)
+            # Le premier encode alloue les tampons et initialise les noyaux : jamais sur une vraie requête
+            backend.encode(["passage: warm-up"])
+        except Exception as e:
+            _model_error = str(e)
+            raise
+        _backend, _model_error = backend, None
+
+
+def is_embedding_model_ready() -> bool:
+    """True une fois le modèle chargé et amorcé."""
+    return _backend is not None
+
+
+def embedding_backend_name() -> str:
+    """Backend d'inférence configuré (EMBEDDING_BACKEND)."""
+    return _backend_name
+
+
+def embedding_model_status() -> str:
+    """État du modèle pour /health : ready, loading ou error (dernier chargement en échec)."""
+    if _backend is not None:
+        return "ready"
+    return "error" if _model_error else "loading"
+
+
+async def ensure_embedding_model() -> None:
+    """Charge le modèle hors de la boucle d'événements s'il ne l'est pas encore."""
+    if _backend is None:
+        await asyncio.get_running_loop().run_in_executor(_executor, _load_model)
+
+
+async def warm_up_embedding_model() -> bool:
+    """Une tentative de préchauffage ; une erreur est loggée. Retourne True si le modèle est prêt."""
+    start = time.perf_counter()
+    try:
+        await ensure_embedding_model()
+    except Exception as e:
+        logger.warning(f"Embedding model warm-up failed: {e}")
+        return False
+    logger.info(f"Embedding model ready ({_backend_name} backend) in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+async def run_embedding_model_loader(
+    retry_base: float = EMBEDDING_LOAD_RETRY_BASE, retry_max: float = EMBEDDING_LOAD_RETRY_MAX
+) -> None:
+    """Boucle du lifespan : charge le modèle sans bloquer le démarrage, en réessayant après
+    un échec (téléchargement, disque) avec un délai doublé à chaque fois. Retourne une fois prêt.
+    """
+    delay = retry_base
+    while not await warm_up_embedding_model():
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, retry_max)
+
+
+def shutdown_embedding_executor() -> None:
+    """Abandonne les encodages en attente (arrêt de l'application)."""
+    _executor.shutdown(wait=False, cancel_futures=True)
 
 
 def build_embedding_text(
@@ -58,16 +273,40 @@ async def generate_embedding(text: str, *, is_query: bool = False) -> list[float
         is_query: True for search queries, False for document indexation.
 
     Returns a list of floats with EMBEDDING_DIMENSIONS dimensions.
+
+    Concurrent calls are micro-batched into one encode(list) call on the
+    bounded embedding executor, off the event loop. The model is loaded on
+    first use if the lifespan warm-up has not done it yet.
+
+    Raises:
+        EmbeddingOverloadedError: too many encodings already waiting.
+        TimeoutError: the encoding took longer than EMBEDDING_TIMEOUT.
     """
-    prefix = "query: " if is_query else "passage: "
-    vector = _model.encode(prefix + text, normalize_embeddings=True)
-    return vector.tolist()
+    await ensure_embedding_model()
+    return await _batchers[is_query].encode(text)
+
+
+def _tree_embedding_text(tree: SkillTree) -> str:
+    """Texte à encoder d'un arbre chargé avec ses skills et ses tags."""
+    # Tags triés : l'ordre de chargement ne doit pas changer l'empreinte
+    tag_names = sorted(t.name for t in tree.tags)
+    skills = [{"name": s.name, "description": s.description} for s in tree.skills]
+    return build_embedding_text(tree.name, tree.description, tag_names, skills)
+
+
+def embedding_input_hash(text: str) -> str:
+    """Empreinte de l'entrée d'un embedding : texte, modèle et backend (vecteurs int8 ≠ fp32)."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}:{_backend_name}\n{text}".encode()).hexdigest()
 
 
 async def embed_skill_tree(db: AsyncSession, tree_id: int) -> bool:
     """Load a tree from DB, generate embedding, and save it back.
 
-    Returns True if embedding was generated, False if tree not found.
+    Skipped when the tree already has an embedding of the same text with the
+    same model (embedding_hash), e.g. after a no-op save.
+
+    Returns True if the embedding is up to date (generated or skipped),
+    False if tree not found or generation failed.
     """
     with tracer.start_as_current_span(
         "embed_skill_tree",
@@ -88,10 +327,12 @@ async def embed_skill_tree(db: AsyncSession, tree_id: int) -> bool:
             logger.warning(f"Tree {tree_id} not found for embedding")
             return False
 
-        # Build text
-        tag_names = [t.name for t in tree.tags]
-        skills = [{"name": s.name, "description": s.description} for s in tree.skills]
-        text = build_embedding_text(tree.name, tree.description, tag_names, skills)
+        text = _tree_embedding_text(tree)
+        input_hash = embedding_input_hash(text)
+        if tree.embedding is not None and tree.embedding_hash == input_hash:
+            embedding_requests_total.labels(status="skipped").inc()
+            logger.info("embedding_skipped", extra={"event": "embedding_skipped", "tree_id": tree_id})
+            return True
 
         # Generate embedding
         start = time.perf_counter()
@@ -119,9 +360,53 @@ async def embed_skill_tree(db: AsyncSession, tree_id: int) -> bool:
             logger.warning(f"Embedding generation failed for tree {tree_id}: {e}")
             return False
 
-        # Update tree embedding + search vector
+        # Update tree embedding
         tree.embedding = vector
-        skills_text = _concat_skills_text(tree.skills)
-        tree.search_vector = _build_search_vector(tree, skills_text)
+        tree.embedding_hash = input_hash
         await db.commit()
         return True
+
+
+async def embed_skill_trees(db: AsyncSession, tree_ids: list[int]) -> dict[int, str]:
+    """Embed several trees at once, then commit (embedding job worker).
+
+    The trees are loaded in one query and their texts encoded concurrently, so
+    the micro-batcher groups them into few encode(list) calls. Unchanged trees
+    are skipped as in embed_skill_tree; missing trees are ignored.
+
+    Returns {tree_id: error} for the trees whose encoding failed.
+    """
+    # Session réutilisée d'un lot à l'autre par le worker : relire l'état courant, pas l'identity map
+    stmt = (
+        select(SkillTree)
+        .where(SkillTree.id.in_(tree_ids))
+        .options(selectinload(SkillTree.skills), selectinload(SkillTree.tags))
+        .execution_options(populate_existing=True)
+    )
+    pending = []
+    for tree in (await db.execute(stmt)).scalars():
+        text = _tree_embedding_text(tree)
+        input_hash = embedding_input_hash(text)
+        if tree.embedding is not None and tree.embedding_hash == input_hash:
+            embedding_requests_total.labels(status="skipped").inc()
+        else:
+            pending.append((tree, text, input_hash))
+
+    start = time.perf_counter()
+    vectors = await asyncio.gather(*(generate_embedding(text) for _, text, _ in pending), return_exceptions=True)
+    # Durée du lot répartie entre ses arbres : une observation par arbre, comme embed_skill_tree,
+    # sans multiplier la durée du lot par sa taille
+    duration_per_tree = (time.perf_counter() - start) / max(len(pending), 1)
+
+    errors = {}
+    for (tree, _, input_hash), vector in zip(pending, vectors, strict=True):
+        embedding_duration_seconds.observe(duration_per_tree)
+        if isinstance(vector, BaseException):
+            embedding_requests_total.labels(status="error").inc()
+            errors[tree.id] = str(vector) or type(vector).__name__
+            continue
+        embedding_requests_total.labels(status="success").inc()
+        tree.embedding = vector
+        tree.embedding_hash = input_hash
+    await db.commit()
+    return errors
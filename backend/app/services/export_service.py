@@ -0,0 +1,122 @@
+# /backend/app/services/export_service.py
+
+"""Export NDJSON des skill trees (une ligne JSON par arbre, avec skills, arêtes et tags)."""
+
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants import EXPORT_BATCH_SIZE
+from app.models.skill import Skill
+from app.models.skill_dependencies import SkillDependency
+from app.models.skill_tree import SkillTree
+from app.models.tag import SkillTreeTag, Tag
+
+
+@dataclass
+class ExportFilters:
+    """Filtres de l'export ; None : pas de filtre."""
+
+    creator: str | None = None
+    tag: str | None = None
+    updated_since: datetime | None = None
+
+
+def _trees_stmt(filters: ExportFilters):
+    stmt = select(
+        SkillTree.id,
+        SkillTree.name,
+        SkillTree.description,
+        SkillTree.creator_username,
+        SkillTree.created_at,
+        SkillTree.updated_at,
+        SkillTree.version,
+    ).order_by(SkillTree.id)
+    if filters.creator:
+        stmt = stmt.where(SkillTree.creator_username == filters.creator)
+    if filters.tag:
+        stmt = stmt.where(
+            select(SkillTreeTag.skill_tree_id)
+            .join(Tag, SkillTreeTag.tag_id == Tag.id)
+            .where(SkillTreeTag.skill_tree_id == SkillTree.id, Tag.name == filters.tag.strip().lower())
+            .exists()
+        )
+    if filters.updated_since:
+        stmt = stmt.where(SkillTree.updated_at >= filters.updated_since)
+    return stmt
+
+
+async def _encode_batch(db: AsyncSession, trees: list) -> bytes:
+    """Encode un lot d'arbres : trois requêtes (tags, skills, arêtes) pour tout le lot."""
+    tree_ids = [tree.id for tree in trees]
+
+    tags: dict[int, list[str]] = {}
+    rows = await db.execute(
+        select(SkillTreeTag.skill_tree_id, Tag.name)
+        .join(Tag, SkillTreeTag.tag_id == Tag.id)
+        .where(SkillTreeTag.skill_tree_id.in_(tree_ids))
+        .order_by(Tag.name)
+    )
+    for tree_id, name in rows.tuples():
+        tags.setdefault(tree_id, []).append(name)
+
+    unlocks: dict[int, list[int]] = {}
+    rows = await db.execute(
+        select(SkillDependency.skill_id, SkillDependency.unlock_id)
+        .join(Skill, Skill.id == SkillDependency.skill_id)
+        .where(Skill.skill_tree_id.in_(tree_ids))
+    )
+    for skill_id, unlock_id in rows.tuples():
+        unlocks.setdefault(skill_id, []).append(unlock_id)
+
+    skills: dict[int, list[dict]] = {}
+    rows = await db.execute(
+        select(Skill.id, Skill.skill_tree_id, Skill.name, Skill.description, Skill.is_root, Skill.linked_tree_id)
+        .where(Skill.skill_tree_id.in_(tree_ids))
+        .order_by(Skill.id)
+    )
+    for skill in rows:
+        skills.setdefault(skill.skill_tree_id, []).append(
+            {
+                "id": skill.id,
+                "name": skill.name,
+                "description": skill.description,
+                "is_root": skill.is_root,
+                "linked_tree_id": skill.linked_tree_id,
+                "unlock_ids": sorted(unlocks.get(skill.id, [])),
+            }
+        )
+
+    lines = [
+        json.dumps(
+            {
+                "id": tree.id,
+                "name": tree.name,
+                "description": tree.description,
+                "creator_username": tree.creator_username,
+                "created_at": tree.created_at.isoformat(),
+                "updated_at": tree.updated_at.isoformat(),
+                "version": tree.version,
+                "tags": tags.get(tree.id, []),
+                "skills": skills.get(tree.id, []),
+            },
+            ensure_ascii=False,
+        )
+        for tree in trees
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def stream_skill_trees_ndjson(db: AsyncSession, filters: ExportFilters) -> AsyncIterator[bytes]:
+    """Génère l'export NDJSON par lots de EXPORT_BATCH_SIZE arbres.
+
+    Les arbres sont lus via un curseur côté serveur (stream + yield_per) : la mémoire
+    ne dépend que de la taille du lot, pas du nombre d'arbres exportés.
+    """
+    result = await db.stream(_trees_stmt(filters).execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for trees in result.partitions():
+        yield await _encode_batch(db, trees)
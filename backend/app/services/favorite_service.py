@@ -6,6 +6,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user_favorite_trees import UserFavoriteTrees
+from app.services.collection_version_service import bump_collection_version, favorites_key
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +16,7 @@ async def add_user_favorite_tree(db: AsyncSession, user_id: int, tree_id: int) -
     stmt = insert(UserFavoriteTrees).values(user_id=user_id, skill_tree_id=tree_id)
     try:
         await db.execute(stmt)
+        await bump_collection_version(db, favorites_key(user_id))
         await db.commit()
     except IntegrityError as e:
         await db.rollback()
@@ -34,5 +36,7 @@ async def delete_user_favorite_tree(db: AsyncSession, user_id: int, tree_id: int
         UserFavoriteTrees.user_id == user_id, UserFavoriteTrees.skill_tree_id == tree_id
     )
     result = await db.execute(stmt)
+    if result.rowcount:
+        await bump_collection_version(db, favorites_key(user_id))
     await db.commit()
     return result.rowcount != 0
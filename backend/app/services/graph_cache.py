@@ -0,0 +1,261 @@
+# /backend/app/services/graph_cache.py
+
+"""Cache en mémoire du graphe des skill trees, invalidé par la version de l'arbre.
+
+Chaque arbre est stocké sous forme compacte : ids triés et adjacence au format CSR
+dans des array d'entiers, noms et descriptions internés. Le cache est un LRU borné
+par une estimation de la mémoire occupée.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants import GRAPH_CACHE_MAX_BYTES
+from app.metrics import cache_evictions_total, cache_requests_total, cache_size_bytes
+from app.models.skill import Skill
+from app.models.skill_dependencies import SkillDependency
+from app.models.skill_tree import SkillTree
+from app.models.tag import SkillTreeTag, Tag
+from app.schemas.skill import SkillSchema
+from app.schemas.skill_tree import SkillTreeDetailSchema
+
+_CACHE_NAME = "tree_graph"
+
+
+@dataclass(frozen=True, slots=True)
+class TreeGraph:
+    """Graphe d'un skill tree à une version donnée.
+
+    Les skills sont désignés par leur indice i dans skill_ids (trié). Les arêtes
+    sortantes de i sont unlock_targets[unlock_offsets[i]:unlock_offsets[i + 1]],
+    les entrantes parent_targets[parent_offsets[i]:parent_offsets[i + 1]].
+    """
+
+    tree_id: int
+    version: int
+    name: str
+    description: str | None
+    creator_username: str
+    created_at: datetime
+    tags: tuple[str, ...]
+    skill_ids: array
+    names: tuple[str, ...]
+    descriptions: tuple[str | None, ...]
+    roots: bytes
+    linked_tree_ids: array  # 0 si le skill n'est pas lié
+    unlock_offsets: array
+    unlock_targets: array
+    parent_offsets: array
+    parent_targets: array
+    nbytes: int
+
+    def __len__(self) -> int:
+        return len(self.skill_ids)
+
+    def index(self, skill_id: int) -> int:
+        """Indice du skill, ou -1 s'il n'appartient pas à l'arbre."""
+        i = bisect_left(self.skill_ids, skill_id)
+        if i < len(self.skill_ids) and self.skill_ids[i] == skill_id:
+            return i
+        return -1
+
+    def unlocks(self, i: int) -> array:
+        return self.unlock_targets[self.unlock_offsets[i] : self.unlock_offsets[i + 1]]
+
+    def parents(self, i: int) -> array:
+        return self.parent_targets[self.parent_offsets[i] : self.parent_offsets[i + 1]]
+
+    def to_detail_schema(self) -> SkillTreeDetailSchema:
+        """Construit la réponse détaillée sans repasser par l'ORM ni la validation."""
+        skills = [
+            SkillSchema.model_construct(
+                id=skill_id,
+                name=self.names[i],
+                description=self.descriptions[i],
+                is_root=bool(self.roots[i]),
+                linked_tree_id=self.linked_tree_ids[i] or None,
+                unlock_ids=[self.skill_ids[j] for j in self.unlocks(i)],
+            )
+            for i, skill_id in enumerate(self.skill_ids)
+        ]
+        return SkillTreeDetailSchema.model_construct(
+            id=self.tree_id,
+            name=self.name,
+            description=self.description,
+            creator_username=self.creator_username,
+            created_at=self.created_at,
+            version=self.version,
+            skills=skills,
+            tags=list(self.tags),
+        )
+
+
+_graphs: OrderedDict[int, TreeGraph] = OrderedDict()
+_total_bytes = 0
+
+
+def clear_graph_cache() -> None:
+    """Vide le cache (tests, rechargement)."""
+    global _total_bytes
+    _graphs.clear()
+    _total_bytes = 0
+    cache_size_bytes.labels(cache=_CACHE_NAME).set(0)
+
+
+async def get_tree_graph(db: AsyncSession, tree_id: int) -> TreeGraph | None:
+    """Retourne le graphe d'un arbre, ou None s'il n'existe pas."""
+    return (await get_tree_graphs(db, {tree_id})).get(tree_id)
+
+
+async def get_tree_graphs(db: AsyncSession, tree_ids: set[int]) -> dict[int, TreeGraph]:
+    """Retourne le graphe des arbres demandés ; les arbres inexistants sont absents du résultat.
+
+    Une requête sur les versions suffit quand tout est en cache ; sinon les arbres
+    obsolètes sont rechargés ensemble (métadonnées, skills, arêtes).
+    """
+    if not tree_ids:
+        return {}
+    rows = await db.execute(select(SkillTree.id, SkillTree.version).where(SkillTree.id.in_(tree_ids)))
+    versions = dict(rows.tuples().all())
+
+    found: dict[int, TreeGraph] = {}
+    stale: list[int] = []
+    for tree_id, version in versions.items():
+        graph = _graphs.get(tree_id)
+        if graph is not None and graph.version == version:
+            _graphs.move_to_end(tree_id)
+            found[tree_id] = graph
+        else:
+            stale.append(tree_id)
+    cache_requests_total.labels(cache=_CACHE_NAME, result="hit").inc(len(found))
+
+    if stale:
+        cache_requests_total.labels(cache=_CACHE_NAME, result="miss").inc(len(stale))
+        for graph in await _load_graphs(db, stale):
+            _store(graph)
+            found[graph.tree_id] = graph
+    return found
+
+
+def _store(graph: TreeGraph) -> None:
+    global _total_bytes
+    previous = _graphs.pop(graph.tree_id, None)
+    if previous is not None:
+        _total_bytes -= previous.nbytes
+    # Un graphe plus gros que tout le cache n'est pas gardé (l'ancienne version est tout de même retirée)
+    if graph.nbytes <= GRAPH_CACHE_MAX_BYTES:
+        _graphs[graph.tree_id] = graph
+        _total_bytes += graph.nbytes
+        while _total_bytes > GRAPH_CACHE_MAX_BYTES:
+            _, evicted = _graphs.popitem(last=False)
+            _total_bytes -= evicted.nbytes
+            cache_evictions_total.labels(cache=_CACHE_NAME).inc()
+    cache_size_bytes.labels(cache=_CACHE_NAME).set(_total_bytes)
+
+
+async def _load_graphs(db: AsyncSession, tree_ids: list[int]) -> list[TreeGraph]:
+    trees = (
+        await db.execute(
+            select(
+                SkillTree.id,
+                SkillTree.version,
+                SkillTree.name,
+                SkillTree.description,
+                SkillTree.creator_username,
+                SkillTree.created_at,
+            ).where(SkillTree.id.in_(tree_ids))
+        )
+    ).all()
+
+    tags: dict[int, list[str]] = {}
+    tag_rows = await db.execute(
+        select(SkillTreeTag.skill_tree_id, Tag.name)
+        .join(Tag, Tag.id == SkillTreeTag.tag_id)
+        .where(SkillTreeTag.skill_tree_id.in_(tree_ids))
+        .order_by(Tag.name)
+    )
+    for tree_id, tag_name in tag_rows.tuples().all():
+        tags.setdefault(tree_id, []).append(tag_name)
+
+    skills: dict[int, list] = {}
+    skill_rows = await db.execute(
+        select(Skill.id, Skill.skill_tree_id, Skill.name, Skill.description, Skill.is_root, Skill.linked_tree_id)
+        .where(Skill.skill_tree_id.in_(tree_ids))
+        .order_by(Skill.skill_tree_id, Skill.id)
+    )
+    for skill in skill_rows.all():
+        skills.setdefault(skill.skill_tree_id, []).append(skill)
+
+    edges: dict[int, list[tuple[int, int]]] = {}
+    edge_rows = await db.execute(
+        select(Skill.skill_tree_id, SkillDependency.skill_id, SkillDependency.unlock_id)
+        .join(Skill, Skill.id == SkillDependency.skill_id)
+        .where(Skill.skill_tree_id.in_(tree_ids))
+    )
+    for tree_id, skill_id, unlock_id in edge_rows.tuples().all():
+        edges.setdefault(tree_id, []).append((skill_id, unlock_id))
+
+    return [
+        _build_graph(tree, tags.get(tree.id, []), skills.get(tree.id, []), edges.get(tree.id, [])) for tree in trees
+    ]
+
+
+def _build_graph(tree, tags: list[str], skills: list, edges: list[tuple[int, int]]) -> TreeGraph:
+    skill_ids = array("q", (s.id for s in skills))
+    position = {skill_id: i for i, skill_id in enumerate(skill_ids)}
+    # Les dépendances vers un autre arbre ne font pas partie du graphe
+    pairs = [(position[a], position[b]) for a, b in edges if a in position and b in position]
+
+    unlock_offsets, unlock_targets = _csr(len(skill_ids), sorted(pairs))
+    parent_offsets, parent_targets = _csr(len(skill_ids), sorted((b, a) for a, b in pairs))
+    names = tuple(sys.intern(s.name) for s in skills)
+    descriptions = tuple(sys.intern(s.description) if s.description is not None else None for s in skills)
+    roots = bytes(s.is_root for s in skills)
+    linked_tree_ids = array("q", (s.linked_tree_id or 0 for s in skills))
+
+    arrays = (skill_ids, linked_tree_ids, unlock_offsets, unlock_targets, parent_offsets, parent_targets)
+    nbytes = (
+        sum(a.itemsize * len(a) for a in arrays)
+        + len(roots)
+        + sum(sys.getsizeof(s) for s in names)
+        + sum(sys.getsizeof(s) for s in descriptions if s is not None)
+        + sys.getsizeof(names)
+        + sys.getsizeof(descriptions)
+        + 1024  # métadonnées de l'arbre et en-têtes
+    )
+    return TreeGraph(
+        tree_id=tree.id,
+        version=tree.version,
+        name=tree.name,
+        description=tree.description,
+        creator_username=tree.creator_username,
+        created_at=tree.created_at,
+        tags=tuple(sys.intern(t) for t in tags),
+        skill_ids=skill_ids,
+        names=names,
+        descriptions=descriptions,
+        roots=roots,
+        linked_tree_ids=linked_tree_ids,
+        unlock_offsets=unlock_offsets,
+        unlock_targets=unlock_targets,
+        parent_offsets=parent_offsets,
+        parent_targets=parent_targets,
+        nbytes=nbytes,
+    )
+
+
+def _csr(size: int, pairs: list[tuple[int, int]]) -> tuple[array, array]:
+    """Offsets et cibles au format CSR à partir de paires (source, cible) triées par source."""
+    offsets = array("i", bytes(4 * (size + 1)))
+    for source, _ in pairs:
+        offsets[source + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    return offsets, array("i", (target for _, target in pairs))
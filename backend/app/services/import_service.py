@@ -0,0 +1,278 @@
+# /backend/app/services/import_service.py
+
+"""Import en masse de skill trees au format NDJSON (une ligne JSON par arbre).
+
+Les lignes sont validées en Python puis chargées par lots de IMPORT_BATCH_SIZE
+arbres, un lot par transaction : COPY vers des tables temporaires, puis quelques
+INSERT ... SELECT ensemblistes vers les vraies tables. Les ids temporaires des
+skills sont remplacés par leurs ids réels via (arbre, nom), unique par arbre.
+Les embeddings ne sont pas calculés pendant l'import : chaque lot planifie ceux de
+ses arbres dans la file embedding_jobs, traitée par le worker d'embeddings.
+Leur search_vector est construit par search_vector_service (arbres marqués à l'insertion).
+"""
+
+import json
+import time
+from collections.abc import AsyncIterable, AsyncIterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants import IMPORT_BATCH_SIZE, IMPORT_MAX_LINE_BYTES
+from app.schemas.skill_tree import SkillTreeImportErrorSchema, SkillTreeImportResultSchema, SkillTreeImportSchema
+from app.services.closure_service import has_cycle, refresh_closure
+from app.services.collection_version_service import CATALOGUE_KEY, bump_collection_version
+from app.services.embedding_job_service import enqueue_embedding_jobs
+from app.services.skill_tree_service import is_root_skill_valid
+
+# Tables de staging, supprimées au commit du lot
+_STAGING_TABLES = (
+    """CREATE TEMP TABLE import_trees (
+      line INTEGER PRIMARY KEY, name TEXT NOT NULL, description TEXT, tree_id INTEGER
+  ) ON COMMIT DROP""",
+    """CREATE TEMP TABLE import_skills (
+      line INTEGER, temp_id BIGINT, name TEXT NOT NULL, description TEXT,
+      is_root BOOLEAN NOT NULL, linked_tree_id INTEGER, PRIMARY KEY (line, temp_id)
+  ) ON COMMIT DROP""",
+    """CREATE TEMP TABLE import_edges (
+      line INTEGER, skill_temp_id BIGINT, unlock_temp_id BIGINT
+  ) ON COMMIT DROP""",
+    """CREATE TEMP TABLE import_tags (line INTEGER, name TEXT NOT NULL) ON COMMIT DROP""",
+)
+
+# Les noms déjà pris sont ignorés : leur ligne garde tree_id NULL et sera signalée
+_INSERT_TREES_SQL = text(
+    """WITH inserted AS (
+      INSERT INTO skill_trees (name, description, creator_username)
+      SELECT name, description, :creator FROM import_trees ORDER BY line
+      ON CONFLICT (name) DO NOTHING
+      RETURNING id, name
+  )
+  UPDATE import_trees SET tree_id = inserted.id
+  FROM inserted
+  WHERE import_trees.name = inserted.name"""
+)
+
+# Un linked_tree_id qui ne désigne aucun arbre de la base est remis à NULL
+_INSERT_SKILLS_SQL = text(
+    """INSERT INTO skills (skill_tree_id, name, description, is_root, linked_tree_id)
+  SELECT import_trees.tree_id, import_skills.name, import_skills.description,
+         import_skills.is_root, linked.id
+  FROM import_skills
+  INNER JOIN import_trees ON import_trees.line = import_skills.line
+  LEFT JOIN skill_trees AS linked ON linked.id = import_skills.linked_tree_id
+  WHERE import_trees.tree_id IS NOT NULL"""
+)
+
+_INSERT_EDGES_SQL = text(
+    """INSERT INTO skill_dependencies (skill_id, unlock_id)
+  SELECT source.id, target.id
+  FROM import_edges
+  INNER JOIN import_trees ON import_trees.line = import_edges.line
+  INNER JOIN import_skills AS source_tmp
+      ON source_tmp.line = import_edges.line AND source_tmp.temp_id = import_edges.skill_temp_id
+  INNER JOIN import_skills AS target_tmp
+      ON target_tmp.line = import_edges.line AND target_tmp.temp_id = import_edges.unlock_temp_id
+  INNER JOIN skills AS source
+      ON source.skill_tree_id = import_trees.tree_id AND source.name = source_tmp.name
+  INNER JOIN skills AS target
+      ON target.skill_tree_id = import_trees.tree_id AND target.name = target_tmp.name"""
+)
+
+_INSERT_TAGS_SQL = text(
+    """INSERT INTO tags (name)
+  SELECT DISTINCT import_tags.name
+  FROM import_tags
+  INNER JOIN import_trees ON import_trees.line = import_tags.line
+  WHERE import_trees.tree_id IS NOT NULL
+  ON CONFLICT (name) DO NOTHING"""
+)
+
+_INSERT_TREE_TAGS_SQL = text(
+    """INSERT INTO skill_tree_tags (skill_tree_id, tag_id)
+  SELECT import_trees.tree_id, tags.id
+  FROM import_tags
+  INNER JOIN import_trees ON import_trees.line = import_tags.line
+  INNER JOIN tags ON tags.name = import_tags.name
+  WHERE import_trees.tree_id IS NOT NULL"""
+)
+
+# Copie dénormalisée des tags (SkillTree.tag_ids), comme _sync_tags
+_UPDATE_TAG_IDS_SQL = text(
+    """UPDATE skill_trees SET tag_ids = tagged.tag_ids
+  FROM (
+      SELECT skill_tree_tags.skill_tree_id, array_agg(skill_tree_tags.tag_id ORDER BY skill_tree_tags.tag_id) AS tag_ids
+      FROM skill_tree_tags
+      INNER JOIN import_trees ON import_trees.tree_id = skill_tree_tags.skill_tree_id
+      GROUP BY skill_tree_tags.skill_tree_id
+  ) AS tagged
+  WHERE skill_trees.id = tagged.skill_tree_id"""
+)
+
+
+async def iter_ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes | None]:
+    """Découpe un flux d'octets en lignes, sans charger tout le corps en mémoire.
+
+    Une ligne de plus de IMPORT_MAX_LINE_BYTES octets n'est pas gardée en mémoire :
+    None est produit à sa place, pour qu'elle soit signalée avec son numéro.
+    """
+    pending = bytearray()
+    too_long = False
+    async for chunk in chunks:
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            if too_long or len(pending) + len(line) > IMPORT_MAX_LINE_BYTES:
+                yield None
+            elif pending:
+                pending += line
+                yield bytes(pending)
+            else:
+                yield line
+            pending.clear()
+            too_long = False
+        if not too_long:
+            pending += rest
+            if len(pending) > IMPORT_MAX_LINE_BYTES:
+                # La suite de la ligne est ignorée jusqu'au prochain saut de ligne
+                pending.clear()
+                too_long = True
+    if too_long:
+        yield None
+    elif pending:
+        yield bytes(pending)
+
+
+def _validate_tree(tree: SkillTreeImportSchema) -> str | None:
+    """Retourne la raison du rejet de l'arbre, ou None s'il est valide."""
+    ids = [s.id for s in tree.skills]
+    if len(set(ids)) != len(ids):
+        return "Identifiants de skills en double"
+    if len({s.name for s in tree.skills}) != len(ids):
+        return "Noms de skills en double"
+    edges = {(s.id, uid) for s in tree.skills for uid in s.unlock_ids}
+    if any(uid not in ids for _, uid in edges):
+        return "Dépendance vers un skill inconnu"
+    if not is_root_skill_valid(tree.skills):
+        return "error in root skill: must be exactly one root, cannot be an unlock"
+    if has_cycle(edges):
+        return "Le graphe de compétences contient un cycle"
+    return None
+
+
+async def _load_batch(
+    db: AsyncSession,
+    batch: list[tuple[int, SkillTreeImportSchema]],
+    creator_username: str,
+    result: SkillTreeImportResultSchema,
+) -> None:
+    """Charge un lot d'arbres validés en une transaction, puis commit."""
+    for statement in _STAGING_TABLES:
+        await db.execute(text(statement))
+
+    connection = await db.connection()
+    raw = (await connection.get_raw_connection()).driver_connection
+    await raw.copy_records_to_table(
+        "import_trees",
+        records=[(line, tree.name, tree.description) for line, tree in batch],
+        columns=["line", "name", "description"],
+    )
+    await raw.copy_records_to_table(
+        "import_skills",
+        records=[
+            (line, s.id, s.name, s.description, s.is_root, s.linked_tree_id)
+            for line, tree in batch
+            for s in tree.skills
+        ],
+        columns=["line", "temp_id", "name", "description", "is_root", "linked_tree_id"],
+    )
+    await raw.copy_records_to_table(
+        "import_edges",
+        records=[(line, s.id, uid) for line, tree in batch for s in tree.skills for uid in set(s.unlock_ids)],
+        columns=["line", "skill_temp_id", "unlock_temp_id"],
+    )
+    await raw.copy_records_to_table(
+        "import_tags",
+        records=[(line, tag) for line, tree in batch for tag in tree.tags],
+        columns=["line", "name"],
+    )
+
+    await db.execute(_INSERT_TREES_SQL, {"creator": creator_username})
+    rows = await db.execute(text("SELECT line, tree_id FROM import_trees ORDER BY line"))
+    tree_ids = []
+    for line, tree_id in rows.tuples():
+        if tree_id is None:
+            result.errors.append(SkillTreeImportErrorSchema(line=line, detail="Un arbre avec ce nom existe déjà"))
+        else:
+            tree_ids.append(tree_id)
+    if not tree_ids:
+        await db.rollback()
+        return
+
+    skills = (await db.execute(_INSERT_SKILLS_SQL)).rowcount
+    dependencies = (await db.execute(_INSERT_EDGES_SQL)).rowcount
+    await db.execute(_INSERT_TAGS_SQL)
+    tags = (await db.execute(_INSERT_TREE_TAGS_SQL)).rowcount
+    if tags:
+        await db.execute(_UPDATE_TAG_IDS_SQL)
+    await refresh_closure(db, tree_ids)
+    await enqueue_embedding_jobs(db, tree_ids)
+    await bump_collection_version(db, CATALOGUE_KEY)
+    await db.commit()
+
+    result.tree_ids.extend(tree_ids)
+    result.skills += skills
+    result.dependencies += dependencies
+    result.tags += tags
+
+
+async def import_skill_trees_ndjson(
+    db: AsyncSession, lines: AsyncIterable[bytes | str | None], creator_username: str
+) -> SkillTreeImportResultSchema:
+    """Importe des skill trees NDJSON pour creator_username.
+
+    Les lignes invalides (trop longues, JSON, schéma, graphe, nom déjà pris) sont
+    ignorées et signalées dans errors avec leur numéro ; les autres sont chargées par lots.
+    Une ligne None est une ligne trop longue (voir iter_ndjson_lines).
+    """
+    result = SkillTreeImportResultSchema()
+    start = time.perf_counter()
+    batch: list[tuple[int, SkillTreeImportSchema]] = []
+    names: set[str] = set()
+    line_number = 0
+
+    async for raw_line in lines:
+        line_number += 1
+        if raw_line is None or len(raw_line) > IMPORT_MAX_LINE_BYTES:
+            result.errors.append(SkillTreeImportErrorSchema(line=line_number, detail="Ligne trop longue"))
+            continue
+        if not raw_line.strip():
+            continue
+        try:
+            tree = SkillTreeImportSchema.model_validate(json.loads(raw_line))
+        except ValueError as e:  # JSONDecodeError et ValidationError
+            detail = "JSON invalide" if isinstance(e, json.JSONDecodeError) else "Format d'arbre invalide"
+            result.errors.append(SkillTreeImportErrorSchema(line=line_number, detail=detail))
+            continue
+
+        error = _validate_tree(tree)
+        if error is None and tree.name in names:
+            error = "Nom d'arbre en double dans l'import"
+        if error is not None:
+            result.errors.append(SkillTreeImportErrorSchema(line=line_number, detail=error))
+            continue
+
+        names.add(tree.name)
+        batch.append((line_number, tree))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await _load_batch(db, batch, creator_username, result)
+            batch = []
+
+    if batch:
+        await _load_batch(db, batch, creator_username, result)
+
+    result.errors.sort(key=lambda error: error.line)
+    result.rows = len(result.tree_ids) + result.skills + result.dependencies + result.tags
+    result.duration_seconds = round(time.perf_counter() - start, 3)
+    if result.duration_seconds:
+        result.rows_per_second = round(result.rows / result.duration_seconds, 1)
+    return result
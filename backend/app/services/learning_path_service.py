@@ -0,0 +1,115 @@
+# /backend/app/services/learning_path_service.py
+
+"""Calcul du chemin d'apprentissage vers une compétence visée."""
+
+import heapq
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.skill import Skill
+from app.models.user_check_skill import UserCheckSkill
+from app.schemas.skill import LearningPathSchema, LearningPathStepSchema
+from app.services.check_buffer import apply_pending
+from app.services.graph_cache import TreeGraph, get_tree_graphs
+
+
+async def _get_checked_skill_ids(db: AsyncSession, user_id: int, tree_ids: set[int]) -> set[int]:
+    stmt = (
+        select(UserCheckSkill.skill_id)
+        .join(Skill, Skill.id == UserCheckSkill.skill_id)
+        .where(UserCheckSkill.user_id == user_id, Skill.skill_tree_id.in_(tree_ids))
+    )
+    return apply_pending(user_id, set((await db.execute(stmt)).scalars().all()))
+
+
+async def plan_learning_path(db: AsyncSession, user_id: int, skill_tree_id: int, skill_id: int) -> LearningPathSchema:
+    """Retourne les prérequis non acquis de skill_id, dans un ordre où chacun précède ce qu'il débloque.
+
+    Les prérequis sont les ancêtres du skill dans son arbre ; on s'arrête aux skills
+    déjà acquis. Un skill lié à un autre arbre (linked_tree_id) exige tous les skills
+    non acquis de cet arbre, récursivement. Les graphes viennent du cache en mémoire,
+    la base n'est interrogée que pour les versions et les skills cochés.
+    """
+    graphs = await get_tree_graphs(db, {skill_tree_id})
+    tree = graphs.get(skill_tree_id)
+    if tree is None or tree.index(skill_id) < 0:
+        raise HTTPException(status_code=404, detail="Skill not found")
+
+    checked = await _get_checked_skill_ids(db, user_id, {skill_tree_id})
+    if skill_id in checked:
+        return LearningPathSchema(skill_id=skill_id, steps=[])
+
+    # owner associe chaque skill retenu à son graphe et à son indice dans ce graphe
+    owner: dict[int, tuple[TreeGraph, int]] = {skill_id: (tree, tree.index(skill_id))}
+    stack = [owner[skill_id][1]]
+    while stack:
+        current = stack.pop()
+        for parent in tree.parents(current):
+            parent_id = tree.skill_ids[parent]
+            if parent_id not in owner and parent_id not in checked:
+                owner[parent_id] = (tree, parent)
+                stack.append(parent)
+
+    # Expansion des arbres liés, niveau par niveau : un aller-retour par niveau de liens
+    link_deps: dict[int, list[int]] = {}
+    links = [(s, tree.linked_tree_ids[i]) for s, (_, i) in owner.items() if tree.linked_tree_ids[i]]
+    while links:
+        new_tree_ids = {linked for _, linked in links} - graphs.keys()
+        if new_tree_ids:
+            graphs.update(await get_tree_graphs(db, new_tree_ids))
+            checked |= await _get_checked_skill_ids(db, user_id, new_tree_ids)
+        next_links = []
+        for link_skill, linked_tree_id in links:
+            linked = graphs.get(linked_tree_id)
+            if linked is None or linked is owner[link_skill][0]:
+                continue
+            missing = [(s, i) for i, s in enumerate(linked.skill_ids) if s not in checked]
+            link_deps[link_skill] = [s for s, _ in missing]
+            for s, i in missing:
+                if s not in owner:
+                    owner[s] = (linked, i)
+                    if linked.linked_tree_ids[i]:
+                        next_links.append((s, linked.linked_tree_ids[i]))
+        links = next_links
+
+    order = _topological_order(owner, link_deps)
+    steps = []
+    for s in order:
+        if s != skill_id:
+            graph, i = owner[s]
+            steps.append(LearningPathStepSchema(id=s, name=graph.names[i], skill_tree_id=graph.tree_id))
+    return LearningPathSchema(skill_id=skill_id, steps=steps)
+
+
+def _topological_order(owner: dict[int, tuple[TreeGraph, int]], link_deps: dict[int, list[int]]) -> list[int]:
+    """Tri topologique (Kahn) des skills retenus ; à égalité, le plus petit id d'abord.
+
+    Des liens circulaires entre arbres peuvent laisser des skills hors du tri :
+    ils sont ajoutés à la fin.
+    """
+    children: dict[int, list[int]] = {}
+    in_degree = dict.fromkeys(owner, 0)
+    for node, (graph, i) in owner.items():
+        deps = [graph.skill_ids[p] for p in graph.parents(i) if graph.skill_ids[p] in owner]
+        deps.extend(link_deps.get(node, ()))
+        for dep in deps:
+            children.setdefault(dep, []).append(node)
+        in_degree[node] = len(deps)
+
+    ready = [node for node, degree in in_degree.items() if degree == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node = heapq.heappop(ready)
+        order.append(node)
+        for child in children.get(node, ()):
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                heapq.heappush(ready, child)
+
+    if len(order) < len(owner):
+        emitted = set(order)
+        order.extend(sorted(node for node in owner if node not in emitted))
+    return order
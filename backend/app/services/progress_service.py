@@ -0,0 +1,159 @@
+# /backend/app/services/progress_service.py
+
+"""Progression d'un utilisateur par skill tree, calculée en une requête groupée.
+
+Le résultat est mis en cache par utilisateur, associé à users.checks_version,
+incrémentée dans la transaction de chaque écriture sur ses checks : un check ou un
+uncheck passé par n'importe quel processus invalide ses entrées. Le TTL borne le
+décalage après l'édition d'un arbre.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Integer
+
+from app.constants import PROGRESS_CACHE_MAX_ENTRIES, PROGRESS_CACHE_MAX_ENTRIES_PER_USER, PROGRESS_CACHE_TTL
+from app.metrics import cache_evictions_total, cache_requests_total
+from app.models.user import User
+from app.schemas.user import UserTreeProgressSchema
+
+_CACHE_NAME = "user_progress"
+
+# Sans tree_ids : les arbres où l'utilisateur a au moins un skill coché.
+# Un skill est bloqué s'il est débloqué par un skill non coché ; la frontière
+# regroupe les skills non cochés et non bloqués.
+_PROGRESS_SQL = text(
+    """WITH trees AS (
+      SELECT id FROM skill_trees WHERE id = ANY(:tree_ids)
+
+      UNION
+
+      SELECT skills.skill_tree_id
+      FROM user_check_skill
+      INNER JOIN skills ON skills.id = user_check_skill.skill_id
+      WHERE user_check_skill.user_id = :user_id AND CAST(:tree_ids AS INTEGER[]) IS NULL
+  ),
+  states AS (
+      SELECT skills.id, skills.skill_tree_id, user_check_skill.skill_id IS NOT NULL AS checked
+      FROM skills
+      INNER JOIN trees ON trees.id = skills.skill_tree_id
+      LEFT JOIN user_check_skill
+          ON user_check_skill.skill_id = skills.id AND user_check_skill.user_id = :user_id
+  ),
+  blocked AS (
+      SELECT DISTINCT skill_dependencies.unlock_id AS id
+      FROM states
+      INNER JOIN skill_dependencies ON skill_dependencies.skill_id = states.id
+      WHERE NOT states.checked
+  )
+  SELECT trees.id AS skill_tree_id,
+         COUNT(states.id) FILTER (WHERE states.checked) AS checked,
+         COUNT(states.id) AS total,
+         COALESCE(
+             array_agg(states.id ORDER BY states.id) FILTER (WHERE NOT states.checked AND blocked.id IS NULL),
+             CAST('{}' AS INTEGER[])
+         ) AS frontier
+  FROM trees
+  LEFT JOIN states ON states.skill_tree_id = trees.id
+  LEFT JOIN blocked ON blocked.id = states.id
+  GROUP BY trees.id
+  ORDER BY trees.id"""
+).bindparams(bindparam("tree_ids", type_=ARRAY(Integer())))
+
+# Verrous pris par id croissant : deux flushs concurrents ne s'interbloquent pas
+_BUMP_CHECKS_VERSION_SQL = text(
+    """UPDATE users SET checks_version = users.checks_version + 1
+  FROM (SELECT id FROM users WHERE id = ANY(:user_ids) ORDER BY id FOR NO KEY UPDATE) AS locked
+  WHERE users.id = locked.id"""
+).bindparams(bindparam("user_ids", type_=ARRAY(Integer())))
+
+
+@dataclass
+class _UserEntries:
+    """Entrées d'un utilisateur, toutes calculées à la même version de ses checks."""
+
+    checks_version: int
+    # arbres demandés (None : tous) -> (expiration, résultat), du moins au plus récemment utilisé
+    entries: OrderedDict[tuple[int, ...] | None, tuple[float, list[UserTreeProgressSchema]]] = field(
+        default_factory=OrderedDict
+    )
+
+
+_progress: OrderedDict[int, _UserEntries] = OrderedDict()
+_entry_count = 0
+
+
+async def bump_checks_version(db: AsyncSession, user_ids: list[int]) -> None:
+    """Invalide la progression en cache des utilisateurs, dans tous les processus (does NOT commit)."""
+    if user_ids:
+        await db.execute(_BUMP_CHECKS_VERSION_SQL, {"user_ids": user_ids})
+
+
+def _drop_user(user_id: int) -> None:
+    global _entry_count
+    user = _progress.pop(user_id, None)
+    if user is not None:
+        _entry_count -= len(user.entries)
+
+
+async def get_user_progress(
+    db: AsyncSession, user_id: int, tree_ids: list[int] | None = None
+) -> list[UserTreeProgressSchema]:
+    """Progression de l'utilisateur sur les arbres demandés (ou ceux qu'il a commencés), triée par arbre."""
+    global _entry_count
+    key = tuple(sorted(set(tree_ids))) if tree_ids else None
+    # Lue avant le calcul : un check concurrent rend l'entrée obsolète, jamais l'inverse
+    version = (await db.execute(select(User.checks_version).where(User.id == user_id))).scalar_one_or_none()
+    user = _progress.get(user_id)
+    if user is not None and user.checks_version == version:
+        cached = user.entries.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            _progress.move_to_end(user_id)
+            user.entries.move_to_end(key)
+            cache_requests_total.labels(cache=_CACHE_NAME, result="hit").inc()
+            return cached[1]
+    cache_requests_total.labels(cache=_CACHE_NAME, result="miss").inc()
+
+    rows = await db.execute(_PROGRESS_SQL, {"user_id": user_id, "tree_ids": list(key) if key else None})
+    progress = [
+        UserTreeProgressSchema(
+            skill_tree_id=row.skill_tree_id,
+            checked=row.checked,
+            total=row.total,
+            completion=round(100 * row.checked / row.total, 1) if row.total else 0.0,
+            frontier_skill_ids=row.frontier,
+        )
+        for row in rows
+    ]
+    if version is None:
+        return progress
+
+    if user is None or user.checks_version != version:
+        _drop_user(user_id)
+        user = _progress[user_id] = _UserEntries(checks_version=version)
+    if key not in user.entries:
+        _entry_count += 1
+    user.entries[key] = (time.monotonic() + PROGRESS_CACHE_TTL, progress)
+    user.entries.move_to_end(key)
+    _progress.move_to_end(user_id)
+    if len(user.entries) > PROGRESS_CACHE_MAX_ENTRIES_PER_USER:
+        user.entries.popitem(last=False)
+        _entry_count -= 1
+        cache_evictions_total.labels(cache=_CACHE_NAME).inc()
+    while _entry_count > PROGRESS_CACHE_MAX_ENTRIES:
+        oldest = next(iter(_progress))
+        cache_evictions_total.labels(cache=_CACHE_NAME).inc(len(_progress[oldest].entries))
+        _drop_user(oldest)
+    return progress
+
+
+def clear_progress_cache() -> None:
+    """Vide le cache (tests, rechargement)."""
+    global _entry_count
+    _progress.clear()
+    _entry_count = 0
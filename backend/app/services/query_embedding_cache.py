@@ -0,0 +1,182 @@
+# /backend/app/services/query_embedding_cache.py
+
+"""Cache LRU des vecteurs des requêtes de recherche.
+
+La clé est la requête normalisée (casse, espaces et accents repliés) ; le vecteur
+est celui de la première forme rencontrée. TTL optionnel (QUERY_EMBEDDING_CACHE_TTL,
+0 : sans expiration). Les requêtes sont comptées en mémoire puis cumulées dans
+search_query_stats par un job du lifespan ; au démarrage, les plus fréquentes sont
+encodées d'avance (en un lot, grâce au micro-batching).
+"""
+
+import asyncio
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Integer, String
+
+from app.constants import (
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+    QUERY_EMBEDDING_CACHE_TTL,
+    QUERY_EMBEDDING_WARMUP_COUNT,
+    QUERY_STATS_FLUSH_INTERVAL,
+    QUERY_STATS_MAX_PENDING,
+)
+from app.database import async_session
+from app.metrics import cache_evictions_total, cache_requests_total
+from app.models.search_query_stat import SearchQueryStat
+from app.services.embedding_service import generate_embedding
+
+logger = logging.getLogger(__name__)
+
+_CACHE_NAME = "query_embedding"
+_MAX_QUERY_LENGTH = 200  # taille des colonnes de search_query_stats
+
+_UPSERT_STATS_SQL = text(
+    """INSERT INTO search_query_stats (query_key, query, hits, last_seen_at)
+  SELECT query_key, query, hits, LOCALTIMESTAMP
+  FROM unnest(:keys, :queries, :hits) AS pending(query_key, query, hits)
+  ON CONFLICT (query_key) DO UPDATE SET
+      query = EXCLUDED.query,
+      hits = search_query_stats.hits + EXCLUDED.hits,
+      last_seen_at = EXCLUDED.last_seen_at"""
+).bindparams(
+    bindparam("keys", type_=ARRAY(String())),
+    bindparam("queries", type_=ARRAY(String())),
+    bindparam("hits", type_=ARRAY(Integer())),
+)
+
+# clé -> (expiration, vecteur) ; ordre LRU
+_vectors: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+# Encodages en cours : des requêtes identiques simultanées n'en lancent qu'un
+_inflight: dict[str, asyncio.Task] = {}
+# clé -> (dernière forme saisie, nombre de recherches depuis la dernière écriture)
+_query_counts: dict[str, tuple[str, int]] = {}
+
+
+def normalize_query(query: str) -> str:
+    """Forme canonique d'une requête : minuscules, accents retirés, espaces réduits."""
+    folded = unicodedata.normalize("NFKD", query.casefold())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return " ".join(folded.split())[:_MAX_QUERY_LENGTH]
+
+
+def _store(key: str, vector: list[float]) -> None:
+    expires_at = time.monotonic() + QUERY_EMBEDDING_CACHE_TTL if QUERY_EMBEDDING_CACHE_TTL else float("inf")
+    _vectors[key] = (expires_at, vector)
+    _vectors.move_to_end(key)
+    while len(_vectors) > QUERY_EMBEDDING_CACHE_MAX_ENTRIES:
+        _vectors.popitem(last=False)
+        cache_evictions_total.labels(cache=_CACHE_NAME).inc()
+
+
+def _on_encoded(key: str, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        _store(key, task.result())
+
+
+def _count_query(key: str, query: str) -> None:
+    entry = _query_counts.get(key)
+    if entry is None and len(_query_counts) >= QUERY_STATS_MAX_PENDING:
+        return
+    _query_counts[key] = (" ".join(query.split())[:_MAX_QUERY_LENGTH], (entry[1] if entry else 0) + 1)
+
+
+async def get_query_embedding(query: str) -> list[float]:
+    """Vecteur de la requête de recherche, depuis le cache ou encodé (is_query=True)."""
+    key = normalize_query(query)
+    _count_query(key, query)
+
+    cached = _vectors.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        _vectors.move_to_end(key)
+        cache_requests_total.labels(cache=_CACHE_NAME, result="hit").inc()
+        return cached[1]
+    if cached is not None:
+        del _vectors[key]
+
+    task = _inflight.get(key)
+    if task is None:
+        cache_requests_total.labels(cache=_CACHE_NAME, result="miss").inc()
+        task = asyncio.ensure_future(generate_embedding(" ".join(query.split()), is_query=True))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _on_encoded(key, done))
+    else:
+        # Encodage déjà lancé par une requête identique : aucun encodage supplémentaire
+        cache_requests_total.labels(cache=_CACHE_NAME, result="hit").inc()
+    return await asyncio.shield(task)
+
+
+async def flush_query_stats(db: AsyncSession) -> int:
+    """Cumule les compteurs en mémoire dans search_query_stats, puis commit.
+
+    Retourne le nombre de requêtes distinctes écrites.
+    """
+    if not _query_counts:
+        return 0
+    pending = list(_query_counts.items())
+    _query_counts.clear()
+    await db.execute(
+        _UPSERT_STATS_SQL,
+        {
+            "keys": [key for key, _ in pending],
+            "queries": [query for _, (query, _) in pending],
+            "hits": [hits for _, (_, hits) in pending],
+        },
+    )
+    await db.commit()
+    return len(pending)
+
+
+async def run_query_stats_flusher(interval: float = QUERY_STATS_FLUSH_INTERVAL) -> None:
+    """Boucle du job périodique (lifespan) ; une erreur est loggée sans arrêter la boucle."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_session() as session:
+                await flush_query_stats(session)
+        except Exception as e:
+            logger.warning(f"Search query stats flush failed: {e}")
+
+
+async def warm_query_embedding_cache(db: AsyncSession, limit: int = QUERY_EMBEDDING_WARMUP_COUNT) -> int:
+    """Encode d'avance les requêtes les plus fréquentes ; retourne le nombre de vecteurs mis en cache."""
+    stmt = (
+        select(SearchQueryStat.query_key, SearchQueryStat.query)
+        .order_by(SearchQueryStat.hits.desc(), SearchQueryStat.query_key)
+        .limit(min(limit, QUERY_EMBEDDING_CACHE_MAX_ENTRIES))
+    )
+    rows = (await db.execute(stmt)).all()
+    vectors = await asyncio.gather(
+        *(generate_embedding(query, is_query=True) for _, query in rows), return_exceptions=True
+    )
+    stored = 0
+    # Les plus fréquentes en dernier : ce sont les plus récemment utilisées pour le LRU
+    for (key, _), vector in reversed(list(zip(rows, vectors, strict=True))):
+        if not isinstance(vector, BaseException):
+            _store(key, vector)
+            stored += 1
+    return stored
+
+
+async def run_query_embedding_warmup() -> None:
+    """Préchauffage au démarrage (lifespan), sans bloquer le démarrage ; une erreur est loggée."""
+    try:
+        async with async_session() as session:
+            stored = await warm_query_embedding_cache(session)
+        logger.info(f"Query embedding cache warmed with {stored} queries")
+    except Exception as e:
+        logger.warning(f"Query embedding cache warm-up failed: {e}")
+
+
+def clear_query_embedding_cache() -> None:
+    """Vide le cache et les compteurs en attente (tests, rechargement)."""
+    _vectors.clear()
+    _inflight.clear()
+    _query_counts.clear()
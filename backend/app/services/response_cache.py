@@ -0,0 +1,62 @@
+# /backend/app/services/response_cache.py
+
+"""Cache des réponses JSON déjà encodées de GET /skill-trees/{id}.
+
+Une entrée par arbre, valable pour une version donnée. Les écritures invalident
+explicitement l'entrée ; la version protège en plus des écritures passées par
+d'autres chemins (skills, autres processus). LRU borné par la taille des corps.
+"""
+
+from collections import OrderedDict
+
+from app.constants import RESPONSE_CACHE_MAX_BYTES
+from app.metrics import cache_evictions_total, cache_requests_total, cache_size_bytes
+
+_CACHE_NAME = "tree_detail_json"
+
+_bodies: OrderedDict[int, tuple[int, bytes]] = OrderedDict()
+_total_bytes = 0
+
+
+def get_cached_detail(tree_id: int, version: int) -> bytes | None:
+    """Corps JSON en cache pour cette version de l'arbre, sinon None."""
+    entry = _bodies.get(tree_id)
+    if entry is None or entry[0] != version:
+        cache_requests_total.labels(cache=_CACHE_NAME, result="miss").inc()
+        return None
+    _bodies.move_to_end(tree_id)
+    cache_requests_total.labels(cache=_CACHE_NAME, result="hit").inc()
+    return entry[1]
+
+
+def store_detail(tree_id: int, version: int, body: bytes) -> None:
+    """Met en cache le corps encodé, en évinçant les moins récemment lus si besoin."""
+    global _total_bytes
+    invalidate_detail(tree_id)
+    if len(body) > RESPONSE_CACHE_MAX_BYTES:
+        return
+
+    _bodies[tree_id] = (version, body)
+    _total_bytes += len(body)
+    while _total_bytes > RESPONSE_CACHE_MAX_BYTES:
+        _, (_, evicted) = _bodies.popitem(last=False)
+        _total_bytes -= len(evicted)
+        cache_evictions_total.labels(cache=_CACHE_NAME).inc()
+    cache_size_bytes.labels(cache=_CACHE_NAME).set(_total_bytes)
+
+
+def invalidate_detail(tree_id: int) -> None:
+    """Retire l'entrée d'un arbre (modifié ou supprimé)."""
+    global _total_bytes
+    entry = _bodies.pop(tree_id, None)
+    if entry is not None:
+        _total_bytes -= len(entry[1])
+        cache_size_bytes.labels(cache=_CACHE_NAME).set(_total_bytes)
+
+
+def clear_response_cache() -> None:
+    """Vide le cache (tests, rechargement)."""
+    global _total_bytes
+    _bodies.clear()
+    _total_bytes = 0
+    cache_size_bytes.labels(cache=_CACHE_NAME).set(0)
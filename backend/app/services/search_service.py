@@ -9,7 +9,8 @@ from sqlalchemy.orm import selectinload
 from app.metrics import search_duration_seconds, search_requests_total
 from app.models.skill_tree import SkillTree
 from app.schemas.search import SearchResultSchema, SearchResultsSchema
-from app.services.embedding_service import generate_embedding
+from app.services.embedding_service import EmbeddingModelNotReadyError, is_embedding_model_ready
+from app.services.query_embedding_cache import get_query_embedding
 
 logger = logging.getLogger(__name__)
 tracer = trace.get_tracer("humantree.search")
@@ -76,7 +77,10 @@ async def semantic_search(
 
         # 1. Semantic search via pgvector
         try:
-            query_vector = await generate_embedding(query, is_query=True)
+            if not is_embedding_model_ready():
+                # Modèle en cours de chargement : pas d'attente, recherche plein texte seule
+                raise EmbeddingModelNotReadyError
+            query_vector = await get_query_embedding(query)
             # Only return results with cosine similarity > threshold
             min_similarity = 0.78
             semantic_stmt = (
@@ -114,6 +118,10 @@ async def semantic_search(
         except NotImplementedError:
             logger.info("Semantic search skipped: embedding model not configured")
             span.set_attribute("search.semantic_results", 0)
+        except EmbeddingModelNotReadyError:
+            logger.info("Semantic search skipped: embedding model not ready")
+            span.set_attribute("search.semantic_results", 0)
+            span.set_attribute("search.model_ready", False)
         except Exception as e:
             logger.warning(f"Semantic search failed, falling back to text-only: {e}")
             span.set_attribute("search.semantic_results", 0)
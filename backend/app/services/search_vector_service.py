@@ -0,0 +1,78 @@
+# /backend/app/services/search_vector_service.py
+
+"""Maintenance différée de skill_trees.search_vector (recherche plein texte).
+
+Les écritures ne calculent plus de tsvector : elles marquent l'arbre à reconstruire
+(search_vector_dirty_at, posé à la création et par bump_tree_version). Un job périodique
+(lancé dans le lifespan) reconstruit en une requête les arbres sans écriture depuis
+SEARCH_VECTOR_DEBOUNCE secondes : des sauvegardes rapprochées ne coûtent qu'une
+reconstruction.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Interval
+
+from app.constants import SEARCH_VECTOR_BATCH_SIZE, SEARCH_VECTOR_DEBOUNCE, SEARCH_VECTOR_REFRESH_INTERVAL
+from app.database import async_session
+from app.metrics import search_vector_rebuilds_total
+
+logger = logging.getLogger(__name__)
+
+# Pondération : nom (A), description (B), skills (C). Les lignes verrouillées par une
+# écriture en cours sont sautées ; une écriture qui attend le verrou remarque l'arbre
+# après notre commit, il sera donc reconstruit à nouveau.
+_REBUILD_SQL = text(
+    """WITH dirty AS (
+      SELECT id FROM skill_trees
+      WHERE search_vector_dirty_at <= LOCALTIMESTAMP - :debounce
+      ORDER BY search_vector_dirty_at
+      LIMIT :limit
+      FOR UPDATE SKIP LOCKED
+  )
+  UPDATE skill_trees SET
+      search_vector =
+          setweight(to_tsvector('french', unaccent(coalesce(skill_trees.name, ''))), 'A') ||
+          setweight(to_tsvector('french', unaccent(coalesce(skill_trees.description, ''))), 'B') ||
+          setweight(to_tsvector('french', unaccent(coalesce(skills_text.content, ''))), 'C'),
+      search_vector_dirty_at = NULL
+  FROM dirty
+  LEFT JOIN (
+      SELECT skills.skill_tree_id,
+             string_agg(skills.name || ' ' || coalesce(skills.description, ''), ' ') AS content
+      FROM skills
+      INNER JOIN dirty ON dirty.id = skills.skill_tree_id
+      GROUP BY skills.skill_tree_id
+  ) AS skills_text ON skills_text.skill_tree_id = dirty.id
+  WHERE skill_trees.id = dirty.id"""
+).bindparams(bindparam("debounce", type_=Interval()))
+
+
+async def rebuild_search_vectors(
+    db: AsyncSession, debounce: float = SEARCH_VECTOR_DEBOUNCE, limit: int = SEARCH_VECTOR_BATCH_SIZE
+) -> int:
+    """Reconstruit le search_vector d'au plus limit arbres marqués, puis commit.
+
+    Retourne le nombre d'arbres reconstruits.
+    """
+    result = await db.execute(_REBUILD_SQL, {"debounce": timedelta(seconds=debounce), "limit": limit})
+    await db.commit()
+    search_vector_rebuilds_total.inc(result.rowcount)
+    return result.rowcount
+
+
+async def run_search_vector_refresher(interval: float = SEARCH_VECTOR_REFRESH_INTERVAL) -> None:
+    """Boucle du job périodique (lifespan) ; une erreur est loggée sans arrêter la boucle."""
+    while True:
+        try:
+            async with async_session() as session:
+                # Lots pleins : il reste des arbres à traiter, on enchaîne sans attendre
+                while await rebuild_search_vectors(session) == SEARCH_VECTOR_BATCH_SIZE:
+                    pass
+        except Exception as e:
+            logger.warning(f"Search vector refresh failed: {e}")
+        await asyncio.sleep(interval)
@@ -16,6 +16,8 @@ from app.schemas.skill import (
     SkillSimpleSchema,
     SkillUpdateSchema,
 )
+from app.services.closure_service import add_edges_to_closure, creates_cycle, refresh_closure
+from app.services.skill_tree_service import bump_tree_version
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +52,7 @@ async def create_skill(db: AsyncSession, data: SkillCreateSchema) -> SkillSimple
 
     try:
         await db.flush()
+        await bump_tree_version(db, data.skill_tree_id)
         await db.commit()
     except IntegrityError as e:
         await db.rollback()
@@ -88,8 +91,18 @@ async def update_skill(
     if data.is_root is not None:
         skill.is_root = data.is_root
 
+    if await creates_cycle(db, skill_id, data.unlock_ids):
+        raise HTTPException(status_code=400, detail="Le graphe de compétences contient un cycle")
+
+    stored_unlock_ids = {unlock.id for unlock in skill.unlocks}
     await delete_all_dependencies_for_skill(db, skill_id)
     await create_skill_dependencies(db, skill_id, data.unlock_ids)
+    if stored_unlock_ids - set(data.unlock_ids):
+        await refresh_closure(db, [skill.skill_tree_id])
+    else:
+        added = [unlock_id for unlock_id in data.unlock_ids if unlock_id not in stored_unlock_ids]
+        await add_edges_to_closure(db, skill.skill_tree_id, [(skill_id, unlock_id) for unlock_id in added])
+    await bump_tree_version(db, skill.skill_tree_id)
 
     if commit:
         await db.commit()
@@ -106,7 +119,12 @@ async def delete_skill(db: AsyncSession, skill_id: int, commit: bool = True) ->
     if skill is None:
         return False
 
+    skill_tree_id = skill.skill_tree_id
     await db.delete(skill)
+    await db.flush()
+    # Les chemins qui passaient par ce skill disparaissent de la fermeture
+    await refresh_closure(db, [skill_tree_id])
+    await bump_tree_version(db, skill_tree_id)
     if commit:
         await db.commit()
     return True
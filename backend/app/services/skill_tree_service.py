@@ -1,103 +1,141 @@
 # /backend/app/services/skill_tree_service.py
 
+import base64
+import binascii
+import json
 import logging
-import os
-from datetime import timedelta
+from dataclasses import dataclass, field
+from datetime import datetime
 from enum import StrEnum
 
 from fastapi import HTTPException
-from sqlalchemy import bindparam, delete, func, literal_column, select, text
+from sqlalchemy import delete, func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlalchemy.types import Interval
 
-from app.database import async_session
+from app.constants import (
+    LINKED_TREES_MAX_COUNT,
+    LISTING_PAGE_SIZE,
+    TAG_FACETS_LIMIT,
+    TRENDING_PAGE_SIZE,
+    TRENDING_TOP_N,
+)
 from app.models.skill import Skill
+from app.models.skill_dependencies import SkillDependency
 from app.models.skill_tree import SkillTree
 from app.models.tag import SkillTreeTag, Tag
+from app.models.trending import TrendingScore
 from app.models.user_favorite_trees import UserFavoriteTrees
-from app.schemas.skill import SkillSaveSchema, SkillUpdateSchema
+from app.schemas.skill import SkillSaveSchema
 from app.schemas.skill_tree import (
+    AddEdgeOp,
+    AddSkillOp,
+    DeleteSkillOp,
+    LinkedSkillTreeSchema,
+    RemoveEdgeOp,
+    RenameSkillOp,
+    SetRootOp,
+    SetTagsOp,
     SkillTreeCreateSchema,
     SkillTreeDetailSchema,
+    SkillTreeExpandedSchema,
+    SkillTreeOp,
+    SkillTreePatchResultSchema,
+    SkillTreePatchSchema,
     SkillTreeSaveSchema,
     SkillTreeSimpleSchema,
     SkillTreeUpdateSchema,
 )
-from app.services.skill_service import delete_skill, update_skill
+from app.schemas.tag import TagFacetSchema
+from app.services.closure_service import (
+    add_edge_to_closure,
+    add_edges_to_closure,
+    creates_cycle,
+    has_cycle,
+    refresh_closure,
+)
+from app.services.collection_version_service import CATALOGUE_KEY, bump_collection_version
+from app.services.embedding_job_service import enqueue_embedding_jobs
+from app.services.graph_cache import get_tree_graph, get_tree_graphs
+from app.services.response_cache import get_cached_detail, invalidate_detail, store_detail
 
 logger = logging.getLogger(__name__)
 
 
-async def _safe_embed(tree_id: int) -> None:
-    """Fire-and-forget embedding generation in a separate session."""
-    if os.environ.get("ENVIRONMENT") == "test":
-        return
-    try:
-        from app.services.embedding_service import embed_skill_tree
-
-        async with async_session() as session:
-            await embed_skill_tree(session, tree_id)
-    except Exception as e:
-        logger.warning(f"Embedding generation failed for tree {tree_id}: {e}")
-
+async def _sync_tags(db: AsyncSession, skill_tree_id: int, tag_names: list[str]) -> bool:
+    """Upsert tags et met à jour la table de jonction pour un skill tree (does NOT commit).
 
-def _concat_skills_text(skills) -> str:
-    """Concatenate skill names and descriptions into a single string for FTS."""
-    return " ".join(f"{s.name} {s.description}" if s.description else s.name for s in skills)
-
-
-def _build_search_vector(tree: SkillTree, skills_text: str = ""):
-    """Build the tsvector expression for a skill tree (does NOT commit).
-
-    Args:
-        tree: the skill tree ORM object.
-        skills_text: concatenated skill names and descriptions.
+    Les tags manquants sont créés en un INSERT ... ON CONFLICT DO NOTHING, puis seules
+    les associations ajoutées ou retirées sont écrites. Retourne True si les tags de
+    l'arbre ont changé.
     """
-    expr = func.setweight(
-        func.to_tsvector("french", func.unaccent(func.coalesce(tree.name, ""))),
-        literal_column("'A'"),
-    ).op("||")(
-        func.setweight(
-            func.to_tsvector("french", func.unaccent(func.coalesce(tree.description, ""))),
-            literal_column("'B'"),
+    wanted: set[int] = set()
+    if tag_names:
+        # Le SELECT du même ordre ne voit pas les lignes insérées : pas de doublon
+        inserted = (
+            pg_insert(Tag)
+            .values([{"name": name} for name in tag_names])
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(Tag.id)
+            .cte("inserted")
         )
-    )
-    if skills_text:
-        expr = expr.op("||")(
-            func.setweight(
-                func.to_tsvector("french", func.unaccent(skills_text)),
-                literal_column("'C'"),
+        stmt = select(inserted.c.id).union_all(select(Tag.id).where(Tag.name.in_(tag_names)))
+        wanted = set((await db.execute(stmt)).scalars().all())
+        if len(wanted) < len(tag_names):
+            # Tag créé par une transaction concurrente, visible seulement maintenant
+            wanted = set((await db.execute(select(Tag.id).where(Tag.name.in_(tag_names)))).scalars().all())
+
+    stmt = select(SkillTreeTag.tag_id).where(SkillTreeTag.skill_tree_id == skill_tree_id)
+    current = set((await db.execute(stmt)).scalars().all())
+
+    if current - wanted:
+        await db.execute(
+            delete(SkillTreeTag).where(
+                SkillTreeTag.skill_tree_id == skill_tree_id, SkillTreeTag.tag_id.in_(current - wanted)
             )
         )
-    return expr
-
+    if wanted - current:
+        await db.execute(
+            insert(SkillTreeTag).values(
+                [{"skill_tree_id": skill_tree_id, "tag_id": tag_id} for tag_id in wanted - current]
+            )
+        )
+    if wanted != current:
+        await db.execute(
+            update(SkillTree)
+            .where(SkillTree.id == skill_tree_id)
+            .values(tag_ids=sorted(wanted))
+            .execution_options(synchronize_session=False)
+        )
+    return wanted != current
 
-async def _sync_tags(db: AsyncSession, skill_tree_id: int, tag_names: list[str]) -> None:
-    """Upsert tags et met à jour la table de jonction pour un skill tree."""
-    if not tag_names:
-        # Supprimer tous les tags existants
-        await db.execute(delete(SkillTreeTag).where(SkillTreeTag.skill_tree_id == skill_tree_id))
-        return
 
-    # Upsert : récupérer les tags existants
-    stmt = select(Tag).where(Tag.name.in_(tag_names))
-    result = await db.execute(stmt)
-    existing_tags = {t.name: t for t in result.scalars().all()}
+async def bump_tree_version(db: AsyncSession, skill_tree_id: int, expected_version: int | None = None) -> int | None:
+    """Incrémente la version d'un skill tree, met à jour updated_at, le marque pour
+    la reconstruction différée de son search_vector et planifie son embedding (does NOT commit).
 
-    # Créer les tags manquants
-    for name in tag_names:
-        if name not in existing_tags:
-            tag = Tag(name=name)
-            db.add(tag)
-            await db.flush()
-            existing_tags[name] = tag
+    Si expected_version est fourni, l'incrément n'a lieu que si la version stockée
+    correspond. Retourne la nouvelle version, ou None si l'arbre n'existe pas ou
+    si la version attendue est obsolète.
 
-    # Remplacer les associations
-    await db.execute(delete(SkillTreeTag).where(SkillTreeTag.skill_tree_id == skill_tree_id))
-    for name in tag_names:
-        db.add(SkillTreeTag(skill_tree_id=skill_tree_id, tag_id=existing_tags[name].id))
+    À appeler après toute écriture sur le contenu d'un arbre, y compris depuis
+    d'autres services (skills) : c'est le seul point qui invalide ces dérivés.
+    """
+    stmt = (
+        update(SkillTree)
+        .where(SkillTree.id == skill_tree_id)
+        .values(version=SkillTree.version + 1, updated_at=func.now(), search_vector_dirty_at=func.now())
+        .returning(SkillTree.version)
+        .execution_options(synchronize_session=False)
+    )
+    if expected_version is not None:
+        stmt = stmt.where(SkillTree.version == expected_version)
+    version = (await db.execute(stmt)).scalar_one_or_none()
+    if version is not None:
+        await enqueue_embedding_jobs(db, [skill_tree_id])
+    return version
 
 
 class TrendingPeriod(StrEnum):
@@ -106,85 +144,197 @@ class TrendingPeriod(StrEnum):
     MONTH = "m"
 
 
-_INTERVAL_MAP: dict[TrendingPeriod, timedelta] = {
-    TrendingPeriod.DAY: timedelta(days=1),
-    TrendingPeriod.WEEK: timedelta(days=7),
-    TrendingPeriod.MONTH: timedelta(days=30),
-}
+class TagMatch(StrEnum):
+    ALL = "all"  # l'arbre porte tous les tags
+    ANY = "any"  # l'arbre porte au moins un des tags
 
 
-async def get_all(db: AsyncSession, tag: str | None = None) -> list[SkillTreeSimpleSchema]:
-    """Récupère tous les skill_trees, avec filtrage optionnel par tag."""
-    stmt = select(SkillTree).options(selectinload(SkillTree.tags))
+class TreeSort(StrEnum):
+    RECENT = "recent"  # created_at DESC, id DESC
+    NAME = "name"  # name ASC, id ASC
 
-    if tag:
-        stmt = (
-            stmt.join(SkillTreeTag, SkillTree.id == SkillTreeTag.skill_tree_id)
-            .join(Tag, SkillTreeTag.tag_id == Tag.id)
-            .where(Tag.name == tag.strip().lower())
-        )
 
-    result = await db.execute(stmt)
-    list_skill_trees = result.scalars().unique().all()
-    return [SkillTreeSimpleSchema.model_validate(st) for st in list_skill_trees]
+# Champs sélectionnables via fields= ; id est toujours renvoyé
+LISTING_FIELDS = frozenset(SkillTreeSimpleSchema.model_fields)
+
+
+@dataclass
+class TreePageParams:
+    """Paramètres de pagination par curseur d'un listing de skill trees."""
+
+    sort: TreeSort = TreeSort.RECENT
+    limit: int = LISTING_PAGE_SIZE
+    cursor: str | None = None
+    fields: frozenset[str] | None = None  # None : tous les champs
+
+
+@dataclass
+class TreePage:
+    """Une page de listing : les éléments et le curseur de la page suivante (None si dernière)."""
+
+    items: list[dict]
+    next_cursor: str | None
+
+
+def _encode_cursor(sort: TreeSort, row) -> str:
+    key = row.created_at.isoformat() if sort == TreeSort.RECENT else row.name
+    payload = json.dumps([sort.value, key, row.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(sort: TreeSort, cursor: str) -> tuple[datetime | str, int]:
+    try:
+        cursor_sort, key, tree_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort.value or not isinstance(tree_id, int):
+            raise ValueError(cursor_sort)
+        return (datetime.fromisoformat(key) if sort == TreeSort.RECENT else str(key)), tree_id
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
+
+async def _get_tags_by_tree(db: AsyncSession, tree_ids: list[int]) -> dict[int, list[str]]:
+    stmt = (
+        select(SkillTreeTag.skill_tree_id, Tag.name)
+        .join(Tag, SkillTreeTag.tag_id == Tag.id)
+        .where(SkillTreeTag.skill_tree_id.in_(tree_ids))
+    )
+    tags_by_tree: dict[int, list[str]] = {}
+    for row in await db.execute(stmt):
+        tags_by_tree.setdefault(row.skill_tree_id, []).append(row.name)
+    return tags_by_tree
+
+
+async def _get_tree_page(db: AsyncSession, conditions: list, params: TreePageParams) -> TreePage:
+    """Page de skill_trees par keyset : WHERE (clé, id) après le curseur ORDER BY clé, id LIMIT n.
+
+    Le coût ne dépend que de la taille de la page (index sur (created_at, id) et sur name),
+    pas du nombre total d'arbres. Seules les colonnes demandées sont lues.
+    """
+    wanted = LISTING_FIELDS if params.fields is None else params.fields | {"id"}
+    columns = [getattr(SkillTree, name) for name in sorted(wanted - {"tags"})]
+    # Les clés de tri sont nécessaires au curseur, même si non demandées
+    columns += [SkillTree.id, SkillTree.created_at if params.sort == TreeSort.RECENT else SkillTree.name]
+
+    if params.sort == TreeSort.RECENT:
+        key, order_by = tuple_(SkillTree.created_at, SkillTree.id), (SkillTree.created_at.desc(), SkillTree.id.desc())
+    else:
+        key, order_by = tuple_(SkillTree.name, SkillTree.id), (SkillTree.name, SkillTree.id)
+
+    stmt = select(*dict.fromkeys(columns)).where(*conditions).order_by(*order_by).limit(params.limit + 1)
+    if params.cursor:
+        after = tuple_(*_decode_cursor(params.sort, params.cursor))
+        stmt = stmt.where(key < after if params.sort == TreeSort.RECENT else key > after)
+
+    rows = (await db.execute(stmt)).all()
+    next_cursor = _encode_cursor(params.sort, rows[params.limit - 1]) if len(rows) > params.limit else None
+    rows = rows[: params.limit]
+
+    items = [{name: getattr(row, name) for name in wanted if name != "tags"} for row in rows]
+    if "tags" in wanted and items:
+        tags_by_tree = await _get_tags_by_tree(db, [item["id"] for item in items])
+        for item in items:
+            item["tags"] = tags_by_tree.get(item["id"], [])
+    return TreePage(items=items, next_cursor=next_cursor)
+
+
+async def _tag_conditions(db: AsyncSession, tags: list[str] | None, match: TagMatch) -> list | None:
+    """Conditions sur tag_ids (index GIN), ou None si aucun arbre ne peut correspondre."""
+    if not tags:
+        return []
+    names = {tag.strip().lower() for tag in tags}
+    tag_ids = (await db.execute(select(Tag.id).where(Tag.name.in_(names)))).scalars().all()
+    if not tag_ids or (match == TagMatch.ALL and len(tag_ids) < len(names)):
+        return None
+    if match == TagMatch.ALL:
+        return [SkillTree.tag_ids.contains(tag_ids)]
+    return [SkillTree.tag_ids.overlap(tag_ids)]
+
+
+async def _get_tag_facets(db: AsyncSession, conditions: list, limit: int) -> list[TagFacetSchema]:
+    """Tags les plus portés par les arbres qui satisfont conditions, avec leur nombre d'arbres."""
+    tag_ids = select(func.unnest(SkillTree.tag_ids).label("tag_id")).where(*conditions).subquery()
+    count = func.count().label("count")
+    stmt = (
+        select(Tag.name, count)
+        .join(tag_ids, tag_ids.c.tag_id == Tag.id)
+        .group_by(Tag.id)
+        .order_by(count.desc(), Tag.name)
+        .limit(limit)
+    )
+    return [TagFacetSchema(name=name, count=n) for name, n in (await db.execute(stmt)).tuples()]
+
+
+async def get_all(
+    db: AsyncSession,
+    tags: list[str] | None = None,
+    params: TreePageParams | None = None,
+    match: TagMatch = TagMatch.ALL,
+) -> TreePage:
+    """Récupère une page de skill_trees, avec filtrage optionnel par tags (tous ou au moins un)."""
+    conditions = await _tag_conditions(db, tags, match)
+    if conditions is None:
+        return TreePage(items=[], next_cursor=None)
+    return await _get_tree_page(db, conditions, params or TreePageParams())
+
+
+async def browse_skill_trees(
+    db: AsyncSession,
+    tags: list[str],
+    params: TreePageParams | None = None,
+    match: TagMatch = TagMatch.ALL,
+    facets_limit: int = TAG_FACETS_LIMIT,
+) -> tuple[TreePage, list[TagFacetSchema]]:
+    """Page de skill_trees filtrée par tags et facettes de tags sur tout le filtre (pas seulement la page)."""
+    conditions = await _tag_conditions(db, tags, match)
+    if conditions is None:
+        return TreePage(items=[], next_cursor=None), []
+    page = await _get_tree_page(db, conditions, params or TreePageParams())
+    return page, await _get_tag_facets(db, conditions, facets_limit)
 
 
 async def get_trendings(
-    db: AsyncSession, timestamp: TrendingPeriod = TrendingPeriod.WEEK
+    db: AsyncSession,
+    timestamp: TrendingPeriod = TrendingPeriod.WEEK,
+    limit: int = TRENDING_PAGE_SIZE,
+    decay: bool = False,
 ) -> list[SkillTreeSimpleSchema]:
     """
-    Récupère les skill_trees les plus populaires de la semaine.
+    Récupère les skill_trees les plus populaires de la période.
 
-    Les arbres tendances sont déterminés par le nombre de fois qu'ils ont été ajoutés
-    aux favoris + le nombre d'utilisateurs qui ont coché au moins une compétence
-    de l'arbre au cours de la période sélectionnée.
+    Le score d'un arbre est la somme, heure par heure, des utilisateurs distincts qui
+    l'ont ajouté aux favoris ou y ont coché une compétence. Les scores sont précalculés
+    par trending_service (trending_scores) : la lecture est un parcours d'index borné.
 
     Args:
         db: Session de base de données async
         timestamp: Période (DAY, WEEK, MONTH)
+        limit: Nombre d'arbres renvoyés (au plus TRENDING_TOP_N)
+        decay: Classer par score amorti (l'activité récente pèse plus)
 
     Returns:
         Liste de SkillTreeListSchema
     """
-    interval = _INTERVAL_MAP[timestamp]
-    stmt = text(
-        """SELECT skill_trees.id, skill_trees.name, skill_trees.description,
-         skill_trees.creator_username, skill_trees.created_at, SUM(nb_users) AS score
-  FROM (
-      SELECT skill_tree_id, COUNT(DISTINCT user_id) AS nb_users
-      FROM user_favorite_trees
-      WHERE created_at >= NOW() - :interval
-      GROUP BY skill_tree_id
-
-      UNION ALL
-
-      SELECT skills.skill_tree_id, COUNT(DISTINCT user_check_skill.user_id) AS nb_users
-      FROM user_check_skill
-      INNER JOIN skills ON user_check_skill.skill_id = skills.id
-      WHERE user_check_skill.created_at >= NOW() - :interval
-      GROUP BY skills.skill_tree_id
-  ) AS combined
-  INNER JOIN skill_trees ON combined.skill_tree_id = skill_trees.id
-  GROUP BY skill_trees.id
-  ORDER BY score DESC"""
-    ).bindparams(bindparam("interval", type_=Interval()))
-    result = await db.execute(stmt, {"interval": interval})
-    skill_trees = result.fetchall()
+    score = TrendingScore.decayed_score if decay else TrendingScore.score
+    stmt = (
+        select(
+            SkillTree.id,
+            SkillTree.name,
+            SkillTree.description,
+            SkillTree.creator_username,
+            SkillTree.created_at,
+        )
+        .join(TrendingScore, TrendingScore.skill_tree_id == SkillTree.id)
+        .where(TrendingScore.period == timestamp.value)
+        .order_by(score.desc(), TrendingScore.skill_tree_id)
+        .limit(min(limit, TRENDING_TOP_N))
+    )
+    skill_trees = (await db.execute(stmt)).all()
 
     if not skill_trees:
         return []
 
     # Charger les tags pour ces skill trees
-    tree_ids = [st.id for st in skill_trees]
-    tags_stmt = (
-        select(SkillTreeTag.skill_tree_id, Tag.name)
-        .join(Tag, SkillTreeTag.tag_id == Tag.id)
-        .where(SkillTreeTag.skill_tree_id.in_(tree_ids))
-    )
-    tags_result = await db.execute(tags_stmt)
-    tags_by_tree: dict[int, list[str]] = {}
-    for row in tags_result:
-        tags_by_tree.setdefault(row.skill_tree_id, []).append(row.name)
+    tags_by_tree = await _get_tags_by_tree(db, [st.id for st in skill_trees])
 
     return [
         SkillTreeSimpleSchema(
@@ -199,18 +349,14 @@ async def get_trendings(
     ]
 
 
-async def get_user_favorite_trees(db: AsyncSession, user_id: int) -> list[SkillTreeSimpleSchema]:
-    """Récupère la liste des IDs de skill trees favoris d'un utilisateur."""
-    stmt = (
-        select(SkillTree)
-        .select_from(UserFavoriteTrees)
-        .where(UserFavoriteTrees.user_id == user_id)
-        .join(SkillTree, UserFavoriteTrees.skill_tree_id == SkillTree.id)
-        .options(selectinload(SkillTree.tags))
+async def get_user_favorite_trees(db: AsyncSession, user_id: int, params: TreePageParams | None = None) -> TreePage:
+    """Récupère une page des skill trees favoris d'un utilisateur."""
+    is_favorite = (
+        select(UserFavoriteTrees.skill_tree_id)
+        .where(UserFavoriteTrees.user_id == user_id, UserFavoriteTrees.skill_tree_id == SkillTree.id)
+        .exists()
     )
-    result = await db.execute(stmt)
-    skill_trees = result.scalars().all()
-    return [SkillTreeSimpleSchema.model_validate(st) for st in skill_trees]
+    return await _get_tree_page(db, [is_favorite], params or TreePageParams())
 
 
 async def get_by_id(db: AsyncSession, skill_tree_id: int) -> SkillTreeDetailSchema | None:
@@ -224,19 +370,79 @@ async def get_by_id(db: AsyncSession, skill_tree_id: int) -> SkillTreeDetailSche
     Returns:
         Un objet SkillTree ou None si non trouvé
     """
-    stmt = (
-        select(SkillTree)
-        .where(SkillTree.id == skill_tree_id)
-        .options(
-            selectinload(SkillTree.skills).selectinload(Skill.unlocks),
-            selectinload(SkillTree.tags),
-        )
+    graph = await get_tree_graph(db, skill_tree_id)
+    if graph is None:
+        return None
+    return graph.to_detail_schema()
+
+
+# Arbres atteignables par linked_tree_id jusqu'à :max_depth liens. UNION (et non
+# UNION ALL) élimine les doublons (arbre, profondeur) : avec la borne de profondeur,
+# un cycle de liens ne produit qu'un nombre fini de lignes.
+_LINKED_TREES_SQL = text(
+    """WITH RECURSIVE linked(tree_id, depth) AS (
+      SELECT id, 0 FROM skill_trees WHERE id = :tree_id
+
+      UNION
+
+      SELECT skills.linked_tree_id, linked.depth + 1
+      FROM linked
+      INNER JOIN skills ON skills.skill_tree_id = linked.tree_id
+      WHERE skills.linked_tree_id IS NOT NULL AND linked.depth < :max_depth
+  )
+  SELECT skill_trees.id, skill_trees.version, MIN(linked.depth) AS depth
+  FROM linked
+  INNER JOIN skill_trees ON skill_trees.id = linked.tree_id
+  GROUP BY skill_trees.id
+  ORDER BY depth, skill_trees.id
+  LIMIT :max_count"""
+)
+
+
+async def get_linked_tree_versions(db: AsyncSession, skill_tree_id: int, max_depth: int) -> list[tuple[int, int, int]]:
+    """(id, version, profondeur) de l'arbre et des arbres liés, du plus proche au plus lointain.
+
+    L'arbre demandé vient en premier (profondeur 0) ; liste vide s'il n'existe pas.
+    """
+    rows = await db.execute(
+        _LINKED_TREES_SQL,
+        {"tree_id": skill_tree_id, "max_depth": max_depth, "max_count": LINKED_TREES_MAX_COUNT + 1},
     )
-    result = await db.execute(stmt)
-    skill_tree = result.scalar_one_or_none()
-    if skill_tree is None:
+    return [(row.id, row.version, row.depth) for row in rows]
+
+
+async def get_expanded_by_id(
+    db: AsyncSession, linked_trees: list[tuple[int, int, int]]
+) -> SkillTreeExpandedSchema | None:
+    """Détail de l'arbre et de ses arbres liés (issus de get_linked_tree_versions) en une réponse."""
+    graphs = await get_tree_graphs(db, {tree_id for tree_id, _, _ in linked_trees})
+    root_id = linked_trees[0][0]
+    if root_id not in graphs:
         return None
-    return SkillTreeDetailSchema.model_validate(skill_tree)
+    linked = []
+    for tree_id, _, depth in linked_trees[1:]:
+        graph = graphs.get(tree_id)
+        if graph is not None:
+            linked.append(LinkedSkillTreeSchema.model_construct(**dict(graph.to_detail_schema()), depth=depth))
+    return SkillTreeExpandedSchema.model_construct(**dict(graphs[root_id].to_detail_schema()), linked_trees=linked)
+
+
+async def get_version(db: AsyncSession, skill_tree_id: int) -> int | None:
+    """Version courante d'un skill_tree, ou None s'il n'existe pas."""
+    stmt = select(SkillTree.version).where(SkillTree.id == skill_tree_id)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_detail_json(db: AsyncSession, skill_tree_id: int, version: int) -> bytes | None:
+    """Détail d'un skill_tree encodé en JSON, servi depuis le cache tant que sa version n'a pas changé."""
+    body = get_cached_detail(skill_tree_id, version)
+    if body is None:
+        detail = await get_by_id(db, skill_tree_id)
+        if detail is None:
+            return None
+        body = detail.model_dump_json().encode()
+        store_detail(skill_tree_id, detail.version, body)
+    return body
 
 
 async def create_skill_tree(db: AsyncSession, data: SkillTreeCreateSchema) -> SkillTreeSimpleSchema:
@@ -260,9 +466,8 @@ async def create_skill_tree(db: AsyncSession, data: SkillTreeCreateSchema) -> Sk
     if data.tags:
         await _sync_tags(db, skill_tree_orm.id, data.tags)
 
-    # Set search vector before commit
-    skill_tree_orm.search_vector = _build_search_vector(skill_tree_orm)
-
+    await enqueue_embedding_jobs(db, [skill_tree_orm.id])
+    await bump_collection_version(db, CATALOGUE_KEY)
     await db.commit()
     await db.refresh(skill_tree_orm)
 
@@ -278,7 +483,9 @@ async def delete_skill_tree(db: AsyncSession, skill_tree_id: int) -> bool:
         return False
 
     await db.delete(skill_tree)
+    await bump_collection_version(db, CATALOGUE_KEY)
     await db.commit()
+    invalidate_detail(skill_tree_id)
     return True
 
 
@@ -287,30 +494,28 @@ async def update_skill_tree(
 ) -> SkillTreeSimpleSchema | None:
     """Met à jour un skill_tree existant dans la base de données."""
     # SELECT
-    stmt = (
-        select(SkillTree)
-        .where(SkillTree.id == skill_tree_id)
-        .options(selectinload(SkillTree.tags), selectinload(SkillTree.skills))
-    )
+    stmt = select(SkillTree).where(SkillTree.id == skill_tree_id).options(selectinload(SkillTree.tags))
     result = await db.execute(stmt)
     skill_tree = result.scalar_one_or_none()
     if skill_tree is None:
         return None
 
     # UPDATE
-    if data.name is not None:
+    listing_changed = False
+    if data.name is not None and data.name != skill_tree.name:
         skill_tree.name = data.name
-    if data.description is not None:
+        listing_changed = True
+    if data.description is not None and data.description != skill_tree.description:
         skill_tree.description = data.description
+        listing_changed = True
 
     if data.tags is not None:
-        await _sync_tags(db, skill_tree_id, data.tags)
-
-    # Set search vector before commit (includes skills for FTS)
-    skills_text = _concat_skills_text(skill_tree.skills)
-    skill_tree.search_vector = _build_search_vector(skill_tree, skills_text)
+        listing_changed |= await _sync_tags(db, skill_tree_id, data.tags)
 
     try:
+        await bump_tree_version(db, skill_tree_id)
+        if listing_changed:
+            await bump_collection_version(db, CATALOGUE_KEY)
         await db.commit()
     except IntegrityError as e:
         await db.rollback()
@@ -319,6 +524,7 @@ async def update_skill_tree(
             raise HTTPException(status_code=409, detail="Un arbre avec ce nom existe déjà")
         logger.error("IntegrityError inattendue dans update_skill_tree: %s", e.orig)
         raise HTTPException(status_code=400, detail="Erreur d'intégrité des données")
+    invalidate_detail(skill_tree_id)
 
     await db.refresh(skill_tree)
 
@@ -326,7 +532,14 @@ async def update_skill_tree(
 
 
 async def save_skill_tree(db: AsyncSession, skill_tree: SkillTreeSaveSchema) -> bool:
-    """Sauvegarde d'un skill_tree avec ses compétences associées."""
+    """Sauvegarde d'un skill_tree avec ses compétences associées.
+
+    Le payload est comparé au graphe stocké et seules les différences sont appliquées,
+    en un nombre constant de requêtes quelle que soit la taille de l'arbre :
+    un DELETE pour les skills retirés, un UPDATE groupé pour les skills modifiés,
+    un INSERT multi-lignes ... RETURNING pour les nouveaux skills (ids temporaires < 0)
+    et une différence ensembliste sur skill_dependencies.
+    """
     # Verifier qu'on a seulement un root skill
     if is_root_skill_valid(skill_tree.skills) is False:
         raise HTTPException(
@@ -334,6 +547,14 @@ async def save_skill_tree(db: AsyncSession, skill_tree: SkillTreeSaveSchema) ->
             detail="error in root skill: must be exactly one root, cannot be an unlock",
         )
 
+    payload_ids = {s.id for s in skill_tree.skills}
+    for s in skill_tree.skills:
+        if any(uid not in payload_ids or uid == s.id for uid in s.unlock_ids):
+            raise HTTPException(status_code=400, detail="Skill référencé dans unlock_ids introuvable")
+
+    if has_cycle((s.id, uid) for s in skill_tree.skills for uid in s.unlock_ids):
+        raise HTTPException(status_code=400, detail="Le graphe de compétences contient un cycle")
+
     # Vérifier si le skill_tree existe déjà
     stmt = select(SkillTree).where(SkillTree.id == skill_tree.id)
     result = await db.execute(stmt)
@@ -343,73 +564,23 @@ async def save_skill_tree(db: AsyncSession, skill_tree: SkillTreeSaveSchema) ->
         raise HTTPException(status_code=404, detail="Skill tree not found")
 
     # Mettre à jour les champs du skill_tree
+    listing_changed = (existing_skill_tree.name, existing_skill_tree.description) != (
+        skill_tree.name,
+        skill_tree.description,
+    )
     existing_skill_tree.name = skill_tree.name
     existing_skill_tree.description = skill_tree.description
 
-    # Gérer le is_root : si inchangé ne rien faire, sinon mettre à jour is_root
-    if any(s.is_root for s in skill_tree.skills):
-        root_skill = next(s for s in skill_tree.skills if s.is_root)
-        stmt = (
-            select(Skill)
-            .where(Skill.skill_tree_id == skill_tree.id, Skill.is_root)
-            .options(selectinload(Skill.unlocks))
-        )
-        result = await db.execute(stmt)
-        existing_root_skill = result.scalar_one_or_none()
-        if existing_root_skill and existing_root_skill.id != root_skill.id:
-            existing_root_skill.is_root = False
-            await db.flush()
-
-    # Gérer les compétences associées
-    # Faire une liste des compétences existantes pour ce skill_tree et une autre liste pour les nouvelles id < 0
-    skills_to_update = [s for s in skill_tree.skills if s.id > 0]
-    new_skills = [s for s in skill_tree.skills if s.id < 0]
-    ids_correspondance = {}
-    skills_list = set()
-    for skill in new_skills:
-        skill_orm = Skill(
-            name=skill.name,
-            description=skill.description,
-            skill_tree_id=skill_tree.id,
-            is_root=skill.is_root,
-            linked_tree_id=skill.linked_tree_id,
-        )
-        db.add(skill_orm)
-        await db.flush()  # pour obtenir l'id généré
-        ids_correspondance[skill.id] = skill_orm.id
-        skills_list.add(skill_orm.id)
-
-    for skill in skills_to_update:
-        stmt = select(Skill).where(Skill.id == skill.id).options(selectinload(Skill.unlocks))
-        result = await db.execute(stmt)
-        existing_skill = result.scalar_one_or_none()
-        if existing_skill is None:
-            raise HTTPException(status_code=404, detail=f"Skill with id {skill.id} not found")
-        existing_skill.name = skill.name
-        existing_skill.description = skill.description
-        existing_skill.skill_tree_id = skill_tree.id
-        existing_skill.is_root = skill.is_root
-        existing_skill.linked_tree_id = skill.linked_tree_id
-        skills_list.add(existing_skill.id)
-
-    # Mettre à jour les dépendances de compétences
-    for skill in skill_tree.skills:
-        skill.id = ids_correspondance.get(skill.id, skill.id)
-        skill.unlock_ids = [ids_correspondance.get(uid, uid) for uid in skill.unlock_ids]
-
-        await update_skill(db, skill.id, SkillUpdateSchema(unlock_ids=skill.unlock_ids), commit=False)
-
-    # Gerer la suppression des compétences qui ne sont plus présentes dans la liste
-    stmt = select(Skill).where(Skill.skill_tree_id == skill_tree.id)
-    result = await db.execute(stmt)
-    for skill in result.scalars().all():
-        if skill.id not in skills_list:
-            await delete_skill(db, skill.id, commit=False)
+    try:
+        await _apply_skills_diff(db, skill_tree)
 
-    # Synchroniser les tags
-    await _sync_tags(db, skill_tree.id, skill_tree.tags)
+        # Synchroniser les tags
+        listing_changed |= await _sync_tags(db, skill_tree.id, skill_tree.tags)
 
-    try:
+        await bump_tree_version(db, skill_tree.id)
+        # Un changement du seul graphe n'affecte pas les listings
+        if listing_changed:
+            await bump_collection_version(db, CATALOGUE_KEY)
         await db.commit()
     except IntegrityError as e:
         await db.rollback()
@@ -421,10 +592,286 @@ async def save_skill_tree(db: AsyncSession, skill_tree: SkillTreeSaveSchema) ->
             )
         logger.error("IntegrityError inattendue dans save_skill_tree: %s", e.orig)
         raise HTTPException(status_code=400, detail="Erreur d'intégrité des données")
+    invalidate_detail(skill_tree.id)
 
     return True
 
 
+async def _apply_skills_diff(db: AsyncSession, skill_tree: SkillTreeSaveSchema) -> None:
+    """Applique le diff entre les skills du payload et ceux stockés (does NOT commit)."""
+    # Graphe stocké : skills + arêtes de l'arbre
+    stmt = select(Skill.id, Skill.name, Skill.description, Skill.is_root, Skill.linked_tree_id).where(
+        Skill.skill_tree_id == skill_tree.id
+    )
+    stored_skills = {row.id: row for row in (await db.execute(stmt)).all()}
+
+    stmt = (
+        select(SkillDependency.skill_id, SkillDependency.unlock_id)
+        .join(Skill, Skill.id == SkillDependency.skill_id)
+        .where(Skill.skill_tree_id == skill_tree.id)
+    )
+    stored_edges = {(row.skill_id, row.unlock_id) for row in (await db.execute(stmt)).all()}
+
+    # Un id positif doit appartenir à cet arbre
+    kept_ids = {s.id for s in skill_tree.skills if s.id > 0}
+    unknown_ids = kept_ids - stored_skills.keys()
+    if unknown_ids:
+        raise HTTPException(status_code=404, detail=f"Skill with id {min(unknown_ids)} not found")
+
+    # DELETE des compétences qui ne sont plus présentes (avant les INSERT/UPDATE pour libérer les noms)
+    removed_ids = stored_skills.keys() - kept_ids
+    if removed_ids:
+        await db.execute(delete(Skill).where(Skill.id.in_(removed_ids)))
+
+    # UPDATE groupé des compétences modifiées uniquement
+    changed = [
+        {
+            "id": s.id,
+            "name": s.name,
+            "description": s.description,
+            "is_root": s.is_root,
+            "linked_tree_id": s.linked_tree_id,
+        }
+        for s in skill_tree.skills
+        if s.id > 0
+        and (s.name, s.description, s.is_root, s.linked_tree_id)
+        != (
+            stored_skills[s.id].name,
+            stored_skills[s.id].description,
+            stored_skills[s.id].is_root,
+            stored_skills[s.id].linked_tree_id,
+        )
+    ]
+    if changed:
+        await db.execute(update(Skill), changed)
+
+    # INSERT multi-lignes des nouvelles compétences, correspondance id temporaire -> id réel par nom
+    ids_correspondance: dict[int, int] = {}
+    new_skills = [s for s in skill_tree.skills if s.id < 0]
+    if new_skills:
+        stmt = (
+            insert(Skill)
+            .values(
+                [
+                    {
+                        "name": s.name,
+                        "description": s.description,
+                        "skill_tree_id": skill_tree.id,
+                        "is_root": s.is_root,
+                        "linked_tree_id": s.linked_tree_id,
+                    }
+                    for s in new_skills
+                ]
+            )
+            .returning(Skill.id, Skill.name)
+        )
+        ids_by_name = {row.name: row.id for row in (await db.execute(stmt)).all()}
+        ids_correspondance = {s.id: ids_by_name[s.name] for s in new_skills}
+
+    # Différence ensembliste sur les dépendances
+    wanted_edges = {
+        (ids_correspondance.get(s.id, s.id), ids_correspondance.get(uid, uid))
+        for s in skill_tree.skills
+        for uid in s.unlock_ids
+    }
+    current_edges = {(a, b) for a, b in stored_edges if a not in removed_ids and b not in removed_ids}
+
+    edges_to_delete = current_edges - wanted_edges
+    if edges_to_delete:
+        await db.execute(
+            delete(SkillDependency).where(
+                tuple_(SkillDependency.skill_id, SkillDependency.unlock_id).in_(edges_to_delete)
+            )
+        )
+
+    edges_to_insert = wanted_edges - current_edges
+    if edges_to_insert:
+        await db.execute(insert(SkillDependency).values([{"skill_id": a, "unlock_id": b} for a, b in edges_to_insert]))
+
+    # Un retrait invalide des chemins : reconstruction ; des ajouts seuls se propagent incrémentalement
+    if removed_ids or edges_to_delete:
+        await refresh_closure(db, [skill_tree.id])
+    elif edges_to_insert:
+        await add_edges_to_closure(db, skill_tree.id, edges_to_insert)
+
+
+async def patch_skill_tree(
+    db: AsyncSession, skill_tree_id: int, data: SkillTreePatchSchema
+) -> SkillTreePatchResultSchema:
+    """Applique une liste d'opérations incrémentales au graphe d'un skill tree.
+
+    La version fournie doit correspondre à la version stockée (sinon 409) ; elle est
+    incrémentée dans la même transaction. Chaque opération coûte un nombre constant
+    de requêtes, indépendamment de la taille de l'arbre.
+    """
+    new_version = await bump_tree_version(db, skill_tree_id, expected_version=data.version)
+    if new_version is None:
+        exists = await db.execute(select(SkillTree.id).where(SkillTree.id == skill_tree_id))
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Skill tree not found")
+        raise HTTPException(status_code=409, detail="Version obsolète : l'arbre a été modifié entre-temps")
+
+    ctx = _PatchContext()
+    try:
+        for op in data.ops:
+            await _apply_op(db, skill_tree_id, op, ctx)
+        if ctx.closure_dirty:
+            await refresh_closure(db, [skill_tree_id])
+
+        if not await _is_root_state_valid(db, skill_tree_id):
+            raise HTTPException(
+                status_code=400,
+                detail="error in root skill: must be exactly one root, cannot be an unlock",
+            )
+        if ctx.listing_dirty:
+            await bump_collection_version(db, CATALOGUE_KEY)
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        error_msg = str(e.orig).lower() if e.orig else str(e).lower()
+        if "unique" in error_msg or "duplicate" in error_msg:
+            raise HTTPException(status_code=409, detail="Conflit lors de la sauvegarde : doublon détecté")
+        if "foreign key" in error_msg or "is not present in table" in error_msg:
+            raise HTTPException(status_code=400, detail="Arbre lié introuvable")
+        logger.error("IntegrityError inattendue dans patch_skill_tree: %s", e.orig)
+        raise HTTPException(status_code=400, detail="Erreur d'intégrité des données")
+    invalidate_detail(skill_tree_id)
+
+    return SkillTreePatchResultSchema(version=new_version, created_ids=ctx.created_ids)
+
+
+@dataclass
+class _PatchContext:
+    """État partagé entre les opérations d'un même patch."""
+
+    created_ids: dict[int, int] = field(default_factory=dict)
+    # Une suppression (arête ou skill) invalide la fermeture : recalcul avant le prochain
+    # ajout d'arête, ou une seule fois en fin de patch.
+    closure_dirty: bool = False
+    # Seul SetTags modifie un champ visible dans les listings
+    listing_dirty: bool = False
+
+
+async def _apply_op(db: AsyncSession, skill_tree_id: int, op: SkillTreeOp, ctx: _PatchContext) -> None:
+    """Applique une opération de patch (does NOT commit)."""
+    created_ids = ctx.created_ids
+
+    def resolve(skill_id: int) -> int:
+        return created_ids.get(skill_id, skill_id)
+
+    def not_found(skill_id: int) -> HTTPException:
+        return HTTPException(status_code=404, detail=f"Skill with id {skill_id} not found")
+
+    in_tree = Skill.skill_tree_id == skill_tree_id
+
+    match op:
+        case AddSkillOp():
+            if op.temp_id in created_ids:
+                raise HTTPException(status_code=400, detail=f"temp_id {op.temp_id} utilisé plusieurs fois")
+            stmt = (
+                insert(Skill)
+                .values(
+                    name=op.name,
+                    description=op.description,
+                    skill_tree_id=skill_tree_id,
+                    is_root=False,
+                    linked_tree_id=op.linked_tree_id,
+                )
+                .returning(Skill.id)
+            )
+            created_ids[op.temp_id] = (await db.execute(stmt)).scalar_one()
+
+        case RenameSkillOp():
+            values = {"name": op.name}
+            if "description" in op.model_fields_set:
+                values["description"] = op.description
+            stmt = update(Skill).where(Skill.id == resolve(op.skill_id), in_tree).values(**values)
+            result = await db.execute(stmt.execution_options(synchronize_session=False))
+            if result.rowcount == 0:
+                raise not_found(op.skill_id)
+
+        case DeleteSkillOp():
+            stmt = delete(Skill).where(Skill.id == resolve(op.skill_id), in_tree)
+            result = await db.execute(stmt.execution_options(synchronize_session=False))
+            if result.rowcount == 0:
+                raise not_found(op.skill_id)
+            ctx.closure_dirty = True
+
+        case AddEdgeOp():
+            skill_id, unlock_id = resolve(op.skill_id), resolve(op.unlock_id)
+            if skill_id == unlock_id:
+                raise HTTPException(status_code=400, detail="Un skill ne peut pas se débloquer lui-même")
+            stmt = select(Skill.id).where(Skill.id.in_([skill_id, unlock_id]), in_tree)
+            found = set((await db.execute(stmt)).scalars().all())
+            for original, resolved in ((op.skill_id, skill_id), (op.unlock_id, unlock_id)):
+                if resolved not in found:
+                    raise not_found(original)
+            if ctx.closure_dirty:
+                await refresh_closure(db, [skill_tree_id])
+                ctx.closure_dirty = False
+            if await creates_cycle(db, skill_id, [unlock_id]):
+                raise HTTPException(status_code=400, detail="Le graphe de compétences contient un cycle")
+            stmt = (
+                pg_insert(SkillDependency)
+                .values(skill_id=skill_id, unlock_id=unlock_id)
+                .on_conflict_do_nothing(index_elements=["skill_id", "unlock_id"])
+            )
+            await db.execute(stmt)
+            await add_edge_to_closure(db, skill_tree_id, skill_id, unlock_id)
+
+        case RemoveEdgeOp():
+            # Les deux extrémités doivent appartenir à l'arbre : pas d'arête d'un autre arbre
+            tree_skill_ids = select(Skill.id).where(in_tree)
+            stmt = delete(SkillDependency).where(
+                SkillDependency.skill_id == resolve(op.skill_id),
+                SkillDependency.unlock_id == resolve(op.unlock_id),
+                SkillDependency.skill_id.in_(tree_skill_ids),
+                SkillDependency.unlock_id.in_(tree_skill_ids),
+            )
+            result = await db.execute(stmt)
+            if result.rowcount == 0:
+                raise HTTPException(status_code=404, detail="Dépendance introuvable")
+            ctx.closure_dirty = True
+
+        case SetRootOp():
+            root_id = resolve(op.skill_id)
+            stmt = (
+                update(Skill)
+                .where(in_tree, (Skill.id == root_id) | Skill.is_root)
+                .values(is_root=(Skill.id == root_id))
+                .returning(Skill.id)
+            )
+            updated = set((await db.execute(stmt.execution_options(synchronize_session=False))).scalars().all())
+            if root_id not in updated:
+                raise not_found(op.skill_id)
+
+        case SetTagsOp():
+            if await _sync_tags(db, skill_tree_id, op.tags):
+                ctx.listing_dirty = True
+
+
+async def _is_root_state_valid(db: AsyncSession, skill_tree_id: int) -> bool:
+    """Équivalent SQL de is_root_skill_valid sur le graphe stocké (une seule requête)."""
+    root_unlocked = (
+        select(SkillDependency.unlock_id)
+        .join(Skill, Skill.id == SkillDependency.unlock_id)
+        .where(Skill.skill_tree_id == skill_tree_id, Skill.is_root)
+        .exists()
+    )
+    stmt = select(
+        func.count(Skill.id).filter(Skill.is_root).label("roots"),
+        func.count(Skill.id).label("total"),
+        root_unlocked.label("root_unlocked"),
+    ).where(Skill.skill_tree_id == skill_tree_id)
+    row = (await db.execute(stmt)).one()
+    if row.total == 0:
+        return True
+    return row.roots == 1 and not row.root_unlocked
+
+
 def is_root_skill_valid(skills: list[SkillSaveSchema]) -> bool:
     """Vérifie qu'il y a exactement un root skill dans la liste."""
     if sum(s.is_root for s in skills) > 1 or (sum(s.is_root for s in skills) == 0 and len(skills) > 0):
@@ -444,9 +891,8 @@ async def is_user_authorized_for_editing(db: AsyncSession, skill_tree_id: int, u
     return skill_tree.creator_username == username
 
 
-async def get_list_of_skill_trees_by_username(db: AsyncSession, username: str) -> list[SkillTreeSimpleSchema]:
-    """Récupère la liste des skill trees créés par un utilisateur."""
-    stmt = select(SkillTree).where(SkillTree.creator_username == username).options(selectinload(SkillTree.tags))
-    result = await db.execute(stmt)
-    skill_trees = result.scalars().all()
-    return [SkillTreeSimpleSchema.model_validate(st) for st in skill_trees]
+async def get_list_of_skill_trees_by_username(
+    db: AsyncSession, username: str, params: TreePageParams | None = None
+) -> TreePage:
+    """Récupère une page des skill trees créés par un utilisateur."""
+    return await _get_tree_page(db, [SkillTree.creator_username == username], params or TreePageParams())
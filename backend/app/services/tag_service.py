@@ -0,0 +1,21 @@
+# /backend/app/services/tag_service.py
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tag import Tag
+from app.schemas.tag import TagSchema
+
+
+async def get_tags(db: AsyncSession, prefix: str | None = None, limit: int = 20) -> list[TagSchema]:
+    """Tags utilisés par au moins un arbre, des plus utilisés aux moins utilisés.
+
+    Lit le compteur usage_count maintenu par trigger, sans parcourir skill_tree_tags.
+    """
+    stmt = select(Tag.name, Tag.usage_count).where(Tag.usage_count > 0)
+    if prefix:
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = stmt.where(Tag.name.like(f"{escaped}%", escape="\\"))
+    stmt = stmt.order_by(Tag.usage_count.desc(), Tag.name).limit(limit)
+    rows = await db.execute(stmt)
+    return [TagSchema(name=row.name, usage_count=row.usage_count) for row in rows]
@@ -0,0 +1,126 @@
+# /backend/app/services/trending_service.py
+
+"""Maintenance des scores de tendance : rollup horaire de l'activité puis scores par période.
+
+Un job périodique (lancé dans le lifespan) recalcule les heures récentes de
+trending_hourly à partir des favoris et des checks, puis réécrit trending_scores.
+La lecture des tendances n'est plus qu'un parcours d'index sur trending_scores.
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import Interval
+
+from app.constants import TRENDING_HALF_LIFE_RATIO, TRENDING_PERIODS, TRENDING_REFRESH_INTERVAL, TRENDING_TOP_N
+from app.database import async_session
+from app.services.collection_version_service import TRENDING_KEY, bump_collection_version
+
+logger = logging.getLogger(__name__)
+
+# Clé du verrou consultatif : un seul processus recalcule à la fois
+_REFRESH_LOCK_KEY = 7_352_001
+
+_RETENTION = max(TRENDING_PERIODS.values())
+
+# Les heures déjà agrégées peuvent encore changer (checks retirés, transactions
+# tardives) : on recalcule depuis l'heure précédant la dernière heure connue.
+_SINCE_SQL = text(
+    """SELECT date_trunc('hour', COALESCE(MAX(hour), LOCALTIMESTAMP - :retention)) - INTERVAL '1 hour'
+  FROM trending_hourly"""
+).bindparams(bindparam("retention", type_=Interval()))
+
+_DELETE_HOURS_SQL = text(
+    """DELETE FROM trending_hourly
+  WHERE hour >= :since OR hour < date_trunc('hour', NOW() - :retention)"""
+).bindparams(bindparam("retention", type_=Interval()))
+
+_INSERT_HOURS_SQL = text(
+    """INSERT INTO trending_hourly (skill_tree_id, hour, favorites, checkers)
+  SELECT skill_tree_id, hour, SUM(favorites), SUM(checkers)
+  FROM (
+      SELECT skill_tree_id, date_trunc('hour', created_at) AS hour,
+             COUNT(DISTINCT user_id) AS favorites, 0 AS checkers
+      FROM user_favorite_trees
+      WHERE created_at >= :since
+      GROUP BY 1, 2
+
+      UNION ALL
+
+      SELECT skills.skill_tree_id, date_trunc('hour', user_check_skill.created_at),
+             0, COUNT(DISTINCT user_check_skill.user_id)
+      FROM user_check_skill
+      INNER JOIN skills ON user_check_skill.skill_id = skills.id
+      WHERE user_check_skill.created_at >= :since
+      GROUP BY 1, 2
+  ) AS activity
+  GROUP BY skill_tree_id, hour"""
+)
+
+# Score = utilisateurs actifs par heure sur la période ; le score amorti divise
+# le poids d'une heure par deux à chaque demi-vie écoulée.
+_REFRESH_SCORES_SQL = text(
+    """INSERT INTO trending_scores (period, skill_tree_id, score, decayed_score)
+  SELECT :period, skill_tree_id, score, decayed_score
+  FROM (
+      SELECT skill_tree_id, score, decayed_score,
+             ROW_NUMBER() OVER (ORDER BY score DESC, skill_tree_id) AS score_rank,
+             ROW_NUMBER() OVER (ORDER BY decayed_score DESC, skill_tree_id) AS decayed_rank
+      FROM (
+          SELECT skill_tree_id,
+                 SUM(favorites + checkers) AS score,
+                 SUM(
+                     (favorites + checkers)
+                     * POWER(0.5, EXTRACT(EPOCH FROM NOW() - hour) / CAST(:half_life AS DOUBLE PRECISION))
+                 ) AS decayed_score
+          FROM trending_hourly
+          WHERE hour >= date_trunc('hour', NOW() - :interval)
+          GROUP BY skill_tree_id
+      ) AS scores
+  ) AS ranked
+  WHERE score_rank <= :top_n OR decayed_rank <= :top_n"""
+).bindparams(bindparam("interval", type_=Interval()))
+
+
+async def refresh_trending_scores(db: AsyncSession) -> bool:
+    """Recalcule le rollup horaire récent et les scores de toutes les périodes, puis commit.
+
+    Retourne False si un autre processus détient déjà le verrou.
+    """
+    locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _REFRESH_LOCK_KEY})
+    if not locked.scalar():
+        await db.rollback()
+        return False
+
+    since = (await db.execute(_SINCE_SQL, {"retention": _RETENTION})).scalar_one()
+    await db.execute(_DELETE_HOURS_SQL, {"since": since, "retention": _RETENTION})
+    await db.execute(_INSERT_HOURS_SQL, {"since": since})
+
+    await db.execute(text("DELETE FROM trending_scores"))
+    for period, interval in TRENDING_PERIODS.items():
+        await db.execute(
+            _REFRESH_SCORES_SQL,
+            {
+                "period": period,
+                "interval": interval,
+                "half_life": interval.total_seconds() * TRENDING_HALF_LIFE_RATIO,
+                "top_n": TRENDING_TOP_N,
+            },
+        )
+
+    await bump_collection_version(db, TRENDING_KEY)
+    await db.commit()
+    return True
+
+
+async def run_trending_refresher(interval: float = TRENDING_REFRESH_INTERVAL) -> None:
+    """Boucle du job périodique (lifespan) ; une erreur est loggée sans arrêter la boucle."""
+    while True:
+        try:
+            async with async_session() as session:
+                await refresh_trending_scores(session)
+        except Exception as e:
+            logger.warning(f"Trending refresh failed: {e}")
+        await asyncio.sleep(interval)
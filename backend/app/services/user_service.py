@@ -4,10 +4,14 @@ import asyncio
 
 from bcrypt import checkpw, gensalt, hashpw
 from fastapi import HTTPException
-from sqlalchemy import delete, func, select
+from sqlalchemy import Integer, any_, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.skill import Skill
+from app.models.skill_closure import SkillClosure
 from app.models.skill_tree import SkillTree
 from app.models.user import User
 from app.models.user_check_skill import UserCheckSkill
@@ -17,8 +21,12 @@ from app.schemas.user import (
     UserLoginSchema,
     UserPublicDetailSchema,
     UserSchema,
+    UserSkillsCheckBatchResultSchema,
+    UserSkillsCheckBatchSchema,
     UserUpdateSchema,
 )
+from app.services import check_buffer
+from app.services.progress_service import bump_checks_version
 
 
 async def register_user(db: AsyncSession, user: UserCreateSchema) -> UserSchema:
@@ -62,18 +70,44 @@ async def authenticate_user(db: AsyncSession, user_login: UserLoginSchema) -> Us
 
 
 async def get_user_skills_checked(db: AsyncSession, user_id: int) -> UserCheckSkillsSchema:
-    """Récupère la liste des IDs de compétences acquises par l'utilisateur."""
+    """Récupère la liste des IDs de compétences acquises par l'utilisateur (checks en attente compris)."""
     stmt = select(UserCheckSkill.skill_id).where(UserCheckSkill.user_id == user_id)
     result = await db.execute(stmt)
-    skill_ids = result.scalars().all()
-    return UserCheckSkillsSchema(user_id=user_id, skill_ids=list(skill_ids))
+    skill_ids = list(result.scalars().all())
+    if check_buffer.pending_checks(user_id):
+        skill_ids = sorted(check_buffer.apply_pending(user_id, set(skill_ids)))
+    return UserCheckSkillsSchema(user_id=user_id, skill_ids=skill_ids)
+
+
+async def _stored_check_state(db: AsyncSession, user_id: int, skill_id: int) -> bool | None:
+    """État du check (en attente compris), ou None si le skill n'existe pas (écriture différée)."""
+    checked = (
+        select(UserCheckSkill.skill_id)
+        .where(UserCheckSkill.user_id == user_id, UserCheckSkill.skill_id == skill_id)
+        .exists()
+    )
+    row = (await db.execute(select(checked).where(Skill.id == skill_id))).scalar_one_or_none()
+    if row is None:
+        return None
+    return check_buffer.pending_checks(user_id).get(skill_id, row)
 
 
 async def add_user_skill_checked(db: AsyncSession, user_id: int, skill_id: int) -> None:
     """Ajoute une compétence acquise pour un utilisateur."""
+    if check_buffer.WRITE_BEHIND_ENABLED:
+        # Même contrat que l'écriture directe : 404 pour un skill inconnu, 409 s'il est déjà coché
+        state = await _stored_check_state(db, user_id, skill_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"Skill with id {skill_id} not found")
+        if state:
+            raise HTTPException(status_code=409, detail="Skill already checked")
+        check_buffer.buffer_check(user_id, skill_id, True)
+        return
     try:
         new_check = UserCheckSkill(user_id=user_id, skill_id=skill_id)
         db.add(new_check)
+        await db.flush()
+        await bump_checks_version(db, [user_id])
         await db.commit()
     except IntegrityError:
         await db.rollback()
@@ -82,9 +116,76 @@ async def add_user_skill_checked(db: AsyncSession, user_id: int, skill_id: int)
 
 async def remove_user_skill_checked(db: AsyncSession, user_id: int, skill_id: int) -> None:
     """Supprime une compétence acquise pour un utilisateur."""
+    if check_buffer.WRITE_BEHIND_ENABLED:
+        # Skill inconnu : rien à décocher (204, comme l'écriture directe), rien n'entre dans le tampon
+        if await _stored_check_state(db, user_id, skill_id) is not None:
+            check_buffer.buffer_check(user_id, skill_id, False)
+        return
     stmt = delete(UserCheckSkill).where(UserCheckSkill.user_id == user_id, UserCheckSkill.skill_id == skill_id)
-    await db.execute(stmt)
+    if (await db.execute(stmt)).rowcount:
+        await bump_checks_version(db, [user_id])
+    await db.commit()
+
+
+def _int_array(values: set[int]):
+    return literal(sorted(values), ARRAY(Integer()))
+
+
+async def apply_user_skill_checks(
+    db: AsyncSession, user_id: int, data: UserSkillsCheckBatchSchema
+) -> UserSkillsCheckBatchResultSchema:
+    """Coche et décoche plusieurs compétences en une seule transaction.
+
+    Avec include_prerequisites, les ancêtres des skills à cocher (fermeture transitive)
+    sont cochés aussi. Les skills déjà cochés, ou déjà décochés, sont ignorés.
+    """
+    # Les checks unitaires en attente passent avant le lot
+    await check_buffer.flush_user_checks(user_id)
+    to_check = set(data.check)
+    if to_check:
+        stmt = select(Skill.id).where(Skill.id == any_(_int_array(to_check)))
+        if data.include_prerequisites:
+            stmt = stmt.union(
+                select(SkillClosure.ancestor_id).where(SkillClosure.descendant_id == any_(_int_array(to_check)))
+            )
+        found = set((await db.execute(stmt)).scalars().all())
+        unknown = to_check - found
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Skill with id {min(unknown)} not found")
+        to_check = found
+
+    to_uncheck = set(data.uncheck)
+    if to_check & to_uncheck:
+        raise HTTPException(status_code=400, detail="Un skill ne peut pas être à la fois coché et décoché")
+
+    unchecked: list[int] = []
+    if to_uncheck:
+        stmt = (
+            delete(UserCheckSkill)
+            .where(UserCheckSkill.user_id == user_id, UserCheckSkill.skill_id == any_(_int_array(to_uncheck)))
+            .returning(UserCheckSkill.skill_id)
+        )
+        unchecked = list((await db.execute(stmt)).scalars().all())
+
+    checked: list[int] = []
+    if to_check:
+        stmt = (
+            pg_insert(UserCheckSkill)
+            .values([{"user_id": user_id, "skill_id": skill_id} for skill_id in sorted(to_check)])
+            .on_conflict_do_nothing(index_elements=["user_id", "skill_id"])
+            .returning(UserCheckSkill.skill_id)
+        )
+        try:
+            checked = list((await db.execute(stmt)).scalars().all())
+        except IntegrityError:
+            # Un skill supprimé entre la vérification et l'insertion
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="Skill not found")
+
+    if checked or unchecked:
+        await bump_checks_version(db, [user_id])
     await db.commit()
+    return UserSkillsCheckBatchResultSchema(checked=sorted(checked), unchecked=sorted(unchecked))
 
 
 async def update_user(db: AsyncSession, user_id: int, data: UserUpdateSchema) -> UserSchema | None:
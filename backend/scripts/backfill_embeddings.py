@@ -4,6 +4,9 @@ Usage:
     cd backend
     python -m scripts.backfill_embeddings          # only trees without embedding
     python -m scripts.backfill_embeddings --force   # re-embed ALL trees
+
+With --force, trees whose embedding text and model are unchanged (embedding_hash)
+are skipped without encoding: re-run it after a model or backend change.
 """
 
 import argparse
@@ -19,12 +22,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from sqlalchemy import func, select, text  # noqa: E402
+from sqlalchemy import func, select, update  # noqa: E402
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
 
 from app.constants import EMBEDDING_BATCH_SIZE  # noqa: E402
 from app.models.skill_tree import SkillTree  # noqa: E402
 from app.services.embedding_service import embed_skill_tree  # noqa: E402
+from app.services.search_vector_service import rebuild_search_vectors  # noqa: E402
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
@@ -52,22 +56,16 @@ async def backfill(*, force: bool = False):
             logger.info("Nothing to backfill")
             return
 
-        # Update tsvector (with unaccent + skills for FTS)
-        _tsvector_sql = """
-            UPDATE skill_trees st SET search_vector =
-                setweight(to_tsvector('french', unaccent(coalesce(st.name, ''))), 'A') ||
-                setweight(to_tsvector('french', unaccent(coalesce(st.description, ''))), 'B') ||
-                setweight(to_tsvector('french', unaccent(coalesce(
-                    (SELECT string_agg(s.name || ' ' || coalesce(s.description, ''), ' ')
-                     FROM skills s WHERE s.skill_tree_id = st.id),
-                ''))), 'C')
-        """
+        # Marque les arbres puis reconstruit leur tsvector (même requête que le job du lifespan)
+        mark_stmt = update(SkillTree).values(search_vector_dirty_at=func.localtimestamp())
         if not force:
-            _tsvector_sql += " WHERE st.search_vector IS NULL"
-        tsvector_stmt = text(_tsvector_sql)  # noqa: S608
-        result = await db.execute(tsvector_stmt)
+            mark_stmt = mark_stmt.where(SkillTree.search_vector.is_(None))
+        await db.execute(mark_stmt)
         await db.commit()
-        logger.info(f"Updated {result.rowcount} tsvector entries")
+        rebuilt = 0
+        while count := await rebuild_search_vectors(db, debounce=0):
+            rebuilt += count
+        logger.info(f"Updated {rebuilt} tsvector entries")
 
         # Process in batches
         processed = 0
@@ -102,13 +100,15 @@ async def backfill(*, force: bool = False):
 
             offset += EMBEDDING_BATCH_SIZE
 
-        logger.info(f"Backfill complete: {processed} succeeded, {failed} failed out of {total}")
+        logger.info(f"Backfill complete: {processed} up to date (embedded or skipped), {failed} failed out of {total}")
 
     await engine.dispose()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Backfill skill tree embeddings")
-    parser.add_argument("--force", action="store_true", help="Re-embed ALL trees (not just missing)")
+    parser.add_argument(
+        "--force", action="store_true", help="Re-embed ALL trees (not just missing), skipping unchanged ones"
+    )
     args = parser.parse_args()
     asyncio.run(backfill(force=args.force))
@@ -0,0 +1,127 @@
+"""Compare the embedding backends: load time, latency, throughput, memory, agreement.
+
+Each backend runs in its own process (clean RSS): load time, single-text
+latency percentiles, batch throughput and resident memory, then the cosine
+similarity of its vectors with the sentence-transformers reference on the
+same texts (mean and minimum; vectors are normalized, cosine = dot product).
+
+Usage:
+    cd backend
+    python -m scripts.export_onnx_embedding_model   # once, for the onnx backend
+    python -m scripts.benchmark_embedding_backends
+    python -m scripts.benchmark_embedding_backends --backends onnx --texts 512 --batch-size 32
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import numpy as np  # noqa: E402
+
+from app.constants import EMBEDDING_BACKEND_ONNX, EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS  # noqa: E402
+
+_SUBJECTS = ["Python", "la guitare", "le japonais", "la photographie", "Kubernetes", "la cuisine", "les échecs"]
+
+
+def _texts(count: int) -> list[str]:
+    """Textes de longueurs variées, avec les deux préfixes E5."""
+    texts = []
+    for i in range(count):
+        subject = _SUBJECTS[i % len(_SUBJECTS)]
+        if i % 2:
+            texts.append(f"query: apprendre {subject}")
+        else:
+            details = " ".join(f"étape {j} : pratiquer {subject} niveau {j}." for j in range(1 + i % 12))
+            texts.append(f"passage: {subject}. Parcours complet. {details}")
+    return texts
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _measure(name: str, texts: list[str], batch_size: int, singles: int) -> dict:
+    """Exécuté dans un processus dédié : mesures d'un backend et ses vecteurs."""
+    from app.services.embedding_backends import load_embedding_backend
+
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    backend = load_embedding_backend(name)
+    backend.encode(["passage: warm-up"])
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for text in texts[:singles]:
+        start = time.perf_counter()
+        backend.encode([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    vectors = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(backend.encode(texts[i : i + batch_size]))
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    return {
+        "load_s": load_seconds,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0],
+        "texts_per_s": throughput,
+        "rss_mb": _rss_mb(),
+        "model_rss_mb": _rss_mb() - rss_before,
+        "vectors": vectors,
+    }
+
+
+def benchmark(backends: list[str], count: int, batch_size: int, singles: int):
+    texts = _texts(count)
+    reference = EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS
+    names = [reference] + [name for name in backends if name != reference]
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in names:
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(_measure, (name, texts, batch_size, singles))
+
+    print(
+        f"{'backend':>22} {'load s':>7} {'p50 ms':>7} {'p95 ms':>7} {'texts/s':>8} {'RSS MB':>7} "
+        f"{'model MB':>8} {'cos mean':>8} {'cos min':>8}"
+    )
+    expected = np.array(results[reference]["vectors"])
+    for name in names:
+        r = results[name]
+        cosines = (np.array(r["vectors"]) * expected).sum(axis=1)
+        print(
+            f"{name:>22} {r['load_s']:>7.1f} {r['p50_ms']:>7.1f} {r['p95_ms']:>7.1f} {r['texts_per_s']:>8.1f} "
+            f"{r['rss_mb']:>7.0f} {r['model_rss_mb']:>8.0f} {cosines.mean():>8.4f} {cosines.min():>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the embedding inference backends")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=[EMBEDDING_BACKEND_SENTENCE_TRANSFORMERS, EMBEDDING_BACKEND_ONNX],
+        help="Backends to compare (sentence-transformers is always run as the reference)",
+    )
+    parser.add_argument("--texts", type=int, default=256, help="Texts encoded for throughput and agreement")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per encode call")
+    parser.add_argument("--singles", type=int, default=100, help="Single-text encodings for latency")
+    args = parser.parse_args()
+    benchmark(args.backends, args.texts, args.batch_size, args.singles)
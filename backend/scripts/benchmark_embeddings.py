@@ -0,0 +1,79 @@
+"""Benchmark generate_embedding: throughput and latency by concurrency level.
+
+Runs the same number of query encodings at several concurrency levels, with
+micro-batching (default window and batch size) and without (batches of one
+text), and reports encodings per second and per-call latency percentiles.
+
+Usage:
+    cd backend
+    python -m scripts.benchmark_embeddings
+    python -m scripts.benchmark_embeddings --concurrency 1 8 32 --requests 512 --window-ms 2
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.constants import EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_WINDOW  # noqa: E402
+from app.services import embedding_service  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def _run(concurrency: int, requests: int) -> tuple[float, list[float]]:
+    """Encode requests textes avec concurrency appels simultanés ; retourne (débit, latences en ms)."""
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int):
+        async with slots:
+            start = time.perf_counter()
+            await embedding_service.generate_embedding(f"apprendre le sujet numéro {i}", is_query=True)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start), latencies
+
+
+async def benchmark(levels: list[int], requests: int, window: float, batch_size: int):
+    # La file d'attente du pool ne doit pas refuser d'encodages pendant la mesure
+    embedding_service._max_queue = max(levels) + batch_size
+    await embedding_service.generate_embedding("warm-up", is_query=True)
+
+    modes = [("unbatched", 0.0, 1), ("batched", window, batch_size)]
+    print(f"{'mode':>10} {'concurrency':>12} {'enc/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for concurrency in levels:
+        for mode, mode_window, mode_size in modes:
+            embedding_service._batch_window = mode_window
+            embedding_service._batch_max_size = mode_size
+            throughput, latencies = await _run(concurrency, requests)
+            p50 = statistics.median(latencies)
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else p50
+            print(f"{mode:>10} {concurrency:>12} {throughput:>8.1f} {p50:>8.1f} {p95:>8.1f} {max(latencies):>8.1f}")
+
+    embedding_service.shutdown_embedding_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched embedding generation")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrent callers")
+    parser.add_argument("--requests", type=int, default=256, help="Encodings per run")
+    parser.add_argument(
+        "--window-ms", type=float, default=EMBEDDING_BATCH_WINDOW * 1000, help="Micro-batching window (ms)"
+    )
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_MAX_SIZE, help="Max texts per batch")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.concurrency, args.requests, args.window_ms / 1000, args.batch_size))
@@ -0,0 +1,130 @@
+"""Benchmark save_skill_tree: SQL round trips and duration by tree size.
+
+Creates a throwaway user and trees, saves chains of N skills (creation, then an
+edit that renames half, deletes the other half and adds as many new skills),
+and reports the number of statements sent to the database. The count must stay
+the same whatever N.
+
+Usage:
+    cd backend
+    python -m scripts.benchmark_save_skill_tree
+    python -m scripts.benchmark_save_skill_tree --sizes 10 100 1000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import delete, event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.models.skill import Skill  # noqa: E402
+from app.models.skill_tree import SkillTree  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.skill import SkillSaveSchema  # noqa: E402
+from app.schemas.skill_tree import SkillTreeSaveSchema  # noqa: E402
+from app.services.skill_tree_service import save_skill_tree  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+BENCH_USERNAME = "bench-save-skill-tree"
+
+
+def _payload(tree: SkillTree, skills: list[SkillSaveSchema]) -> SkillTreeSaveSchema:
+    return SkillTreeSaveSchema(
+        id=tree.id,
+        name=tree.name,
+        description=tree.description,
+        creator_username=tree.creator_username,
+        skills=skills,
+        tags=[],
+    )
+
+
+def _chain(size: int, prefix: str) -> list[SkillSaveSchema]:
+    return [
+        SkillSaveSchema(
+            id=-(i + 1),
+            name=f"{prefix}{i}",
+            is_root=(i == 0 and prefix == "S"),
+            unlock_ids=[-(i + 2)] if i < size - 1 else [],
+        )
+        for i in range(size)
+    ]
+
+
+async def benchmark(sizes: list[int]):
+    database_url = os.getenv("POSTGRES_DATABASE_URL_DEV") or os.getenv("POSTGRES_DATABASE_URL")
+    if not database_url:
+        logger.error("No database URL configured")
+        return
+
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    statements = 0
+
+    def _count(*args):
+        nonlocal statements
+        statements += 1
+
+    async def _timed_save(db, payload) -> tuple[int, float]:
+        nonlocal statements
+        statements = 0
+        start = time.perf_counter()
+        await save_skill_tree(db, payload)
+        return statements, (time.perf_counter() - start) * 1000
+
+    async with session_factory() as db:
+        db.add(User(username=BENCH_USERNAME, email=f"{BENCH_USERNAME}@example.invalid", password_hash="x"))  # noqa: S106
+        await db.commit()
+
+        event.listen(engine.sync_engine, "before_cursor_execute", _count)
+        try:
+            print(f"{'skills':>8} {'create stmts':>13} {'create ms':>10} {'edit stmts':>11} {'edit ms':>9}")
+            for size in sizes:
+                tree = SkillTree(name=f"{BENCH_USERNAME}-{size}", creator_username=BENCH_USERNAME)
+                db.add(tree)
+                await db.commit()
+
+                create_stmts, create_ms = await _timed_save(db, _payload(tree, _chain(size, "S")))
+
+                rows = await db.execute(select(Skill.id, Skill.name).where(Skill.skill_tree_id == tree.id))
+                ids = {row.name: row.id for row in rows.all()}
+                half = size // 2
+                kept = [
+                    SkillSaveSchema(
+                        id=ids[f"S{i}"],
+                        name=f"S{i} v2",
+                        is_root=(i == 0),
+                        unlock_ids=[ids[f"S{i + 1}"]] if i < half - 1 else [-1],
+                    )
+                    for i in range(half)
+                ]
+                edit_stmts, edit_ms = await _timed_save(db, _payload(tree, kept + _chain(half, "N")))
+
+                print(f"{size:>8} {create_stmts:>13} {create_ms:>10.1f} {edit_stmts:>11} {edit_ms:>9.1f}")
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", _count)
+            await db.execute(delete(User).where(User.username == BENCH_USERNAME))
+            await db.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark save_skill_tree round trips")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 300, 1000], help="Tree sizes to save")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.sizes))
@@ -0,0 +1,74 @@
+"""Export the embedding model to ONNX and quantize it to int8 for the onnx backend.
+
+Writes EMBEDDING_ONNX_DIR (or --output): model.onnx (fp32), model_int8.onnx
+(dynamic int8 quantization of the weights) and tokenizer.json. The quantized
+model keeps the 384-dimension output, pooling is done by the backend.
+
+Requires torch, transformers and onnx (pip install onnx), only for the export:
+the onnx backend itself needs onnxruntime and tokenizers.
+
+Usage:
+    cd backend
+    python -m scripts.export_onnx_embedding_model
+    EMBEDDING_BACKEND=onnx uvicorn app.main:app
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.constants import EMBEDDING_MODEL, EMBEDDING_ONNX_DIR  # noqa: E402
+from app.services.embedding_backends import ONNX_MODEL_FILE  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def export(model_name: str, output: str, opset: int):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(output)  # tokenizer.json (tokenizer rapide)
+
+    sample = tokenizer(["query: warm-up"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    fp32_path = os.path.join(output, "model.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            fp32_path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={**axes, "last_hidden_state": {0: "batch", 1: "sequence"}},
+            opset_version=opset,
+            dynamo=False,
+        )
+    logger.info(f"Exported {model_name} to {fp32_path}")
+
+    int8_path = os.path.join(output, ONNX_MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    size = os.path.getsize(fp32_path) / 2**20, os.path.getsize(int8_path) / 2**20
+    logger.info(f"Quantized to {int8_path} ({size[0]:.0f} MB -> {size[1]:.0f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the embedding model to quantized ONNX")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Hugging Face model name")
+    parser.add_argument("--output", default=os.getenv("EMBEDDING_ONNX_DIR", EMBEDDING_ONNX_DIR), help="Output dir")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset version")
+    args = parser.parse_args()
+    export(args.model, args.output, args.opset)
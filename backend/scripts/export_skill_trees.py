@@ -0,0 +1,74 @@
+"""Export skill trees (skills, dependencies, tags) as NDJSON.
+
+Usage:
+    cd backend
+    python -m scripts.export_skill_trees > trees.ndjson
+    python -m scripts.export_skill_trees --output trees.ndjson --tag python
+    python -m scripts.export_skill_trees --creator alice --updated-since 2026-01-01T00:00:00
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.services.export_service import ExportFilters, stream_skill_trees_ndjson  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def export(filters: ExportFilters, output: str | None):
+    database_url = os.getenv("POSTGRES_DATABASE_URL_DEV") or os.getenv("POSTGRES_DATABASE_URL")
+    if not database_url:
+        logger.error("No database URL configured")
+        return
+
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    out = open(output, "wb") if output else sys.stdout.buffer  # noqa: SIM115
+    trees = 0
+    start = time.perf_counter()
+    try:
+        async with session_factory() as db:
+            async for chunk in stream_skill_trees_ndjson(db, filters):
+                out.write(chunk)
+                trees += chunk.count(b"\n")
+    finally:
+        if output:
+            out.close()
+        else:
+            out.flush()
+
+    elapsed = time.perf_counter() - start
+    rate = trees / elapsed if elapsed else 0.0
+    logger.info(f"Exported {trees} trees in {elapsed:.1f}s ({rate:.0f} trees/s)")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export skill trees as NDJSON")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    parser.add_argument("--creator", help="Only trees created by this username")
+    parser.add_argument("--tag", help="Only trees with this tag")
+    parser.add_argument(
+        "--updated-since", type=datetime.fromisoformat, help="Only trees updated since (ISO 8601 datetime)"
+    )
+    args = parser.parse_args()
+    asyncio.run(
+        export(ExportFilters(creator=args.creator, tag=args.tag, updated_since=args.updated_since), args.output)
+    )
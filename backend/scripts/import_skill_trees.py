@@ -0,0 +1,70 @@
+"""Bulk import skill trees from an NDJSON file (format of scripts.export_skill_trees).
+
+Usage:
+    cd backend
+    python -m scripts.import_skill_trees trees.ndjson --creator alice
+    cat trees.ndjson | python -m scripts.import_skill_trees - --creator alice
+
+Embeddings are not generated here: run scripts.backfill_embeddings afterwards.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.services.import_service import import_skill_trees_ndjson  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def _read_lines(stream):
+    for line in stream:
+        yield line
+
+
+async def import_file(path: str, creator: str):
+    database_url = os.getenv("POSTGRES_DATABASE_URL_DEV") or os.getenv("POSTGRES_DATABASE_URL")
+    if not database_url:
+        logger.error("No database URL configured")
+        return
+
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    stream = sys.stdin.buffer if path == "-" else open(path, "rb")  # noqa: SIM115
+    try:
+        async with session_factory() as db:
+            result = await import_skill_trees_ndjson(db, _read_lines(stream), creator)
+    finally:
+        if path != "-":
+            stream.close()
+
+    for error in result.errors:
+        logger.warning(f"Line {error.line} skipped: {error.detail}")
+    logger.info(
+        f"Imported {len(result.tree_ids)} trees, {result.skills} skills, {result.dependencies} dependencies, "
+        f"{result.tags} tags in {result.duration_seconds:.1f}s ({result.rows_per_second:.0f} rows/s)"
+    )
+    logger.info("Run scripts.backfill_embeddings to generate the embeddings of the imported trees")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import skill trees from NDJSON")
+    parser.add_argument("path", help="NDJSON file, or - for stdin")
+    parser.add_argument("--creator", required=True, help="Username set as creator of the imported trees")
+    args = parser.parse_args()
+    asyncio.run(import_file(args.path, args.creator))
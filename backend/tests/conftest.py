@@ -14,6 +14,11 @@ from app.database import get_db
 from app.limiter import limiter
 from app.main import app
 from app.models.base_model import BaseModel
+from app.services.check_buffer import clear_check_buffer
+from app.services.graph_cache import clear_graph_cache
+from app.services.progress_service import clear_progress_cache
+from app.services.query_embedding_cache import clear_query_embedding_cache
+from app.services.response_cache import clear_response_cache
 
 load_dotenv()
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
@@ -29,6 +34,12 @@ async def setup_db():
     async with engine_test.begin() as conn:
         await conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(BaseModel.metadata.create_all)
+    # Les ids et versions repartent de zéro à chaque test : on repart d'un cache vide
+    clear_graph_cache()
+    clear_response_cache()
+    clear_progress_cache()
+    clear_check_buffer()
+    clear_query_embedding_cache()
     yield
     async with engine_test.begin() as conn:
         await conn.run_sync(BaseModel.metadata.drop_all)
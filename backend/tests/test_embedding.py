@@ -1,15 +1,39 @@
 """Tests for the embedding service."""
 
+import asyncio
+import hashlib
+import time
+from datetime import timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
-from sqlalchemy.ext.asyncio import AsyncSession  # noqa: F401
-
+import pytest_asyncio
+from prometheus_client import REGISTRY
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.constants import EMBEDDING_JOB_MAX_ATTEMPTS
+from app.models.embedding_job import EmbeddingJob
+from app.models.skill_tree import SkillTree
+from app.models.user import User
+from app.schemas.skill_tree import SkillTreeUpdateSchema
+from app.services import embedding_service
+from app.services.embedding_backends import load_embedding_backend, mean_pool_normalize
+from app.services.embedding_job_service import (
+    enqueue_embedding_jobs,
+    get_embedding_queue_stats,
+    process_embedding_jobs,
+)
 from app.services.embedding_service import (
+    EmbeddingOverloadedError,
     build_embedding_text,
     embed_skill_tree,
+    embed_skill_trees,
+    embedding_input_hash,
     generate_embedding,
 )
+from app.services.skill_tree_service import update_skill_tree
 
 # --- build_embedding_text ---
 
@@ -96,6 +120,142 @@ class TestGenerateEmbedding:
         assert v_passage != v_query
 
 
+class TestEmbeddingExecutor:
+    @staticmethod
+    def _slow_model(seconds: float) -> MagicMock:
+        def encode(texts):
+            time.sleep(seconds)
+            return [[0.0] * 384 for _ in texts]
+
+        return MagicMock(encode=encode)
+
+    @staticmethod
+    def _hash_encode(texts: list[str]) -> list[list[float]]:
+        """Encodage déterministe, propre à chaque texte, sans charger le modèle."""
+        return [[b / 255 for b in hashlib.sha256(t.encode()).digest()] * 12 for t in texts]
+
+    @pytest.mark.asyncio
+    async def test_encoding_does_not_block_event_loop(self, monkeypatch):
+        """The loop keeps running other tasks while a slow encoding is in progress."""
+        monkeypatch.setattr(embedding_service, "_backend", self._slow_model(0.3))
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        vector = await generate_embedding("slow text")
+        task.cancel()
+        assert len(vector) == 384
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, monkeypatch):
+        monkeypatch.setattr(embedding_service, "_backend", self._slow_model(0.3))
+        monkeypatch.setattr(embedding_service, "_timeout", 0.05)
+        with pytest.raises(TimeoutError):
+            await generate_embedding("slow text")
+        await asyncio.sleep(0.4)
+        assert embedding_service._queued == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_are_batched_per_prefix(self, monkeypatch):
+        """Concurrent calls share one encode(list) call per prefix and get their own vector back."""
+        calls = []
+
+        def encode(texts):
+            calls.append(list(texts))
+            return self._hash_encode(texts)
+
+        monkeypatch.setattr(embedding_service, "_backend", MagicMock(encode=encode))
+        texts = [f"text {i}" for i in range(5)]
+        vectors = await asyncio.gather(
+            *(generate_embedding(t) for t in texts), generate_embedding("text 0", is_query=True)
+        )
+
+        assert sorted(calls) == sorted([[f"passage: {t}" for t in texts], ["query: text 0"]])
+        for text, vector in zip(texts, vectors, strict=False):
+            assert vector == self._hash_encode([f"passage: {text}"])[0]
+        assert vectors[-1] != vectors[0]
+
+    @pytest.mark.asyncio
+    async def test_batch_flushed_at_max_size(self, monkeypatch):
+        sizes = []
+
+        def encode(texts):
+            sizes.append(len(texts))
+            return self._hash_encode(texts)
+
+        monkeypatch.setattr(embedding_service, "_backend", MagicMock(encode=encode))
+        monkeypatch.setattr(embedding_service, "_batch_max_size", 4)
+        await asyncio.gather(*(generate_embedding(f"text {i}") for i in range(10)))
+        assert sorted(sizes) == [2, 4, 4]
+
+    @pytest.mark.asyncio
+    async def test_model_loaded_lazily_and_warmed_up(self, monkeypatch):
+        """The module imports without loading the model; the warm-up loads it and runs a dummy encode."""
+        model = MagicMock()
+        model.encode.return_value = MagicMock(tolist=lambda: [[0.0] * 384])
+        monkeypatch.setattr(embedding_service, "_backend", None)
+        monkeypatch.setattr("sentence_transformers.SentenceTransformer", MagicMock(return_value=model))
+        assert embedding_service.embedding_model_status() == "loading"
+
+        await embedding_service.warm_up_embedding_model()
+
+        assert embedding_service.is_embedding_model_ready()
+        model.encode.assert_called_once_with(["passage: warm-up"], normalize_embeddings=True)
+        assert embedding_service.embedding_backend_name() == "sentence-transformers"
+        assert await generate_embedding("text") == [0.0] * 384
+
+    @pytest.mark.asyncio
+    async def test_model_load_failure_is_reported(self, monkeypatch):
+        monkeypatch.setattr(embedding_service, "_backend", None)
+        monkeypatch.setattr(embedding_service, "_model_error", None)
+        monkeypatch.setattr("sentence_transformers.SentenceTransformer", MagicMock(side_effect=OSError("no model")))
+
+        assert not await embedding_service.warm_up_embedding_model()
+
+        assert embedding_service.embedding_model_status() == "error"
+        assert not embedding_service.is_embedding_model_ready()
+
+    @pytest.mark.asyncio
+    async def test_failed_model_load_is_retried(self, monkeypatch):
+        """A transient load failure does not leave semantic search disabled until a restart."""
+        model = MagicMock()
+        model.encode.return_value = MagicMock(tolist=lambda: [[0.0] * 384])
+        loader = MagicMock(side_effect=[OSError("download failed"), OSError("disk full"), model])
+        monkeypatch.setattr(embedding_service, "_backend", None)
+        monkeypatch.setattr(embedding_service, "_model_error", None)
+        monkeypatch.setattr("sentence_transformers.SentenceTransformer", loader)
+
+        await embedding_service.run_embedding_model_loader(retry_base=0.0, retry_max=0.0)
+
+        assert embedding_service.embedding_model_status() == "ready"
+        assert loader.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unknown_backend_is_reported(self, monkeypatch):
+        monkeypatch.setattr(embedding_service, "_backend", None)
+        monkeypatch.setattr(embedding_service, "_model_error", None)
+        monkeypatch.setattr(embedding_service, "_backend_name", "tpu")
+
+        await embedding_service.warm_up_embedding_model()
+
+        assert embedding_service.embedding_model_status() == "error"
+        assert "tpu" in embedding_service._model_error
+
+    @pytest.mark.asyncio
+    async def test_queue_full_is_rejected(self, monkeypatch):
+        monkeypatch.setattr(embedding_service, "_backend", MagicMock(encode=self._hash_encode))
+        monkeypatch.setattr(embedding_service, "_max_queue", 0)
+        with pytest.raises(EmbeddingOverloadedError):
+            await generate_embedding("text")
+        assert embedding_service._queued == 0
+
+
 # --- embed_skill_tree ---
 
 
@@ -207,3 +367,198 @@ class TestEmbedSkillTree:
         assert "web" in captured_text
         assert "HTML" in captured_text
         assert "CSS" in captured_text
+
+    @staticmethod
+    def _tree(embedding_hash: str | None) -> MagicMock:
+        tree = MagicMock()
+        tree.name, tree.description, tree.tags, tree.skills = "Test", None, [], []
+        tree.embedding, tree.embedding_hash = [0.1] * 384, embedding_hash
+        return tree
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.generate_embedding")
+    async def test_unchanged_text_is_skipped(self, mock_gen):
+        """Same text and model as the stored embedding: no encoding, no write."""
+        tree = self._tree(embedding_input_hash(build_embedding_text("Test", None, [], [])))
+        db = AsyncMock(spec=AsyncSession)
+        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=tree))
+        skipped = embedding_service.embedding_requests_total.labels(status="skipped")
+        before = skipped._value.get()
+
+        assert await embed_skill_tree(db, 1) is True
+
+        mock_gen.assert_not_awaited()
+        db.commit.assert_not_awaited()
+        assert skipped._value.get() == before + 1
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.generate_embedding")
+    async def test_changed_text_is_reembedded(self, mock_gen):
+        mock_gen.return_value = [0.2] * 384
+        tree = self._tree(embedding_input_hash("old text"))
+        db = AsyncMock(spec=AsyncSession)
+        db.execute.return_value = MagicMock(scalar_one_or_none=MagicMock(return_value=tree))
+
+        assert await embed_skill_tree(db, 1) is True
+
+        mock_gen.assert_awaited_once()
+        assert tree.embedding == [0.2] * 384
+        assert tree.embedding_hash == embedding_input_hash(build_embedding_text("Test", None, [], []))
+
+    def test_hash_depends_on_backend(self, monkeypatch):
+        text = build_embedding_text("Test", None, ["b", "a"], [])
+        reference = embedding_input_hash(text)
+        monkeypatch.setattr(embedding_service, "_backend_name", "onnx")
+        assert embedding_input_hash(text) != reference
+
+
+class TestEmbeddingBackends:
+    def test_mean_pool_ignores_padding_and_normalizes(self):
+        hidden = np.array([[[3.0, 4.0], [100.0, 100.0]], [[1.0, 0.0], [1.0, 0.0]]])
+        mask = np.array([[1, 0], [1, 1]])
+        pooled = mean_pool_normalize(hidden, mask)
+        assert np.allclose(pooled, [[0.6, 0.8], [1.0, 0.0]])
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            load_embedding_backend("tpu")
+
+
+# --- embedding_jobs ---
+
+
+class TestEmbeddingJobs:
+    @pytest_asyncio.fixture
+    async def tree_id(self, db_session):
+        db_session.add(User(username="jobuser", email="job@example.com", password_hash="x"))
+        await db_session.flush()
+        tree = SkillTree(name="Job Tree", description="desc", creator_username="jobuser")
+        db_session.add(tree)
+        await db_session.commit()
+        return tree.id
+
+    @staticmethod
+    async def _job(db, tree_id: int) -> EmbeddingJob | None:
+        db.expire_all()
+        return (await db.execute(select(EmbeddingJob).where(EmbeddingJob.skill_tree_id == tree_id))).scalar()
+
+    @pytest.mark.asyncio
+    async def test_writes_coalesce_into_one_job(self, db_session, tree_id):
+        for _ in range(3):
+            await enqueue_embedding_jobs(db_session, [tree_id, tree_id])
+            await db_session.commit()
+
+        jobs = (await db_session.execute(select(EmbeddingJob))).scalars().all()
+        assert [(job.skill_tree_id, job.generation, job.status) for job in jobs] == [(tree_id, 3, "pending")]
+
+    @pytest.mark.asyncio
+    async def test_update_enqueues_in_the_same_transaction(self, db_session, tree_id):
+        await update_skill_tree(db_session, tree_id, SkillTreeUpdateSchema(description="new"))
+        assert (await self._job(db_session, tree_id)).status == "pending"
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.generate_embedding", AsyncMock(return_value=[0.1] * 384))
+    async def test_processed_job_is_deleted(self, db_session, tree_id):
+        await enqueue_embedding_jobs(db_session, [tree_id], debounce=0)
+        await db_session.commit()
+
+        assert await process_embedding_jobs(db_session) == 1
+
+        assert await self._job(db_session, tree_id) is None
+        tree = await db_session.get(SkillTree, tree_id)
+        assert tree.embedding is not None and tree.embedding_hash is not None
+        assert await process_embedding_jobs(db_session) == 0
+
+    @pytest.mark.asyncio
+    async def test_tree_edited_between_batches_is_reembedded(self, db_session, tree_id):
+        """The worker session is reused across batches: an edit made elsewhere must not be read as unchanged."""
+        encoded = []
+
+        async def encode(text):
+            encoded.append(text)
+            return [0.1] * 384
+
+        # Référence forte : l'arbre reste dans l'identity map de la session d'un lot à l'autre
+        tree = await db_session.get(SkillTree, tree_id)
+        with patch("app.services.embedding_service.generate_embedding", encode):
+            await enqueue_embedding_jobs(db_session, [tree_id], debounce=0)
+            await db_session.commit()
+            assert await process_embedding_jobs(db_session) == 1
+
+            async with async_sessionmaker(db_session.bind)() as other:
+                await other.execute(update(SkillTree).where(SkillTree.id == tree_id).values(description="edited"))
+                await enqueue_embedding_jobs(other, [tree_id], debounce=0)
+                await other.commit()
+            assert await process_embedding_jobs(db_session) == 1
+
+        assert len(encoded) == 2 and "edited" in encoded[1]
+        assert tree.embedding_hash == embedding_input_hash(encoded[1])
+        assert await self._job(db_session, tree_id) is None
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.generate_embedding", AsyncMock(return_value=[0.1] * 384))
+    async def test_batch_duration_is_split_across_trees(self, db_session, tree_id):
+        other = SkillTree(name="Other Tree", description="desc", creator_username="jobuser")
+        db_session.add(other)
+        await db_session.commit()
+        count_before = REGISTRY.get_sample_value("embedding_duration_seconds_count") or 0
+        sum_before = REGISTRY.get_sample_value("embedding_duration_seconds_sum") or 0
+
+        with patch("app.services.embedding_service.time.perf_counter", side_effect=[10.0, 12.0]):
+            assert await embed_skill_trees(db_session, [tree_id, other.id]) == {}
+
+        # Un lot de 2 secondes pour 2 arbres : 2 observations, 2 secondes au total
+        assert REGISTRY.get_sample_value("embedding_duration_seconds_count") - count_before == 2
+        assert REGISTRY.get_sample_value("embedding_duration_seconds_sum") - sum_before == pytest.approx(2.0)
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.generate_embedding", AsyncMock(side_effect=RuntimeError("boom")))
+    async def test_failure_is_retried_then_dead(self, db_session, tree_id):
+        await enqueue_embedding_jobs(db_session, [tree_id], debounce=0)
+        await db_session.commit()
+
+        assert await process_embedding_jobs(db_session) == 1
+        job = await self._job(db_session, tree_id)
+        assert (job.status, job.attempts, job.last_error, job.locked_until) == ("pending", 1, "boom", None)
+        # Pas avant le délai de retry
+        assert await process_embedding_jobs(db_session) == 0
+
+        await db_session.execute(
+            update(EmbeddingJob).values(run_at=func.localtimestamp(), attempts=EMBEDDING_JOB_MAX_ATTEMPTS - 1)
+        )
+        await db_session.commit()
+        assert await process_embedding_jobs(db_session) == 1
+        assert (await self._job(db_session, tree_id)).status == "dead"
+
+        # Une nouvelle écriture relance le job
+        await enqueue_embedding_jobs(db_session, [tree_id])
+        await db_session.commit()
+        job = await self._job(db_session, tree_id)
+        assert (job.status, job.attempts, job.last_error) == ("pending", 0, None)
+
+    @pytest.mark.asyncio
+    async def test_job_rewritten_during_encoding_is_kept(self, db_session, tree_id):
+        async def encode_while_saving(text):
+            async with async_sessionmaker(db_session.bind)() as other:
+                await enqueue_embedding_jobs(other, [tree_id])
+                await other.commit()
+            return [0.1] * 384
+
+        await enqueue_embedding_jobs(db_session, [tree_id], debounce=0)
+        await db_session.commit()
+        with patch("app.services.embedding_service.generate_embedding", encode_while_saving):
+            assert await process_embedding_jobs(db_session) == 1
+
+        job = await self._job(db_session, tree_id)
+        assert (job.generation, job.locked_until) == (2, None)
+
+    @pytest.mark.asyncio
+    async def test_claimed_job_is_skipped_by_other_workers(self, db_session, tree_id):
+        await enqueue_embedding_jobs(db_session, [tree_id], debounce=0)
+        await db_session.execute(update(EmbeddingJob).values(locked_until=func.localtimestamp() + timedelta(hours=1)))
+        await db_session.commit()
+
+        assert await process_embedding_jobs(db_session) == 0
+        stats = await get_embedding_queue_stats(db_session)
+        assert (stats["pending"], stats["dead"]) == (1, 0)
+        assert stats["oldest_age_seconds"] < 60
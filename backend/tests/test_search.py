@@ -1,11 +1,22 @@
 """Tests for the search service and API endpoint."""
 
+import asyncio
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from sqlalchemy import select
 
+from app.models.search_query_stat import SearchQueryStat
 from app.schemas.search import SearchResultSchema, SearchResultsSchema
+from app.services import query_embedding_cache
+from app.services.query_embedding_cache import (
+    clear_query_embedding_cache,
+    flush_query_stats,
+    get_query_embedding,
+    normalize_query,
+    warm_query_embedding_cache,
+)
 from app.services.search_service import semantic_search
 
 
@@ -22,8 +33,29 @@ def _make_tree_row(id, name, description, creator, score_field, score_value):
 
 
 class TestSemanticSearch:
+    @pytest.fixture(autouse=True)
+    def model_ready(self):
+        with patch("app.services.search_service.is_embedding_model_ready", return_value=True) as ready:
+            yield ready
+
     @pytest.mark.asyncio
-    @patch("app.services.search_service.generate_embedding")
+    @patch("app.services.search_service.get_query_embedding")
+    async def test_model_not_ready_skips_semantic(self, mock_gen, model_ready):
+        """While the model is loading, search is served by FTS alone without waiting for it."""
+        model_ready.return_value = False
+        db = AsyncMock()
+        mock_fts_result = MagicMock()
+        mock_fts_result.all.return_value = [_make_tree_row(1, "Python", None, "user1", "text_score", 0.5)]
+        db.execute.side_effect = [mock_fts_result, MagicMock(scalars=lambda: MagicMock(all=lambda: []))]
+
+        result = await semantic_search(db, "python", limit=10)
+
+        mock_gen.assert_not_called()
+        assert [r.id for r in result.results] == [1]
+        assert result.results[0].semantic_score == 0.0
+
+    @pytest.mark.asyncio
+    @patch("app.services.search_service.get_query_embedding")
     async def test_embedding_not_implemented_falls_back_to_fts(self, mock_gen):
         """When embedding model is not configured, falls back to text-only search."""
         mock_gen.side_effect = NotImplementedError("not configured")
@@ -42,7 +74,7 @@ class TestSemanticSearch:
         assert result.results == []
 
     @pytest.mark.asyncio
-    @patch("app.services.search_service.generate_embedding")
+    @patch("app.services.search_service.get_query_embedding")
     async def test_semantic_failure_falls_back_to_fts(self, mock_gen):
         """When embedding API fails, falls back to text-only search."""
         mock_gen.side_effect = RuntimeError("API error")
@@ -58,7 +90,7 @@ class TestSemanticSearch:
         assert result.total == 0
 
     @pytest.mark.asyncio
-    @patch("app.services.search_service.generate_embedding")
+    @patch("app.services.search_service.get_query_embedding")
     async def test_fts_only_results(self, mock_gen):
         """Text search results are returned when semantic search has no results."""
         mock_gen.side_effect = NotImplementedError("not configured")
@@ -90,7 +122,7 @@ class TestSemanticSearch:
         assert result.results[0].score > 0
 
     @pytest.mark.asyncio
-    @patch("app.services.search_service.generate_embedding")
+    @patch("app.services.search_service.get_query_embedding")
     async def test_hybrid_merge_deduplicates(self, mock_gen):
         """Results appearing in both semantic and FTS are deduplicated with best score."""
         mock_gen.return_value = [0.1] * 384
@@ -125,7 +157,7 @@ class TestSemanticSearch:
         assert result.results[0].score > 0.5
 
     @pytest.mark.asyncio
-    @patch("app.services.search_service.generate_embedding")
+    @patch("app.services.search_service.get_query_embedding")
     async def test_empty_results(self, mock_gen):
         """No results from either search returns empty list."""
         mock_gen.return_value = [0.1] * 384
@@ -142,7 +174,7 @@ class TestSemanticSearch:
         assert result.results == []
 
     @pytest.mark.asyncio
-    @patch("app.services.search_service.generate_embedding")
+    @patch("app.services.search_service.get_query_embedding")
     async def test_pagination_offset(self, mock_gen):
         """Offset parameter skips results."""
         mock_gen.side_effect = NotImplementedError("not configured")
@@ -198,3 +230,77 @@ class TestSearchResultSchema:
             text_score=0.0,
         )
         assert schema.description is None
+
+
+class TestQueryEmbeddingCache:
+    @pytest.fixture(autouse=True)
+    def mock_gen(self):
+        clear_query_embedding_cache()
+        with patch("app.services.query_embedding_cache.generate_embedding") as mock_gen:
+            mock_gen.side_effect = lambda text, is_query: [float(len(text))] * 384
+            yield mock_gen
+        clear_query_embedding_cache()
+
+    def test_normalize_query(self):
+        assert normalize_query("  Élève   PYTHON\t") == "eleve python"
+        assert normalize_query("Straße") == "strasse"
+
+    @pytest.mark.asyncio
+    async def test_variants_share_one_encoding(self, mock_gen):
+        first = await get_query_embedding("Développement web")
+        assert await get_query_embedding("  developpement   WEB ") == first
+        mock_gen.assert_called_once_with("Développement web", is_query=True)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self, mock_gen):
+        vectors = await asyncio.gather(*(get_query_embedding("python") for _ in range(5)))
+        assert all(v == vectors[0] for v in vectors)
+        assert mock_gen.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_lru_eviction(self, mock_gen, monkeypatch):
+        monkeypatch.setattr(query_embedding_cache, "QUERY_EMBEDDING_CACHE_MAX_ENTRIES", 2)
+        for query in ["a", "b", "a", "c"]:  # "b" est le moins récemment utilisé
+            await get_query_embedding(query)
+        await get_query_embedding("a")
+        assert mock_gen.call_count == 3
+        await get_query_embedding("b")
+        assert mock_gen.call_count == 4
+
+        monkeypatch.setattr(query_embedding_cache, "QUERY_EMBEDDING_CACHE_TTL", 0.01)
+        await get_query_embedding("d")
+        await asyncio.sleep(0.02)
+        await get_query_embedding("d")
+        assert mock_gen.call_count == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_encoding_is_not_cached(self, mock_gen):
+        mock_gen.side_effect = RuntimeError("model down")
+        with pytest.raises(RuntimeError):
+            await get_query_embedding("python")
+        mock_gen.side_effect = None
+        mock_gen.return_value = [0.5] * 384
+        assert await get_query_embedding("python") == [0.5] * 384
+
+    @pytest.mark.asyncio
+    async def test_stats_flush_and_warm_up(self, mock_gen, db_session):
+        for query in ["Python", "python ", "Rust", "PYTHON", "Go"]:
+            await get_query_embedding(query)
+        assert await flush_query_stats(db_session) == 3
+        await get_query_embedding("python")
+        assert await flush_query_stats(db_session) == 1
+        stats = await db_session.execute(
+            select(SearchQueryStat.query_key, SearchQueryStat.query, SearchQueryStat.hits).order_by(
+                SearchQueryStat.hits.desc(), SearchQueryStat.query_key
+            )
+        )
+        assert stats.all() == [("python", "python", 4), ("go", "Go", 1), ("rust", "Rust", 1)]
+
+        # Après redémarrage : cache vide, préchauffé avec les requêtes les plus fréquentes
+        clear_query_embedding_cache()
+        mock_gen.reset_mock()
+        assert await warm_query_embedding_cache(db_session, limit=2) == 2
+        assert mock_gen.call_count == 2
+        await get_query_embedding("Python")
+        await get_query_embedding("go")
+        assert mock_gen.call_count == 2
@@ -1,13 +1,25 @@
+import json
+
 import pytest
 import pytest_asyncio
-from sqlalchemy import select
+from prometheus_client import REGISTRY
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import selectinload
 
+from app.constants import TRENDING_PERIODS
 from app.models.skill import Skill
+from app.models.skill_closure import SkillClosure
 from app.models.skill_tree import SkillTree
 from app.models.tag import SkillTreeTag, Tag
 from app.models.user import User
+from app.models.user_check_skill import UserCheckSkill
 from app.schemas.skill import SkillSaveSchema
 from app.schemas.skill_tree import SkillTreeSaveSchema
+from app.services import graph_cache, import_service
+from app.services.closure_service import get_ancestors, get_descendants, has_cycle, refresh_closure
+from app.services.import_service import import_skill_trees_ndjson, iter_ndjson_lines
+from app.services.learning_path_service import plan_learning_path
+from app.services.search_vector_service import rebuild_search_vectors
 from app.services.skill_tree_service import (
     TrendingPeriod,
     _sync_tags,
@@ -15,6 +27,8 @@ from app.services.skill_tree_service import (
     is_root_skill_valid,
     save_skill_tree,
 )
+from app.services.trending_service import refresh_trending_scores
+from tests.conftest import engine_test
 
 
 def skill(id: int, name: str, is_root: bool, unlock_ids: list[int] | None = None) -> SkillSaveSchema:
@@ -119,6 +133,40 @@ async def test_sync_tags_reuses_existing_tag(db_session, tree):
     assert len(tags) == 1  # pas de doublon
 
 
+@pytest.mark.asyncio
+async def test_sync_tags_writes_only_the_diff_and_maintains_usage_count(db_session, tree):
+    await _sync_tags(db_session, tree.id, ["python", "fastapi"])
+    await db_session.commit()
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _record)
+    try:
+        await _sync_tags(db_session, tree.id, ["python", "fastapi"])
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", _record)
+    # Tags inchangés : aucune écriture sur skill_tree_tags
+    assert not [s for s in statements if "skill_tree_tags" in s and not s.lstrip().startswith("SELECT")]
+
+    await _sync_tags(db_session, tree.id, ["python", "docker"])
+    await db_session.commit()
+    counts = await db_session.execute(select(Tag.name, Tag.usage_count).order_by(Tag.name))
+    assert counts.all() == [("docker", 1), ("fastapi", 0), ("python", 1)]
+    # Copie dénormalisée des ids, triée, pour le filtrage par index GIN
+    tag_ids = (await db_session.execute(select(Tag.id).where(Tag.name.in_(["docker", "python"])))).scalars()
+    stored = await db_session.execute(select(SkillTree.tag_ids).where(SkillTree.id == tree.id))
+    assert stored.scalar_one() == sorted(tag_ids)
+
+    # La suppression en cascade de l'arbre décrémente aussi les compteurs
+    await db_session.delete(tree)
+    await db_session.commit()
+    counts = await db_session.execute(select(func.sum(Tag.usage_count)))
+    assert counts.scalar() == 0
+
+
 # ========== save_skill_tree ==========
 
 
@@ -208,6 +256,342 @@ async def test_save_skill_tree_invalid_root(db_session, tree):
     assert exc_info.value.status_code == 400
 
 
+def chain_schema(tree: SkillTree, skills: list[SkillSaveSchema]) -> SkillTreeSaveSchema:
+    """Helper : payload de save pour un arbre existant."""
+    return SkillTreeSaveSchema(
+        id=tree.id,
+        name=tree.name,
+        description=tree.description,
+        creator_username=tree.creator_username,
+        skills=skills,
+        tags=[],
+    )
+
+
+async def count_statements(coro) -> int:
+    """Compte les allers-retours SQL exécutés pendant l'attente de `coro`."""
+    statements = 0
+
+    def _count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _count)
+    try:
+        await coro
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", _count)
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_save_skill_tree_updates_only_diff(db_session, tree):
+    """Renommage, suppression, ajout et re-câblage appliqués en un seul save."""
+    await save_skill_tree(
+        db_session,
+        chain_schema(tree, [skill(-1, "Root", True, [-2, -3]), skill(-2, "A", False), skill(-3, "B", False)]),
+    )
+    stmt = select(Skill).where(Skill.skill_tree_id == tree.id)
+    ids = {s.name: s.id for s in (await db_session.execute(stmt)).scalars().all()}
+
+    await save_skill_tree(
+        db_session,
+        chain_schema(
+            tree,
+            [
+                skill(ids["Root"], "Root", True, [ids["A"]]),
+                skill(ids["A"], "A renamed", False, [-1]),
+                skill(-1, "C", False),
+            ],
+        ),
+    )
+
+    db_session.expire_all()
+    skills_after = (await db_session.execute(stmt.options(selectinload(Skill.unlocks)))).scalars().all()
+    by_name = {s.name: s for s in skills_after}
+    assert set(by_name) == {"Root", "A renamed", "C"}
+    assert by_name["A renamed"].id == ids["A"]
+    assert [u.name for u in by_name["Root"].unlocks] == ["A renamed"]
+    assert [u.name for u in by_name["A renamed"].unlocks] == ["C"]
+
+
+@pytest.mark.asyncio
+async def test_save_skill_tree_rejects_foreign_skill_id(db_session, tree):
+    """Un id positif qui n'appartient pas à l'arbre est refusé."""
+    from fastapi import HTTPException
+
+    with pytest.raises(HTTPException) as exc_info:
+        await save_skill_tree(db_session, chain_schema(tree, [skill(424242, "Root", True)]))
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_save_skill_tree_round_trips_independent_of_size(db_session, tree):
+    """Le nombre de requêtes SQL d'un save est constant quelle que soit la taille de l'arbre."""
+    counts = {}
+    for size in (10, 300):
+        t = SkillTree(name=f"Tree {size}", description=None, creator_username="testuser")
+        db_session.add(t)
+        await db_session.commit()
+
+        created = [skill(-(i + 1), f"S{i}", i == 0, [-(i + 2)] if i < size - 1 else []) for i in range(size)]
+        create_count = await count_statements(save_skill_tree(db_session, chain_schema(t, created)))
+
+        stmt = select(Skill.id, Skill.name).where(Skill.skill_tree_id == t.id)
+        ids = {row.name: row.id for row in (await db_session.execute(stmt)).all()}
+        # Garde la première moitié (renommée), supprime le reste, ajoute autant de nouveaux skills
+        half = size // 2
+        edited = [
+            skill(ids[f"S{i}"], f"S{i} v2", i == 0, [ids[f"S{i + 1}"]] if i < half - 1 else [-1]) for i in range(half)
+        ] + [skill(-(i + 1), f"N{i}", False, [-(i + 2)] if i < half - 1 else []) for i in range(half)]
+        edit_count = await count_statements(save_skill_tree(db_session, chain_schema(t, edited)))
+
+        counts[size] = (create_count, edit_count)
+
+    assert counts[10] == counts[300]
+
+
+# ========== fermeture transitive ==========
+
+
+@pytest.mark.parametrize(
+    "edges, expected",
+    [
+        pytest.param([], False, id="empty"),
+        pytest.param([(1, 2), (2, 3), (1, 3)], False, id="diamond_dag"),
+        pytest.param([(1, 2), (2, 3), (3, 1)], True, id="three_cycle"),
+        pytest.param([(1, 2), (2, 1), (3, 4)], True, id="cycle_in_one_component"),
+    ],
+)
+def test_has_cycle(edges, expected):
+    assert has_cycle(edges) == expected
+
+
+@pytest.mark.asyncio
+async def test_save_skill_tree_rejects_cycle(db_session, tree):
+    from fastapi import HTTPException
+
+    schema = chain_schema(
+        tree,
+        [skill(-1, "Root", True, [-2]), skill(-2, "A", False, [-3]), skill(-3, "B", False, [-2])],
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        await save_skill_tree(db_session, schema)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_save_skill_tree_maintains_closure(db_session, tree):
+    await save_skill_tree(
+        db_session,
+        chain_schema(tree, [skill(-1, "Root", True, [-2, -3]), skill(-2, "A", False, [-3]), skill(-3, "B", False)]),
+    )
+    ids = {row.name: row.id for row in (await db_session.execute(select(Skill.id, Skill.name))).all()}
+
+    ancestors = await get_ancestors(db_session, tree.id, ids["B"])
+    assert [(a.name, a.depth) for a in ancestors] == [("A", 1), ("Root", 1)]
+    descendants = await get_descendants(db_session, tree.id, ids["Root"])
+    assert {d.name for d in descendants} == {"A", "B"}
+
+    # Retirer l'arête A -> B : B ne descend plus de A
+    await save_skill_tree(
+        db_session,
+        chain_schema(
+            tree,
+            [
+                skill(ids["Root"], "Root", True, [ids["A"], ids["B"]]),
+                skill(ids["A"], "A", False),
+                skill(ids["B"], "B", False),
+            ],
+        ),
+    )
+    ancestors = await get_ancestors(db_session, tree.id, ids["B"])
+    assert [a.name for a in ancestors] == ["Root"]
+
+
+@pytest.mark.asyncio
+async def test_save_skill_tree_adding_edges_updates_closure_incrementally(db_session, tree):
+    await save_skill_tree(
+        db_session,
+        chain_schema(
+            tree,
+            [skill(-1, "Root", True, [-2]), skill(-2, "A", False), skill(-3, "B", False, [-4]), skill(-4, "C", False)],
+        ),
+    )
+    ids = {row.name: row.id for row in (await db_session.execute(select(Skill.id, Skill.name))).all()}
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    # Ajout seul de A -> B : la fermeture est complétée sans reconstruction
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _record)
+    try:
+        await save_skill_tree(
+            db_session,
+            chain_schema(
+                tree,
+                [
+                    skill(ids["Root"], "Root", True, [ids["A"]]),
+                    skill(ids["A"], "A", False, [ids["B"]]),
+                    skill(ids["B"], "B", False, [ids["C"]]),
+                    skill(ids["C"], "C", False),
+                ],
+            ),
+        )
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", _record)
+
+    assert not any("DELETE FROM skill_closure" in statement for statement in statements)
+    ancestors = await get_ancestors(db_session, tree.id, ids["C"])
+    assert [(a.name, a.depth) for a in ancestors] == [("B", 1), ("A", 2), ("Root", 3)]
+
+
+@pytest.mark.asyncio
+async def test_incremental_closure_matches_rebuild(db_session, tree):
+    """Des lots d'arêtes ajoutés successivement donnent la même fermeture que la reconstruction."""
+    # S0 -> ... -> S7 en chaîne, puis des raccourcis et des arêtes enchaînées dans un même lot
+    batches = [
+        {(0, 1), (1, 2), (2, 3), (3, 4), (0, 5), (5, 6)},
+        {(4, 5), (6, 7), (1, 6)},
+        {(0, 3), (2, 7), (3, 6), (7, 8), (8, 9)},
+    ]
+
+    async def closure() -> set[tuple[int, int, int]]:
+        stmt = select(SkillClosure.ancestor_id, SkillClosure.descendant_id, SkillClosure.depth)
+        return set((await db_session.execute(stmt)).tuples())
+
+    ids: dict[int, int] = {}
+    edges: set[tuple[int, int]] = set()
+    for batch in batches:
+        edges |= batch
+        skills = [
+            skill(ids.get(i, -(i + 1)), f"S{i}", i == 0, [ids.get(j, -(j + 1)) for a, j in sorted(edges) if a == i])
+            for i in range(10)
+        ]
+        await save_skill_tree(db_session, chain_schema(tree, skills))
+        ids = {int(row.name[1:]): row.id for row in (await db_session.execute(select(Skill.id, Skill.name))).all()}
+
+        incremental = await closure()
+        await refresh_closure(db_session, [tree.id])
+        assert incremental == await closure()
+
+
+# ========== graph_cache ==========
+
+
+@pytest.mark.asyncio
+async def test_tree_graph_csr_matches_saved_edges(db_session, tree):
+    await save_skill_tree(
+        db_session,
+        chain_schema(tree, [skill(-1, "Root", True, [-2, -3]), skill(-2, "A", False, [-3]), skill(-3, "B", False)]),
+    )
+    ids = {row.name: row.id for row in (await db_session.execute(select(Skill.id, Skill.name))).all()}
+
+    graph = await graph_cache.get_tree_graph(db_session, tree.id)
+    root, a, b = graph.index(ids["Root"]), graph.index(ids["A"]), graph.index(ids["B"])
+    assert sorted(graph.skill_ids[i] for i in graph.unlocks(root)) == sorted([ids["A"], ids["B"]])
+    assert sorted(graph.skill_ids[i] for i in graph.parents(b)) == sorted([ids["Root"], ids["A"]])
+    assert list(graph.parents(root)) == []
+    assert graph.names[a] == "A"
+    assert graph.index(-42) == -1
+
+    detail = graph.to_detail_schema()
+    assert {s.name: sorted(s.unlock_ids) for s in detail.skills}["Root"] == sorted([ids["A"], ids["B"]])
+    assert await graph_cache.get_tree_graph(db_session, tree.id) is graph
+
+
+@pytest.mark.asyncio
+async def test_tree_graph_cache_evicts_least_recently_used(db_session, tree, monkeypatch):
+    other = SkillTree(name="Other", creator_username="testuser")
+    db_session.add(other)
+    await db_session.commit()
+
+    first = await graph_cache.get_tree_graph(db_session, tree.id)
+    monkeypatch.setattr(graph_cache, "GRAPH_CACHE_MAX_BYTES", first.nbytes + 1)
+    await graph_cache.get_tree_graph(db_session, other.id)
+
+    assert tree.id not in graph_cache._graphs
+    assert other.id in graph_cache._graphs
+
+
+@pytest.mark.asyncio
+async def test_tree_graph_too_large_for_the_cache_updates_size_gauge(db_session, tree, monkeypatch):
+    first = await graph_cache.get_tree_graph(db_session, tree.id)
+    monkeypatch.setattr(graph_cache, "GRAPH_CACHE_MAX_BYTES", first.nbytes)
+    await save_skill_tree(db_session, chain_schema(tree, [skill(-1, "Root", True, [-2]), skill(-2, "A", False)]))
+
+    graph = await graph_cache.get_tree_graph(db_session, tree.id)
+
+    assert graph.nbytes > first.nbytes
+    assert tree.id not in graph_cache._graphs
+    assert REGISTRY.get_sample_value("cache_size_bytes", {"cache": graph_cache._CACHE_NAME}) == 0
+
+
+# ========== plan_learning_path ==========
+
+
+@pytest.mark.asyncio
+async def test_plan_learning_path_skips_checked_and_follows_links(db_session, tree):
+    user_id = (await db_session.execute(select(User.id))).scalar_one()
+    linked = SkillTree(name="Linked", creator_username="testuser")
+    db_session.add(linked)
+    await db_session.commit()
+    await save_skill_tree(
+        db_session,
+        chain_schema(linked, [skill(-1, "L-Root", True, [-2]), skill(-2, "L-Leaf", False)]),
+    )
+    linked_ids = {row.name: row.id for row in (await db_session.execute(select(Skill.id, Skill.name))).all()}
+
+    link = SkillSaveSchema(id=-3, name="Link", is_root=False, linked_tree_id=linked.id, unlock_ids=[-4])
+    await save_skill_tree(
+        db_session,
+        chain_schema(
+            tree,
+            [skill(-1, "Root", True, [-2, -3]), skill(-2, "A", False, [-4]), link, skill(-4, "Target", False)],
+        ),
+    )
+    ids = {row.name: row.id for row in (await db_session.execute(select(Skill.id, Skill.name))).all()}
+
+    path = await plan_learning_path(db_session, user_id, tree.id, ids["Target"])
+    names = [step.name for step in path.steps]
+    assert set(names) == {"Root", "A", "Link", "L-Root", "L-Leaf"}
+    assert names.index("Root") < names.index("A")
+    assert names.index("L-Root") < names.index("L-Leaf") < names.index("Link")
+
+    db_session.add_all(
+        [
+            UserCheckSkill(user_id=user_id, skill_id=ids["Root"]),
+            UserCheckSkill(user_id=user_id, skill_id=linked_ids["L-Root"]),
+        ]
+    )
+    await db_session.commit()
+    path = await plan_learning_path(db_session, user_id, tree.id, ids["Target"])
+    assert {step.name for step in path.steps} == {"A", "Link", "L-Leaf"}
+
+
+@pytest.mark.asyncio
+async def test_plan_learning_path_sees_new_version(db_session, tree):
+    user_id = (await db_session.execute(select(User.id))).scalar_one()
+    await save_skill_tree(db_session, chain_schema(tree, [skill(-1, "Root", True, [-2]), skill(-2, "Target", False)]))
+    ids = {row.name: row.id for row in (await db_session.execute(select(Skill.id, Skill.name))).all()}
+    assert [s.name for s in (await plan_learning_path(db_session, user_id, tree.id, ids["Target"])).steps] == ["Root"]
+
+    await save_skill_tree(
+        db_session,
+        chain_schema(
+            tree,
+            [
+                skill(ids["Root"], "Root", True, [-3]),
+                skill(-3, "Mid", False, [ids["Target"]]),
+                skill(ids["Target"], "Target", False),
+            ],
+        ),
+    )
+    path = await plan_learning_path(db_session, user_id, tree.id, ids["Target"])
+    assert [s.name for s in path.steps] == ["Root", "Mid"]
+
+
 # ========== get_trendings ==========
 
 
@@ -224,3 +608,141 @@ async def test_get_trendings_default_period_is_week(db_session):
     """Le défaut doit être TrendingPeriod.WEEK."""
     result = await get_trendings(db_session)
     assert isinstance(result, list)
+
+
+def test_trending_periods_match_enum():
+    """Chaque période exposée par l'API a une fenêtre de calcul, et inversement."""
+    assert set(TRENDING_PERIODS) == {period.value for period in TrendingPeriod}
+
+
+@pytest.mark.asyncio
+async def test_get_trendings_reads_refreshed_scores(db_session, tree):
+    """Les scores viennent du dernier recalcul ; le score amorti favorise l'activité récente."""
+    from datetime import datetime, timedelta
+
+    from app.models.user_favorite_trees import UserFavoriteTrees
+
+    old_tree = SkillTree(name="Old Tree", creator_username="testuser")
+    db_session.add(old_tree)
+    users = [User(username=f"fan{i}", email=f"fan{i}@example.com", password_hash="x") for i in range(3)]
+    db_session.add_all(users)
+    await db_session.flush()
+
+    now = datetime.now()
+    # Old Tree : 3 favoris il y a 5 jours ; Test Tree : 2 favoris maintenant
+    db_session.add_all(
+        [UserFavoriteTrees(user_id=u.id, skill_tree_id=old_tree.id, created_at=now - timedelta(days=5)) for u in users]
+        + [UserFavoriteTrees(user_id=u.id, skill_tree_id=tree.id, created_at=now) for u in users[:2]]
+    )
+    await db_session.commit()
+
+    assert await get_trendings(db_session, TrendingPeriod.WEEK) == []
+    assert await refresh_trending_scores(db_session) is True
+
+    week = await get_trendings(db_session, TrendingPeriod.WEEK)
+    assert [t.name for t in week] == ["Old Tree", "Test Tree"]
+    decayed = await get_trendings(db_session, TrendingPeriod.WEEK, decay=True)
+    assert [t.name for t in decayed] == ["Test Tree", "Old Tree"]
+    assert [t.name for t in await get_trendings(db_session, TrendingPeriod.DAY)] == ["Test Tree"]
+    assert len(await get_trendings(db_session, TrendingPeriod.WEEK, limit=1)) == 1
+
+
+# ========== search_vector ==========
+
+
+async def _fts_matches(db_session, query: str) -> list[int]:
+    stmt = select(SkillTree.id).where(SkillTree.search_vector.op("@@")(func.plainto_tsquery("french", query)))
+    return list((await db_session.execute(stmt)).scalars())
+
+
+@pytest.mark.asyncio
+async def test_search_vector_rebuilt_once_after_debounce(db_session, tree):
+    # Arbre marqué à la création, mais encore dans la fenêtre de debounce
+    assert await rebuild_search_vectors(db_session, debounce=3600) == 0
+    assert await rebuild_search_vectors(db_session, debounce=0) == 1
+    assert await _fts_matches(db_session, "Test Tree") == [tree.id]
+    assert await rebuild_search_vectors(db_session, debounce=0) == 0
+
+    # Plusieurs sauvegardes rapprochées : une seule reconstruction, avec les skills
+    for names in (["Python"], ["Python", "Django"], ["Python", "Flask"]):
+        schema = SkillTreeSaveSchema(
+            id=tree.id,
+            name=tree.name,
+            description=tree.description,
+            creator_username=tree.creator_username,
+            skills=[skill(-1, names[0], True, [-2] if len(names) > 1 else [])]
+            + [skill(-2, name, False) for name in names[1:]],
+            tags=[],
+        )
+        assert await save_skill_tree(db_session, schema) is True
+    assert await _fts_matches(db_session, "flask") == []
+    assert await rebuild_search_vectors(db_session, debounce=0) == 1
+    assert await _fts_matches(db_session, "flask") == [tree.id]
+    assert await _fts_matches(db_session, "django") == []
+
+
+# ========== import_skill_trees_ndjson ==========
+
+
+async def _lines(*trees: dict):
+    for t in trees:
+        yield json.dumps(t).encode()
+
+
+@pytest.mark.asyncio
+async def test_import_loads_batches_and_builds_search_vector(db_session, tree, monkeypatch):
+    monkeypatch.setattr(import_service, "IMPORT_BATCH_SIZE", 2)
+    trees = [
+        {
+            "name": f"Imported {i}",
+            "skills": [
+                {"id": -1, "name": "Grammaire", "is_root": True, "linked_tree_id": tree.id, "unlock_ids": [-2]},
+                {"id": -2, "name": "Conjugaison", "is_root": False, "linked_tree_id": 999_999},
+            ],
+        }
+        for i in range(5)
+    ]
+
+    result = await import_skill_trees_ndjson(db_session, _lines(*trees), "testuser")
+
+    assert len(result.tree_ids) == 5
+    assert (result.skills, result.dependencies) == (10, 5)
+    assert result.rows == 20
+    linked = await db_session.execute(
+        select(Skill.name, Skill.linked_tree_id).where(Skill.skill_tree_id == result.tree_ids[-1]).order_by(Skill.name)
+    )
+    # Un linked_tree_id inconnu de la base est remis à NULL
+    assert linked.all() == [("Conjugaison", None), ("Grammaire", tree.id)]
+    # Arbres importés marqués, indexés par le job de search_vector
+    assert await rebuild_search_vectors(db_session, debounce=0) == 6
+    matches = await db_session.execute(
+        select(SkillTree.id).where(SkillTree.search_vector.op("@@")(func.to_tsquery("french", "conjugaison")))
+    )
+    assert sorted(matches.scalars().all()) == sorted(result.tree_ids)
+
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_lines_rejects_lines_over_the_limit(monkeypatch):
+    monkeypatch.setattr(import_service, "IMPORT_MAX_LINE_BYTES", 8)
+    chunks = _chunks(b"ab", b"cd\nxxxxx", b"xxxxx", b"xxxxx\nefgh", b"ijkl\n\n1234567", b"89")
+
+    lines = [line async for line in iter_ndjson_lines(chunks)]
+
+    # Lignes recollées d'un chunk à l'autre, lignes trop longues remplacées par None
+    assert lines == [b"abcd", None, b"efghijkl", b"", None]
+
+
+@pytest.mark.asyncio
+async def test_import_reports_lines_over_the_limit(db_session, tree, monkeypatch):
+    monkeypatch.setattr(import_service, "IMPORT_MAX_LINE_BYTES", 30)
+    body = b"\n".join(json.dumps({"name": name}).encode() for name in ("Short", "A much longer tree name", "Short 2"))
+
+    result = await import_skill_trees_ndjson(db_session, iter_ndjson_lines(_chunks(body)), "testuser")
+
+    assert len(result.tree_ids) == 2
+    assert [(e.line, e.detail) for e in result.errors] == [(2, "Ligne trop longue")]
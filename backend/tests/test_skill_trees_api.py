@@ -1,5 +1,9 @@
+import json
+from datetime import datetime, timedelta
+
 import pytest
 
+from app.services import response_cache
 from tests.conftest import auth_cookies, create_skill_tree, register_user
 
 # ========== GET ALL SKILL TREES ==========
@@ -12,6 +16,47 @@ async def test_get_skill_trees_empty(client):
     assert response.json() == []
 
 
+@pytest.mark.asyncio
+async def test_get_skill_trees_keyset_pagination(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    for name in ["Delta", "Alpha", "Charlie", "Bravo", "Echo"]:
+        await create_skill_tree(client, cookies, name=name)
+
+    names, cursor = [], None
+    while True:
+        params = {"sort": "name", "limit": 2} | ({"cursor": cursor} if cursor else {})
+        response = await client.get("/api/v1/skill-trees/", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        names += [t["name"] for t in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert names == ["Alpha", "Bravo", "Charlie", "Delta", "Echo"]
+
+    recent = await client.get("/api/v1/skill-trees/", params={"limit": 3})
+    assert [t["name"] for t in recent.json()] == ["Echo", "Bravo", "Charlie"]
+    following = await client.get("/api/v1/skill-trees/", params={"limit": 3, "cursor": recent.headers["x-next-cursor"]})
+    assert [t["name"] for t in following.json()] == ["Alpha", "Delta"]
+    assert "x-next-cursor" not in following.headers
+
+
+@pytest.mark.asyncio
+async def test_get_skill_trees_fields_projection_and_errors(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    await create_skill_tree(client, cookies, name="Tree 1")
+
+    response = await client.get("/api/v1/skill-trees/", params={"fields": "name,tags"})
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "name", "tags"}
+
+    assert (await client.get("/api/v1/skill-trees/", params={"fields": "name,password"})).status_code == 400
+    assert (await client.get("/api/v1/skill-trees/", params={"cursor": "not-a-cursor"})).status_code == 400
+    assert (await client.get("/api/v1/skill-trees/", params={"limit": 1000})).status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_get_skill_trees_with_data(client):
     await register_user(client)
@@ -31,6 +76,63 @@ async def test_get_skill_trees_with_data(client):
 # ========== CREATE SKILL TREE ==========
 
 
+async def create_tagged_trees(client, cookies) -> None:
+    for name, tags in [("A", ["python", "web"]), ("B", ["python", "pytest"]), ("C", ["rust", "web"])]:
+        response = await client.post("/api/v1/skill-trees/", json={"name": name, "tags": tags}, cookies=cookies)
+        assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_get_skill_trees_multi_tag_filter(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    await create_tagged_trees(client, cookies)
+
+    async def names(params: dict) -> list[str]:
+        response = await client.get("/api/v1/skill-trees/", params=params | {"sort": "name"})
+        assert response.status_code == 200
+        return [t["name"] for t in response.json()]
+
+    assert await names({"tag": "python"}) == ["A", "B"]
+    assert await names({"tags": ["python", "web"]}) == ["A"]
+    assert await names({"tags": ["pytest", "rust"], "match": "any"}) == ["B", "C"]
+    assert await names({"tags": ["python", "unknown"]}) == []
+    assert await names({"tags": ["PYTHON", "unknown"], "match": "any"}) == ["A", "B"]
+
+    too_many = {"tags": [f"tag{i}" for i in range(11)]}
+    assert (await client.get("/api/v1/skill-trees/", params=too_many)).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_browse_skill_trees_returns_facets_of_the_filter(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    await create_tagged_trees(client, cookies)
+
+    response = await client.get("/api/v1/skill-trees/browse", params={"tags": "web", "limit": 1, "fields": "name"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["items"] == [{"id": body["items"][0]["id"], "name": "C"}]
+    assert "x-next-cursor" in response.headers
+    # Facettes calculées sur tout le filtre, pas seulement sur la page
+    assert body["facets"] == [
+        {"name": "web", "count": 2},
+        {"name": "python", "count": 1},
+        {"name": "rust", "count": 1},
+    ]
+
+    response = await client.get("/api/v1/skill-trees/browse", params={"facets_limit": 1})
+    assert len(response.json()["items"]) == 3
+    assert response.json()["facets"] == [{"name": "python", "count": 2}]
+
+    etag = response.headers["etag"]
+    cached = await client.get("/api/v1/skill-trees/browse", params={"tags": "web"}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    response = await client.get("/api/v1/skill-trees/browse", params={"tags": "unknown"})
+    assert response.json() == {"items": [], "facets": []}
+
+
 @pytest.mark.asyncio
 async def test_create_skill_tree_success(client):
     await register_user(client)
@@ -115,6 +217,131 @@ async def test_get_skill_tree_not_found(client):
     assert response.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_get_skill_tree_detail_cached_until_write(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+
+    first = await client.get(f"/api/v1/skill-trees/{tree['id']}")
+    assert response_cache.get_cached_detail(tree["id"], first.json()["version"]) == first.content
+    second = await client.get(f"/api/v1/skill-trees/{tree['id']}")
+    assert second.content == first.content
+
+    await client.patch(f"/api/v1/skill-trees/{tree['id']}", json={"name": "Renamed"}, cookies=cookies)
+    response = await client.get(f"/api/v1/skill-trees/{tree['id']}")
+    assert response.json()["name"] == "Renamed"
+    assert response.json()["version"] == first.json()["version"] + 1
+
+    await client.delete(f"/api/v1/skill-trees/{tree['id']}", cookies=cookies)
+    assert (await client.get(f"/api/v1/skill-trees/{tree['id']}")).status_code == 404
+
+
+def test_response_cache_evicts_over_budget(monkeypatch):
+    response_cache.clear_response_cache()
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_MAX_BYTES", 10)
+    response_cache.store_detail(1, 1, b"123456")
+    response_cache.store_detail(2, 1, b"123456")
+
+    assert response_cache.get_cached_detail(1, 1) is None
+    assert response_cache.get_cached_detail(2, 1) == b"123456"
+    assert response_cache.get_cached_detail(2, 2) is None
+    response_cache.clear_response_cache()
+
+
+@pytest.mark.asyncio
+async def test_get_skill_tree_detail_conditional_get(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+
+    first = await client.get(f"/api/v1/skill-trees/{tree['id']}")
+    etag = first.headers["etag"]
+    cached = await client.get(f"/api/v1/skill-trees/{tree['id']}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    await client.patch(f"/api/v1/skill-trees/{tree['id']}", json={"name": "Renamed"}, cookies=cookies)
+    fresh = await client.get(f"/api/v1/skill-trees/{tree['id']}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_listings_conditional_get(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies, name="Tree 1")
+
+    listing = await client.get("/api/v1/skill-trees/")
+    etag = listing.headers["etag"]
+    assert (await client.get("/api/v1/skill-trees/", headers={"If-None-Match": etag})).status_code == 304
+
+    favorites = await client.get("/api/v1/skill-trees/my-favorite-skill-trees", cookies=cookies)
+    favorites_etag = favorites.headers["etag"]
+    await client.post(f"/api/v1/skill-trees/favorite/{tree['id']}", cookies=cookies)
+    response = await client.get(
+        "/api/v1/skill-trees/my-favorite-skill-trees", headers={"If-None-Match": favorites_etag}, cookies=cookies
+    )
+    assert response.status_code == 200
+    assert [t["name"] for t in response.json()] == ["Tree 1"]
+    # Ajouter un favori ne change pas le catalogue
+    assert (await client.get("/api/v1/skill-trees/", headers={"If-None-Match": etag})).status_code == 304
+
+    await create_skill_tree(client, cookies, name="Tree 2")
+    response = await client.get("/api/v1/skill-trees/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_graph_only_writes_keep_listing_etag(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies, name="Tree 1")
+    etag = (await client.get("/api/v1/skill-trees/")).headers["etag"]
+
+    response = await client.put(
+        f"/api/v1/skill-trees/save/{tree['id']}",
+        json={
+            "id": tree["id"],
+            "name": "Tree 1",
+            "description": "A test skill tree",
+            "creator_username": "testuser",
+            "skills": [{"id": -1, "name": "Root", "is_root": True, "unlock_ids": []}],
+        },
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+    version = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()["version"]
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={"version": version, "ops": [{"op": "add_skill", "temp_id": -1, "name": "Child"}]},
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+    await client.patch(f"/api/v1/skill-trees/{tree['id']}", json={"name": "Tree 1"}, cookies=cookies)
+    # Le graphe ne fait pas partie des listings
+    assert (await client.get("/api/v1/skill-trees/", headers={"If-None-Match": etag})).status_code == 304
+
+    version = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()["version"]
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={"version": version, "ops": [{"op": "set_tags", "tags": ["python"]}]},
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+    response = await client.get("/api/v1/skill-trees/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["tags"] == ["python"]
+    etag = response.headers["etag"]
+
+    await client.patch(f"/api/v1/skill-trees/{tree['id']}", json={"name": "Renamed"}, cookies=cookies)
+    response = await client.get("/api/v1/skill-trees/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Renamed"
+
+
 # ========== DELETE SKILL TREE ==========
 
 
@@ -445,6 +672,271 @@ async def test_save_does_not_copy_linked_tree(client):
     assert len(all_trees.json()) == 2
 
 
+async def link_trees(client, cookies, tree: dict, linked_ids: list[int]) -> None:
+    """Helper : sauvegarde tree avec un root et un skill lié par arbre de linked_ids."""
+    skills = [{"id": -1, "name": "Root", "is_root": True, "unlock_ids": []}]
+    skills += [
+        {"id": -2 - i, "name": f"Link {i}", "is_root": False, "linked_tree_id": linked_id}
+        for i, linked_id in enumerate(linked_ids)
+    ]
+    response = await client.put(
+        f"/api/v1/skill-trees/save/{tree['id']}",
+        json={"id": tree["id"], "name": tree["name"], "creator_username": "testuser", "skills": skills},
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_get_skill_tree_expand_links(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    a = await create_skill_tree(client, cookies, name="A")
+    b = await create_skill_tree(client, cookies, name="B")
+    c = await create_skill_tree(client, cookies, name="C")
+    await link_trees(client, cookies, a, [b["id"]])
+    # B renvoie vers A : le cycle ne doit ni boucler ni dupliquer A
+    await link_trees(client, cookies, b, [a["id"], c["id"]])
+
+    response = await client.get(f"/api/v1/skill-trees/{a['id']}", params={"expand_links": 1})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == a["id"]
+    assert [(t["id"], t["depth"]) for t in data["linked_trees"]] == [(b["id"], 1)]
+
+    response = await client.get(f"/api/v1/skill-trees/{a['id']}", params={"expand_links": 3})
+    data = response.json()
+    assert [(t["id"], t["depth"]) for t in data["linked_trees"]] == [(b["id"], 1), (c["id"], 2)]
+    assert {s["name"] for s in data["linked_trees"][0]["skills"]} == {"Root", "Link 0", "Link 1"}
+
+    # L'ETag suit les versions des arbres liés
+    etag = response.headers["etag"]
+    headers = {"If-None-Match": etag}
+    response = await client.get(f"/api/v1/skill-trees/{a['id']}", params={"expand_links": 3}, headers=headers)
+    assert response.status_code == 304
+    await link_trees(client, cookies, c, [])
+    response = await client.get(f"/api/v1/skill-trees/{a['id']}", params={"expand_links": 3}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["linked_trees"][1]["skills"][0]["name"] == "Root"
+
+
+@pytest.mark.asyncio
+async def test_get_skill_tree_expand_links_not_found(client):
+    response = await client.get("/api/v1/skill-trees/999", params={"expand_links": 1})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_skill_tree_expand_links_depth_bounds(client):
+    response = await client.get("/api/v1/skill-trees/1", params={"expand_links": 0})
+    assert response.status_code == 422
+    response = await client.get("/api/v1/skill-trees/1", params={"expand_links": 99})
+    assert response.status_code == 422
+
+
+# ========== PATCH GRAPH (opérations incrémentales) ==========
+
+
+@pytest.mark.asyncio
+async def test_patch_graph_applies_ops_and_bumps_version(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+    version = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()["version"]
+
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={
+            "version": version,
+            "ops": [
+                {"op": "add_skill", "temp_id": -1, "name": "Root"},
+                {"op": "add_skill", "temp_id": -2, "name": "Child"},
+                {"op": "set_root", "skill_id": -1},
+                {"op": "add_edge", "skill_id": -1, "unlock_id": -2},
+                {"op": "set_tags", "tags": ["python"]},
+            ],
+        },
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["version"] == version + 1
+    root_id, child_id = data["created_ids"]["-1"], data["created_ids"]["-2"]
+
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={"version": version + 1, "ops": [{"op": "rename_skill", "skill_id": child_id, "name": "Renamed"}]},
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+
+    detail = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()
+    assert detail["version"] == version + 2
+    assert detail["tags"] == ["python"]
+    skills = {s["id"]: s for s in detail["skills"]}
+    assert skills[root_id]["is_root"] is True
+    assert skills[root_id]["unlock_ids"] == [child_id]
+    assert skills[child_id]["name"] == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_patch_graph_stale_version_returns_409(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+    version = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()["version"]
+    ops = [{"op": "add_skill", "temp_id": -1, "name": "Root"}, {"op": "set_root", "skill_id": -1}]
+
+    first = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph", json={"version": version, "ops": ops}, cookies=cookies
+    )
+    assert first.status_code == 200
+
+    stale = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph", json={"version": version, "ops": ops}, cookies=cookies
+    )
+    assert stale.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_patch_graph_invalid_root_is_rolled_back(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+    version = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()["version"]
+
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={
+            "version": version,
+            "ops": [
+                {"op": "add_skill", "temp_id": -1, "name": "A"},
+                {"op": "add_skill", "temp_id": -2, "name": "B"},
+            ],
+        },
+        cookies=cookies,
+    )
+    assert response.status_code == 400
+
+    detail = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()
+    assert detail["version"] == version
+    assert detail["skills"] == []
+
+
+@pytest.mark.asyncio
+async def test_patch_graph_not_owner(client):
+    await register_user(client, username="owner", email="owner@example.com")
+    cookies_owner = await auth_cookies(client, username="owner")
+    tree = await create_skill_tree(client, cookies_owner)
+
+    await register_user(client, username="other", email="other@example.com")
+    cookies_other = await auth_cookies(client, username="other")
+
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={"version": 1, "ops": [{"op": "add_skill", "temp_id": -1, "name": "X"}]},
+        cookies=cookies_other,
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_patch_graph_cannot_remove_edge_of_another_tree(client):
+    await register_user(client, username="owner", email="owner@example.com")
+    cookies_owner = await auth_cookies(client, username="owner")
+    victim = await create_skill_tree(client, cookies_owner, name="Victim Tree")
+    response = await client.patch(
+        f"/api/v1/skill-trees/{victim['id']}/graph",
+        json={
+            "version": 1,
+            "ops": [
+                {"op": "add_skill", "temp_id": -1, "name": "Root"},
+                {"op": "add_skill", "temp_id": -2, "name": "Child"},
+                {"op": "set_root", "skill_id": -1},
+                {"op": "add_edge", "skill_id": -1, "unlock_id": -2},
+            ],
+        },
+        cookies=cookies_owner,
+    )
+    ids = response.json()["created_ids"]
+
+    await register_user(client, username="other", email="other@example.com")
+    cookies_other = await auth_cookies(client, username="other")
+    own = await create_skill_tree(client, cookies_other, name="Own Tree")
+    response = await client.patch(
+        f"/api/v1/skill-trees/{own['id']}/graph",
+        json={"version": 1, "ops": [{"op": "remove_edge", "skill_id": ids["-1"], "unlock_id": ids["-2"]}]},
+        cookies=cookies_other,
+    )
+    assert response.status_code == 404
+
+    skills = {s["id"]: s for s in (await client.get(f"/api/v1/skill-trees/{victim['id']}")).json()["skills"]}
+    assert skills[ids["-1"]]["unlock_ids"] == [ids["-2"]]
+
+
+@pytest.mark.asyncio
+async def test_patch_graph_rejects_cycle_and_updates_closure(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+    version = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()["version"]
+
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={
+            "version": version,
+            "ops": [
+                {"op": "add_skill", "temp_id": -1, "name": "Root"},
+                {"op": "add_skill", "temp_id": -2, "name": "A"},
+                {"op": "add_skill", "temp_id": -3, "name": "B"},
+                {"op": "set_root", "skill_id": -1},
+                {"op": "add_edge", "skill_id": -1, "unlock_id": -2},
+                {"op": "add_edge", "skill_id": -2, "unlock_id": -3},
+            ],
+        },
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+    ids = response.json()["created_ids"]
+
+    ancestors = await client.get(f"/api/v1/skill-trees/{tree['id']}/skills/{ids['-3']}/ancestors")
+    assert ancestors.status_code == 200
+    assert [(a["name"], a["depth"]) for a in ancestors.json()] == [("A", 1), ("Root", 2)]
+
+    cycle = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={"version": version + 1, "ops": [{"op": "add_edge", "skill_id": ids["-3"], "unlock_id": ids["-2"]}]},
+        cookies=cookies,
+    )
+    assert cycle.status_code == 400
+
+    descendants = await client.get(f"/api/v1/skill-trees/{tree['id']}/skills/{ids['-1']}/descendants")
+    assert {d["name"] for d in descendants.json()} == {"A", "B"}
+
+
+@pytest.mark.asyncio
+async def test_ancestors_unknown_skill_returns_404(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+
+    response = await client.get(f"/api/v1/skill-trees/{tree['id']}/skills/99999/ancestors")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_learning_path_requires_auth_and_known_skill(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+
+    response = await client.get(f"/api/v1/skill-trees/{tree['id']}/skills/1/path")
+    assert response.status_code == 401
+
+    response = await client.get(f"/api/v1/skill-trees/{tree['id']}/skills/99999/path", cookies=cookies)
+    assert response.status_code == 404
+
+
 # ========== GET SKILL TREES BY USERNAME ==========
 
 
@@ -584,6 +1076,172 @@ async def test_trendings_monthly(client):
     assert isinstance(response.json(), list)
 
 
+# ========== EXPORT ==========
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies, name="Exported")
+    await create_skill_tree(client, cookies, name="Other")
+    version = (await client.get(f"/api/v1/skill-trees/{tree['id']}")).json()["version"]
+    response = await client.patch(
+        f"/api/v1/skill-trees/{tree['id']}/graph",
+        json={
+            "version": version,
+            "ops": [
+                {"op": "add_skill", "temp_id": -1, "name": "Root"},
+                {"op": "add_skill", "temp_id": -2, "name": "Child"},
+                {"op": "set_root", "skill_id": -1},
+                {"op": "add_edge", "skill_id": -1, "unlock_id": -2},
+                {"op": "set_tags", "tags": ["python"]},
+            ],
+        },
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+
+    response = await client.get("/api/v1/skill-trees/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["name"] for line in lines] == ["Exported", "Other"]
+    exported = lines[0]
+    assert exported["tags"] == ["python"]
+    assert exported["version"] == version + 1
+    root, child = exported["skills"]
+    assert (root["name"], child["name"]) == ("Root", "Child")
+    assert root["unlock_ids"] == [child["id"]]
+
+    response = await client.get("/api/v1/skill-trees/export", params={"tag": "python"})
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [tree["id"]]
+
+    response = await client.get("/api/v1/skill-trees/export", params={"creator": "nobody"})
+    assert response.text == ""
+
+
+@pytest.mark.asyncio
+async def test_export_updated_since(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+
+    exported = json.loads((await client.get("/api/v1/skill-trees/export")).text)
+    response = await client.get("/api/v1/skill-trees/export", params={"updated_since": exported["updated_at"]})
+    assert json.loads(response.text)["id"] == tree["id"]
+
+    later = (datetime.fromisoformat(exported["updated_at"]) + timedelta(hours=1)).isoformat()
+    response = await client.get("/api/v1/skill-trees/export", params={"updated_since": later})
+    assert response.text == ""
+
+
+@pytest.mark.asyncio
+async def test_export_updated_since_with_timezone(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies)
+    updated_at = datetime.fromisoformat(json.loads((await client.get("/api/v1/skill-trees/export")).text)["updated_at"])
+
+    since = (updated_at - timedelta(minutes=1)).isoformat() + "Z"
+    response = await client.get("/api/v1/skill-trees/export", params={"updated_since": since})
+    assert response.status_code == 200
+    assert json.loads(response.text)["id"] == tree["id"]
+
+    # Même instant exprimé à UTC+02:00
+    since = (updated_at + timedelta(hours=2, minutes=1)).isoformat() + "+02:00"
+    response = await client.get("/api/v1/skill-trees/export", params={"updated_since": since})
+    assert response.text == ""
+
+
+# ========== IMPORT ==========
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_round_trip(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    lines = [
+        {
+            "name": "Imported",
+            "description": "Depuis un autre système",
+            "tags": ["python"],
+            "skills": [
+                {"id": 10, "name": "Root", "is_root": True, "unlock_ids": [11, 12]},
+                {"id": 11, "name": "Left", "is_root": False, "unlock_ids": [12]},
+                {"id": 12, "name": "Right", "is_root": False},
+            ],
+        },
+        {"name": "Empty"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n"
+
+    response = await client.post("/api/v1/skill-trees/import", content=body, cookies=cookies)
+    assert response.status_code == 201
+    result = response.json()
+    assert len(result["tree_ids"]) == 2
+    assert (result["skills"], result["dependencies"], result["tags"]) == (3, 3, 1)
+    assert result["rows"] == 9
+    assert result["errors"] == []
+
+    detail = (await client.get(f"/api/v1/skill-trees/{result['tree_ids'][0]}")).json()
+    assert detail["creator_username"] == "testuser"
+    assert detail["tags"] == ["python"]
+    tagged = await client.get("/api/v1/skill-trees/", params={"tag": "python"})
+    assert [t["id"] for t in tagged.json()] == result["tree_ids"][:1]
+    skills = {s["name"]: s for s in detail["skills"]}
+    assert sorted(skills["Root"]["unlock_ids"]) == sorted([skills["Left"]["id"], skills["Right"]["id"]])
+    assert skills["Left"]["unlock_ids"] == [skills["Right"]["id"]]
+
+    # Les ancêtres reposent sur la fermeture, recalculée par l'import
+    response = await client.get(f"/api/v1/skill-trees/{result['tree_ids'][0]}/skills/{skills['Right']['id']}/ancestors")
+    assert {a["name"] for a in response.json()} == {"Root", "Left"}
+
+    # Le même contenu réimporté : noms déjà pris, signalés sans rien créer
+    response = await client.post("/api/v1/skill-trees/import", content=body, cookies=cookies)
+    result = response.json()
+    assert result["tree_ids"] == []
+    assert [e["line"] for e in result["errors"]] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_reports_invalid_lines(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    body = "\n".join(
+        [
+            "{not json",
+            json.dumps({"name": ""}),
+            json.dumps(
+                {
+                    "name": "Cycle",
+                    "skills": [
+                        {"id": 1, "name": "A", "is_root": True, "unlock_ids": [2]},
+                        {"id": 2, "name": "B", "is_root": False, "unlock_ids": [3]},
+                        {"id": 3, "name": "C", "is_root": False, "unlock_ids": [2]},
+                    ],
+                }
+            ),
+            json.dumps({"name": "Unknown", "skills": [{"id": 1, "name": "A", "is_root": True, "unlock_ids": [9]}]}),
+            json.dumps({"name": "Valid"}),
+            json.dumps({"name": "Valid"}),
+        ]
+    )
+
+    response = await client.post("/api/v1/skill-trees/import", content=body, cookies=cookies)
+    assert response.status_code == 201
+    result = response.json()
+    assert len(result["tree_ids"]) == 1
+    assert [e["line"] for e in result["errors"]] == [1, 2, 3, 4, 6]
+    assert result["errors"][2]["detail"] == "Le graphe de compétences contient un cycle"
+
+
+@pytest.mark.asyncio
+async def test_import_unauthenticated(client):
+    response = await client.post("/api/v1/skill-trees/import", content="{}")
+    assert response.status_code == 401
+
+
 # ========== HEALTH CHECK ==========
 
 
@@ -597,3 +1255,5 @@ async def test_health_check(client):
     assert data["checks"]["database"]["status"] == "ok"
     assert "latency_ms" in data["checks"]["database"]
     assert "db_pool" in data["checks"]
+    # Le modèle d'embedding se charge en tâche de fond : il ne rend pas l'application indisponible
+    assert data["checks"]["embedding_model"]["status"] in {"loading", "ready"}
@@ -0,0 +1,72 @@
+import pytest
+
+from tests.conftest import auth_cookies, create_skill_tree, register_user
+
+
+async def create_tagged_tree(client, cookies, name: str, tags: list[str]) -> dict:
+    response = await client.post("/api/v1/skill-trees/", json={"name": name, "tags": tags}, cookies=cookies)
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_tags_empty(client):
+    response = await client.get("/api/v1/tags/")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_tags_sorted_by_usage(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    await create_tagged_tree(client, cookies, "A", ["python", "web"])
+    await create_tagged_tree(client, cookies, "B", ["python", "pytest"])
+    await create_tagged_tree(client, cookies, "C", ["python", "web"])
+
+    response = await client.get("/api/v1/tags/")
+    assert response.json() == [
+        {"name": "python", "usage_count": 3},
+        {"name": "web", "usage_count": 2},
+        {"name": "pytest", "usage_count": 1},
+    ]
+
+    response = await client.get("/api/v1/tags/", params={"limit": 1})
+    assert [t["name"] for t in response.json()] == ["python"]
+
+
+@pytest.mark.asyncio
+async def test_tags_prefix_lookup(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    await create_tagged_tree(client, cookies, "A", ["python", "pytest", "web"])
+
+    response = await client.get("/api/v1/tags/", params={"prefix": "PY"})
+    assert [t["name"] for t in response.json()] == ["pytest", "python"]
+
+    # Les jokers LIKE sont pris littéralement
+    response = await client.get("/api/v1/tags/", params={"prefix": "%"})
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_tags_follow_tree_updates_and_deletes(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_tagged_tree(client, cookies, "A", ["python"])
+    await create_skill_tree(client, cookies, name="Untagged")
+
+    response = await client.get("/api/v1/tags/")
+    etag = response.headers["etag"]
+    response = await client.get("/api/v1/tags/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = await client.patch(f"/api/v1/skill-trees/{tree['id']}", json={"tags": ["rust"]}, cookies=cookies)
+    assert response.status_code == 200
+    response = await client.get("/api/v1/tags/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == [{"name": "rust", "usage_count": 1}]
+
+    await client.delete(f"/api/v1/skill-trees/{tree['id']}", cookies=cookies)
+    response = await client.get("/api/v1/tags/")
+    assert response.json() == []
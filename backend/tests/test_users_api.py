@@ -1,8 +1,13 @@
 import asyncio
 
 import pytest
+from sqlalchemy import event, func, select
 
-from tests.conftest import auth_cookies, create_skill_tree, register_user
+from app.models.user_check_skill import UserCheckSkill
+from app.schemas.user import UserSkillsCheckBatchSchema
+from app.services import check_buffer, progress_service
+from app.services.user_service import add_user_skill_checked, apply_user_skill_checks
+from tests.conftest import TestSessionLocal, auth_cookies, create_skill_tree, engine_test, register_user
 
 # ========== REGISTER ==========
 
@@ -282,6 +287,306 @@ async def test_remove_skill_checked_unauthenticated(client):
     assert response.status_code == 401
 
 
+async def save_chain(client, cookies) -> dict[str, int]:
+    """Helper : arbre Root -> Mid -> Leaf, retourne les ids par nom."""
+    tree = await create_skill_tree(client, cookies, name="Chain")
+    await client.put(
+        f"/api/v1/skill-trees/save/{tree['id']}",
+        json={
+            "id": tree["id"],
+            "name": "Chain",
+            "creator_username": "testuser",
+            "skills": [
+                {"id": -1, "name": "Root", "is_root": True, "unlock_ids": [-2]},
+                {"id": -2, "name": "Mid", "is_root": False, "unlock_ids": [-3]},
+                {"id": -3, "name": "Leaf", "is_root": False, "unlock_ids": []},
+            ],
+        },
+        cookies=cookies,
+    )
+    detail = await client.get(f"/api/v1/skill-trees/{tree['id']}")
+    return {s["name"]: s["id"] for s in detail.json()["skills"]}
+
+
+@pytest.mark.asyncio
+async def test_batch_check_with_prerequisites_and_uncheck(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    ids = await save_chain(client, cookies)
+    await client.post("/api/v1/users/skills-checked", json={"skill_id": ids["Root"]}, cookies=cookies)
+
+    response = await client.post(
+        "/api/v1/users/skills-checked/batch",
+        json={"check": [ids["Leaf"]], "include_prerequisites": True},
+        cookies=cookies,
+    )
+    assert response.status_code == 200
+    # Root était déjà coché : seuls Mid et Leaf changent
+    assert response.json() == {"checked": sorted([ids["Mid"], ids["Leaf"]]), "unchecked": []}
+
+    response = await client.post(
+        "/api/v1/users/skills-checked/batch",
+        json={"uncheck": [ids["Mid"], ids["Leaf"], 999]},
+        cookies=cookies,
+    )
+    assert response.json() == {"checked": [], "unchecked": sorted([ids["Mid"], ids["Leaf"]])}
+
+    response = await client.get("/api/v1/users/skills-checked", cookies=cookies)
+    assert response.json()["skill_ids"] == [ids["Root"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_check_rejects_unknown_and_conflicting_skills(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    ids = await save_chain(client, cookies)
+
+    response = await client.post(
+        "/api/v1/users/skills-checked/batch", json={"check": [ids["Root"], 999]}, cookies=cookies
+    )
+    assert response.status_code == 404
+
+    # Root est un prérequis de Leaf : le cocher et le décocher se contredisent
+    response = await client.post(
+        "/api/v1/users/skills-checked/batch",
+        json={"check": [ids["Leaf"]], "uncheck": [ids["Root"]], "include_prerequisites": True},
+        cookies=cookies,
+    )
+    assert response.status_code == 400
+
+    response = await client.get("/api/v1/users/skills-checked", cookies=cookies)
+    assert response.json()["skill_ids"] == []
+
+
+@pytest.mark.asyncio
+async def test_batch_check_unauthenticated(client):
+    response = await client.post("/api/v1/users/skills-checked/batch", json={"check": [1]})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_write_behind_checks_are_folded_and_flushed(client, monkeypatch):
+    monkeypatch.setattr(check_buffer, "WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(check_buffer, "async_session", TestSessionLocal)
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    ids = await save_chain(client, cookies)
+
+    for skill_id in [ids["Root"], ids["Mid"], ids["Leaf"]]:
+        response = await client.post("/api/v1/users/skills-checked", json={"skill_id": skill_id}, cookies=cookies)
+        assert response.status_code == 204
+    await client.delete(f"/api/v1/users/skills-checked/{ids['Mid']}", cookies=cookies)
+
+    # Mêmes erreurs qu'en écriture directe, état en attente compris ; rien n'entre dans le tampon
+    response = await client.post("/api/v1/users/skills-checked", json={"skill_id": 999}, cookies=cookies)
+    assert response.status_code == 404
+    response = await client.post("/api/v1/users/skills-checked", json={"skill_id": ids["Root"]}, cookies=cookies)
+    assert response.status_code == 409
+    response = await client.delete("/api/v1/users/skills-checked/999", cookies=cookies)
+    assert response.status_code == 204
+
+    # Rien n'est encore écrit, mais la lecture voit l'état en attente
+    response = await client.get("/api/v1/users/skills-checked", cookies=cookies)
+    assert response.json()["skill_ids"] == sorted([ids["Root"], ids["Leaf"]])
+    async with TestSessionLocal() as session:
+        assert (await session.execute(select(func.count()).select_from(UserCheckSkill))).scalar() == 0
+
+    # Un seul état par (user, skill)
+    assert await check_buffer.flush_check_buffer() == 3
+    response = await client.get("/api/v1/users/skills-checked", cookies=cookies)
+    assert response.json()["skill_ids"] == sorted([ids["Root"], ids["Leaf"]])
+
+
+@pytest.mark.asyncio
+async def test_write_behind_checks_stay_visible_during_flush(client, monkeypatch):
+    monkeypatch.setattr(check_buffer, "WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(check_buffer, "async_session", TestSessionLocal)
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    ids = await save_chain(client, cookies)
+    await client.post("/api/v1/users/skills-checked", json={"skill_id": ids["Root"]}, cookies=cookies)
+
+    # Flush bloqué avant son commit : le lot n'est plus en attente et pas encore en base
+    gate = asyncio.Event()
+
+    def blocked_session():
+        session = TestSessionLocal()
+        commit = session.commit
+
+        async def commit_after_gate():
+            await gate.wait()
+            await commit()
+
+        session.commit = commit_after_gate
+        return session
+
+    flush = asyncio.create_task(check_buffer.flush_check_buffer(blocked_session))
+    try:
+        await asyncio.sleep(0.05)
+        response = await client.get("/api/v1/users/skills-checked", cookies=cookies)
+        assert response.json()["skill_ids"] == [ids["Root"]]
+
+        # La progression, lue en base, attend la fin du flush en cours
+        progress = asyncio.create_task(client.get("/api/v1/users/progress", cookies=cookies))
+        await asyncio.sleep(0.05)
+        assert not progress.done()
+    finally:
+        gate.set()
+    assert await flush == 1
+    assert (await progress).json()[0]["checked"] == 1
+    assert check_buffer.pending_checks(1) == {}
+
+
+@pytest.mark.asyncio
+async def test_write_behind_progress_sees_pending_checks(client, monkeypatch):
+    monkeypatch.setattr(check_buffer, "WRITE_BEHIND_ENABLED", True)
+    monkeypatch.setattr(check_buffer, "async_session", TestSessionLocal)
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    ids = await save_chain(client, cookies)
+
+    await client.post("/api/v1/users/skills-checked", json={"skill_id": ids["Root"]}, cookies=cookies)
+    response = await client.get("/api/v1/users/progress", cookies=cookies)
+    assert response.json()[0]["checked"] == 1
+    assert check_buffer.pending_checks(1) == {}
+
+
+# ========== PROGRESS ==========
+
+
+@pytest.mark.asyncio
+async def test_progress_per_tree_and_frontier(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    tree = await create_skill_tree(client, cookies, name="Test Tree")
+    empty = await create_skill_tree(client, cookies, name="Empty Tree")
+    await client.put(
+        f"/api/v1/skill-trees/save/{tree['id']}",
+        json={
+            "id": tree["id"],
+            "name": "Test Tree",
+            "creator_username": "testuser",
+            "skills": [
+                {"id": -1, "name": "Root", "is_root": True, "unlock_ids": [-2, -3]},
+                {"id": -2, "name": "Left", "is_root": False, "unlock_ids": [-4]},
+                {"id": -3, "name": "Right", "is_root": False, "unlock_ids": [-4]},
+                {"id": -4, "name": "Top", "is_root": False, "unlock_ids": []},
+            ],
+        },
+        cookies=cookies,
+    )
+    detail = await client.get(f"/api/v1/skill-trees/{tree['id']}")
+    ids = {s["name"]: s["id"] for s in detail.json()["skills"]}
+
+    # Aucun skill coché : pas d'arbre commencé, sauf ceux demandés explicitement
+    response = await client.get("/api/v1/users/progress", cookies=cookies)
+    assert response.status_code == 200
+    assert response.json() == []
+    response = await client.get(
+        "/api/v1/users/progress", params={"tree_ids": [tree["id"], empty["id"], 999]}, cookies=cookies
+    )
+    assert response.json() == [
+        {"skill_tree_id": tree["id"], "checked": 0, "total": 4, "completion": 0.0, "frontier_skill_ids": [ids["Root"]]},
+        {"skill_tree_id": empty["id"], "checked": 0, "total": 0, "completion": 0.0, "frontier_skill_ids": []},
+    ]
+
+    for name in ["Root", "Left"]:
+        await client.post("/api/v1/users/skills-checked", json={"skill_id": ids[name]}, cookies=cookies)
+
+    # Le check invalide le cache : Top attend encore Right
+    response = await client.get("/api/v1/users/progress", cookies=cookies)
+    assert response.json() == [
+        {
+            "skill_tree_id": tree["id"],
+            "checked": 2,
+            "total": 4,
+            "completion": 50.0,
+            "frontier_skill_ids": [ids["Right"]],
+        }
+    ]
+
+    await client.post("/api/v1/users/skills-checked", json={"skill_id": ids["Right"]}, cookies=cookies)
+    await client.delete(f"/api/v1/users/skills-checked/{ids['Left']}", cookies=cookies)
+    progress = (await client.get("/api/v1/users/progress", cookies=cookies)).json()[0]
+    assert (progress["checked"], progress["frontier_skill_ids"]) == (2, [ids["Left"]])
+
+
+@pytest.mark.asyncio
+async def test_progress_cache_sees_checks_written_by_another_process(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    ids = await save_chain(client, cookies)
+    await client.post("/api/v1/users/skills-checked", json={"skill_id": ids["Root"]}, cookies=cookies)
+    async with TestSessionLocal() as session:
+        user_id = (await session.execute(select(UserCheckSkill.user_id))).scalar_one()
+
+    async def progress() -> tuple[int, list[int]]:
+        body = (await client.get("/api/v1/users/progress", cookies=cookies)).json()[0]
+        return body["checked"], body["frontier_skill_ids"]
+
+    assert await progress() == (1, [ids["Mid"]])
+
+    # Requête servie par le cache : seule la version des checks est lue, pas l'historique
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _record)
+    try:
+        assert await progress() == (1, [ids["Mid"]])
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", _record)
+    assert not [statement for statement in statements if "user_check_skill" in statement]
+
+    # Écritures d'un autre worker : le cache local n'est pas invalidé, la version en base change
+    async with TestSessionLocal() as session:
+        await add_user_skill_checked(session, user_id, ids["Mid"])
+    assert await progress() == (2, [ids["Leaf"]])
+
+    # Même nombre de checks, ensemble différent
+    async with TestSessionLocal() as session:
+        await apply_user_skill_checks(
+            session, user_id, UserSkillsCheckBatchSchema(check=[ids["Leaf"]], uncheck=[ids["Root"]])
+        )
+    assert await progress() == (2, [ids["Root"]])
+
+
+@pytest.mark.asyncio
+async def test_progress_cache_is_bounded_per_user_and_globally(client, monkeypatch):
+    monkeypatch.setattr(progress_service, "PROGRESS_CACHE_MAX_ENTRIES_PER_USER", 2)
+    monkeypatch.setattr(progress_service, "PROGRESS_CACHE_MAX_ENTRIES", 3)
+    for username in ["alice", "bob"]:
+        await register_user(client, username=username, email=f"{username}@example.com")
+    alice = await auth_cookies(client, username="alice")
+    bob = await auth_cookies(client, username="bob")
+
+    for tree_id in range(1, 6):
+        await client.get("/api/v1/users/progress", params={"tree_ids": [tree_id]}, cookies=alice)
+    (alice_entries,) = progress_service._progress.values()
+    assert list(alice_entries.entries) == [(4,), (5,)]
+
+    for tree_id in range(1, 3):
+        await client.get("/api/v1/users/progress", params={"tree_ids": [tree_id]}, cookies=bob)
+    # Au-delà du total, l'utilisateur le moins récent est évincé
+    assert progress_service._entry_count == 2
+    assert len(progress_service._progress) == 1
+
+
+@pytest.mark.asyncio
+async def test_progress_too_many_trees(client):
+    await register_user(client)
+    cookies = await auth_cookies(client)
+    response = await client.get("/api/v1/users/progress", params={"tree_ids": list(range(101))}, cookies=cookies)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_progress_unauthenticated(client):
+    response = await client.get("/api/v1/users/progress")
+    assert response.status_code == 401
+
+
 # ========== PROTECTED ROUTES WITH INVALID TOKEN ==========
 
 